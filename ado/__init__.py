@@ -0,0 +1,15 @@
+"""Azure DevOps entegrasyonu için paylaşılan altyapı."""
+from .admission import AdmissionController, AdmissionRejected
+from .ancestry import AncestryCache
+from .breaker import CircuitBreaker, CircuitOpenError
+from .client import AdoClient
+from .idempotency import IdempotencyCache
+from .merge_train import MergeTrain
+from .metrics import MetricsRegistry
+from .pr_index import PrIndex
+from .ref_cache import RefCache
+from .repo_registry import RepoRegistry
+from .state_store import MemoryStateStore, SqliteStateStore
+from .throttle import TokenBucket
+
+__all__ = ["AdmissionController", "AdmissionRejected", "AdoClient", "AncestryCache", "CircuitBreaker", "CircuitOpenError", "IdempotencyCache", "MemoryStateStore", "MergeTrain", "MetricsRegistry", "PrIndex", "RefCache", "RepoRegistry", "SqliteStateStore", "TokenBucket"]
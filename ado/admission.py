@@ -0,0 +1,211 @@
+"""
+ADO işleri için admission control (eşzamanlılık sınırı + sınırlı bekleme kuyruğu).
+
+Worker genelinde ve her repo için aynı anda çalışan iş sayısı sınırlanır;
+böylece tek bir repoya gelen toplu geçişler diğer repoların isteklerini aç
+bırakmaz. Route'lar slot'u istek başına alır (request); isteğin içinden ve
+onun başlattığı task'lardan yapılan ADO çağrıları ayrıca slot almaz. Birden
+fazla repoya yayılan istekler (bulk, Jira planı, çoklu repo) tek bir repo'suz
+slot tutar ve her repo için ayrıca sadece o reponun sınırından slot alır
+(worker geneli sayı istek başına kalır). İstek dışındaki çağrılar (warmup)
+slot'u çağrı başına alır.
+
+Sınır doluysa iş kısa bir kuyrukta bekler; kuyrukta yazma işleri (yazan
+route'lar ve istek dışı ref update, merge, PR create/complete çağrıları)
+okumalardan önce yer alır. Bekleme süresi
+(queue_timeout) dolan iş 429 + Retry-After taşıyan AdmissionRejected ile
+reddedilir. Kuyruğun toplam ve repo başına boyutu sadece gerçekten aşırı yük
+varken uygulanır: kuyruk doluyken son queue_timeout içinde bekleme süresi dolan
+bir iş olduysa yeni gelen iş beklemeden reddedilir, anlık dolulukta sıraya girer.
+"""
+import asyncio
+import contextlib
+import contextvars
+import io
+import itertools
+import json
+import math
+import time
+import urllib.error
+
+# İstek slot'u tutan route'un (ve onun başlattığı task'ların) context'i: (url, repo); doluysa çağrılar ayrıca slot almaz
+_request_slot = contextvars.ContextVar("ado_admission_request_slot", default=None)
+
+
+class AdmissionRejected(urllib.error.HTTPError):
+    """Kuyruk dolu ya da bekleme süresi aşıldı; handler'ların yakaladığı HTTPError gibi 429 ve Retry-After taşır."""
+
+    # Gövdedeki ADO tarzı hata tipi; handler'ların 'error' alanına yazdığı gövdeden tanınabilsin diye
+    TYPE_KEY = "AdmissionRejectedException"
+
+    def __init__(self, url: str, reason: str, retry_after: float):
+        self.retry_after = retry_after
+        body = json.dumps({"message": f"Azure DevOps admission rejected: {reason}", "typeKey": self.TYPE_KEY,
+                           "retry_after": retry_after}).encode()
+        super().__init__(url, 429, "Too Many Requests", {"Retry-After": str(math.ceil(retry_after))}, io.BytesIO(body))
+
+
+class _Waiter:
+    def __init__(self, repo, write: bool, seq: int, counted: bool):
+        self.repo = repo
+        self.write = write
+        self.seq = seq
+        self.counted = counted
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class AdmissionController:
+    """
+    Global ve repo bazlı eşzamanlılık sınırı. Slot'lar sadece event loop üzerinden
+    alınıp bırakıldığı için kilit gerekmez (MergeTrain ile aynı model).
+    """
+
+    def __init__(self, max_concurrency: int = 16, per_repo: int = 4, max_queue: int = 32,
+                 max_queue_per_repo: int = 8, queue_timeout: float = 5.0, retry_after: float = 2.0):
+        self.max_concurrency = max_concurrency
+        self.per_repo = per_repo
+        self.max_queue = max_queue
+        self.max_queue_per_repo = max_queue_per_repo
+        self.queue_timeout = queue_timeout
+        self.retry_after_seconds = retry_after
+        self._active = 0
+        self._active_by_repo = {}
+        self._waiters = []
+        self._seq = itertools.count()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+        # Bekleme süresi en son ne zaman doldu (repo id'si, None = worker geneli); yük atma kararı için
+        self._timed_out_at = {}
+
+    # counted=False: worker geneli slot'u dıştaki istekte sayılmış, sadece repo sınırı uygulanır
+    def _can_run(self, repo, counted: bool = True) -> bool:
+        if counted and self._active >= self.max_concurrency:
+            return False
+        return repo is None or self._active_by_repo.get(repo, 0) < self.per_repo
+
+    def _take(self, repo, counted: bool = True) -> None:
+        if counted:
+            self._active += 1
+        if repo is not None:
+            self._active_by_repo[repo] = self._active_by_repo.get(repo, 0) + 1
+        self.admitted += 1
+
+    def _release(self, repo, counted: bool = True) -> None:
+        if counted:
+            self._active -= 1
+        if repo is not None:
+            remaining = self._active_by_repo.get(repo, 1) - 1
+            if remaining:
+                self._active_by_repo[repo] = remaining
+            else:
+                self._active_by_repo.pop(repo, None)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Boşalan slot'ları önce yazma, sonra okuma bekleyenlere (kendi içinde geliş sırasıyla) verir."""
+        for waiter in sorted(self._waiters, key=lambda w: (not w.write, w.seq)):
+            if not self._can_run(waiter.repo, waiter.counted):
+                continue
+            self._waiters.remove(waiter)
+            self._take(waiter.repo, waiter.counted)
+            waiter.future.set_result(True)
+
+    def _recently_timed_out(self, scope) -> bool:
+        return time.monotonic() - self._timed_out_at.get(scope, float("-inf")) < self.queue_timeout
+
+    def _shedding(self, repo) -> bool:
+        """Kuyruk dolu ve yakın zamanda bekleme süresi dolan iş olmuşsa (anlık doluluk değil, kalıcı aşırı yük)."""
+        if len(self._waiters) >= self.max_queue and self._recently_timed_out(None):
+            return True
+        return (repo is not None and self._recently_timed_out(repo)
+                and sum(1 for w in self._waiters if w.repo == repo) >= self.max_queue_per_repo)
+
+    def retry_after(self, repo=None) -> float:
+        """Yeni bir iş beklemeden reddedilecekse (sınır dolu ve yük atılıyor) önerilen bekleme süresi, değilse None."""
+        if self._can_run(repo) or not self._shedding(repo):
+            return None
+        return self.retry_after_seconds
+
+    def in_request(self) -> bool:
+        """Çağrı istek slot'u tutan bir route'un içinden mi yapılıyor (slot istek başına sayılır)."""
+        return _request_slot.get() is not None
+
+    async def acquire(self, url: str, repo=None, write: bool = False, counted: bool = True) -> None:
+        # Bekleyenler sadece sınır doluyken vardır (her bırakışta dağıtılırlar), boş slot hemen alınabilir
+        if self._can_run(repo, counted):
+            self._take(repo, counted)
+            return
+        if self._shedding(repo):
+            self.rejected += 1
+            raise AdmissionRejected(url, "queue is full", self.retry_after_seconds)
+
+        waiter = _Waiter(repo, write, next(self._seq), counted)
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait({waiter.future}, timeout=self.queue_timeout)
+        except BaseException:
+            # Bekleyen task iptal edildi; slot verilmişse geri bırak
+            if waiter.future.done():
+                self._release(repo, counted)
+            else:
+                self._waiters.remove(waiter)
+                waiter.future.cancel()
+            raise
+        if not waiter.future.done():
+            self._waiters.remove(waiter)
+            waiter.future.cancel()
+            self.timed_out += 1
+            self._timed_out_at[None] = time.monotonic()
+            if repo is not None:
+                self._timed_out_at[repo] = time.monotonic()
+            raise AdmissionRejected(url, f"no slot within {self.queue_timeout:g}s", self.retry_after_seconds)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url: str, repo=None, write: bool = False, counted: bool = True):
+        """Slot alır (gerekirse kuyrukta bekler), blok bitince bırakır."""
+        await self.acquire(url, repo, write, counted)
+        try:
+            yield
+        finally:
+            self._release(repo, counted)
+
+    @staticmethod
+    def detach() -> None:
+        """
+        Çalışan task'ı onu başlatan isteğin slot'undan ayırır (task context'i kopyaladığı için sadece bu task
+        etkilenir). İstekten başlatılıp istekten bağımsız yaşayan işler (async job) kendi slot'unu alır.
+        """
+        _request_slot.set(None)
+
+    @contextlib.asynccontextmanager
+    async def request(self, url: str, repo=None, write: bool = False):
+        """
+        İstek başına slot: blok boyunca tek slot tutulur, içindeki ADO çağrıları (in_request) ayrıca
+        slot almaz. İç içe çağrılan handler'lar (webhook adımları) dıştaki isteğin slot'unu kullanır;
+        dıştaki slot repo'suzsa (birden fazla repoya yayılan istek) iç blok o repo için ayrıca sadece
+        repo sınırından slot alır.
+        """
+        held = _request_slot.get()
+        if held is not None and (repo is None or held[1] == repo):
+            yield
+            return
+        async with self.slot(url, repo, write, counted=held is None):
+            token = _request_slot.set((url, repo))
+            try:
+                yield
+            finally:
+                _request_slot.reset(token)
+
+    def stats(self) -> dict:
+        return {
+            "active": self._active,
+            "active_by_repo": dict(self._active_by_repo),
+            "waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
@@ -0,0 +1,103 @@
+"""
+(source SHA, target SHA) çiftleri için "source zaten target'ta mı" cache'i.
+
+DevMerge, feature branch'in dev'e önceden merge edilip edilmediğini ADO
+diffs/commits API'sinin aheadCount değeriyle kontrol eder (source'un target'ta
+olmayan commit sayısı). Commit SHA'ları değişmediği için sonuç aynı çift için
+her zaman geçerlidir; kayıtlar süre ile değil sadece LRU ile düşer. Aynı çift
+için eşzamanlı sorgular tek bir çağrıya bağlanır.
+
+Uygulamanın kendi dev'e merge ettiği (ya da kontrolde dev'de bulunan) source
+SHA'ları ayrıca kaydedilir (mark_merged): dev sadece ileri gittiği için aynı
+SHA'lı branch'in sonraki DevMerge'ü, dev SHA'sı değişmiş olsa da API çağrısı
+olmadan atlanır (known_merged).
+"""
+import asyncio
+import threading
+from collections import OrderedDict
+
+
+class AncestryCache:
+    """(repo_id, source_sha, target_sha) -> bool (source target'ın atası mı) LRU cache'i."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        # (repo_id, source_sha) -> True; dev'e girdiği bilinen source SHA'ları
+        self._merged = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, key):
+        with self._lock:
+            if key not in self._results:
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return self._results[key]
+
+    def _store(self, key, merged: bool) -> None:
+        with self._lock:
+            self._results[key] = merged
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def mark_merged(self, repo_id: str, source_sha: str) -> None:
+        """source_sha dev'e merge edildi (merge train sonucu ya da aheadCount 0)."""
+        with self._lock:
+            self._merged[(repo_id, source_sha)] = True
+            self._merged.move_to_end((repo_id, source_sha))
+            while len(self._merged) > self.max_entries:
+                self._merged.popitem(last=False)
+
+    def known_merged(self, repo_id: str, source_sha: str, target_sha: str) -> bool:
+        """API çağrısı yapmadan bilinenler: aynı SHA, dev'e girdiği kaydedilmiş source ya da cache'teki çift."""
+        if source_sha == target_sha or self._known_source(repo_id, source_sha):
+            return True
+        return bool(self._cached((repo_id, source_sha, target_sha)))
+
+    def _known_source(self, repo_id: str, source_sha: str) -> bool:
+        with self._lock:
+            if (repo_id, source_sha) not in self._merged:
+                return False
+            self._merged.move_to_end((repo_id, source_sha))
+            self.hits += 1
+            return True
+
+    async def is_merged(self, repo_id: str, source_sha: str, target_sha: str, fetch_ahead_count) -> bool:
+        """
+        source_sha target_sha'dan ulaşılabiliyorsa True döndürür.
+        fetch_ahead_count(source_sha, target_sha) -> source'un target'ta olmayan commit sayısı.
+        """
+        if source_sha == target_sha or self._known_source(repo_id, source_sha):
+            return True
+        key = (repo_id, source_sha, target_sha)
+        merged = self._cached(key)
+        if merged is not None:
+            return merged
+
+        task = self._inflight.get(key)
+        if task is None:
+            with self._lock:
+                self.misses += 1
+            task = self._inflight[key] = asyncio.ensure_future(fetch_ahead_count(source_sha, target_sha))
+            try:
+                merged = await asyncio.shield(task) == 0
+            finally:
+                self._inflight.pop(key, None)
+            self._store(key, merged)
+            if merged:
+                self.mark_merged(repo_id, source_sha)
+            return merged
+        with self._lock:
+            self.hits += 1
+        return await asyncio.shield(task) == 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = len(self._results)
+            merged = len(self._merged)
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "merged_sources": merged}
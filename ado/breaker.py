@@ -0,0 +1,159 @@
+"""
+Azure DevOps kesintileri için circuit breaker.
+
+Org geneli ("org") ve her repo için ayrı devre tutulur. Arka arkaya
+`failure_threshold` hata (5xx, timeout, bağlantı hatası) alan devre açılır;
+açıkken o kapsamdaki istekler ADO'ya gitmeden CircuitOpenError ile reddedilir.
+`reset_timeout` dolunca devre yarı açık olur ve tek bir deneme (probe) isteği
+geçirilir: başarılıysa devre kapanır, başarısızsa yeniden açılır. Devreyi sadece
+probe'un kendi sonucu kapatır ya da yeniden açar; devre açılmadan önce yola
+çıkmış isteklerin geç gelen sonuçları açık / yarı açık devreyi değiştirmez.
+Probe sürerken gelen istekler beklemeden `probing=True` ile reddedilir.
+"""
+import io
+import json
+import math
+import threading
+import time
+import urllib.error
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+ORG_SCOPE = "org"
+
+
+class CircuitOpenError(urllib.error.HTTPError):
+    """Devre açıkken fırlatılır; handler'ların yakaladığı HTTPError gibi 503 ve Retry-After taşır."""
+
+    # Gövdedeki ADO tarzı hata tipi; handler'ların 'error' alanına yazdığı gövdeden tanınabilsin diye
+    TYPE_KEY = "CircuitOpenException"
+
+    def __init__(self, url: str, scope: str, retry_after: float, probing: bool = False):
+        self.scope = scope
+        self.retry_after = retry_after
+        self.probing = probing
+        body = json.dumps({"message": f"Azure DevOps circuit '{scope}' is open", "typeKey": self.TYPE_KEY,
+                           "retry_after": retry_after}).encode()
+        super().__init__(url, 503, "Circuit Open", {"Retry-After": str(math.ceil(retry_after))}, io.BytesIO(body))
+
+
+class _Circuit:
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        # Her probe'a verilen numara; sonucu sadece bu numarayı taşıyan istek yazabilir
+        self.probe_id = 0
+        self.trips = 0
+
+
+class CircuitBreaker:
+    """Kapsam bazlı (org + repo) thread-safe circuit breaker."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._circuits = {}
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _circuit(self, scope: str) -> _Circuit:
+        circuit = self._circuits.get(scope)
+        if circuit is None:
+            circuit = self._circuits[scope] = _Circuit()
+        return circuit
+
+    def _blocked_for(self, circuit: _Circuit, now: float):
+        """Devre isteği reddediyorsa kalan bekleme süresini, geçirecekse None döndürür."""
+        if circuit.state == CLOSED:
+            return None
+        remaining = circuit.opened_at + self.reset_timeout - now
+        if circuit.state == OPEN and remaining > 0:
+            return remaining
+        if circuit.probe_in_flight:
+            # Probe sonucu beklenirken diğer istekler kısa bir süre sonra tekrar denemeli
+            return 1.0
+        return None
+
+    def retry_after(self, scopes) -> float:
+        """Kapsamlardan biri açıksa önerilen bekleme süresi (saniye), hepsi geçirecekse None. Durum değişmez."""
+        now = time.monotonic()
+        with self._lock:
+            waits = [self._blocked_for(self._circuits[s], now) for s in scopes if s in self._circuits]
+        waits = [w for w in waits if w is not None]
+        return max(waits) if waits else None
+
+    def before(self, url: str, scopes) -> dict:
+        """
+        İstekten önce çağrılır; reddedilecekse CircuitOpenError fırlatır (probe sürüyorsa da beklemeden).
+        Süresi dolan devreler için isteği probe olarak ayırır ve {kapsam: probe numarası} döndürür;
+        bu değer record / release'e verilir.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for scope in scopes:
+                circuit = self._circuit(scope)
+                wait = self._blocked_for(circuit, now)
+                if wait is not None:
+                    self.rejected += 1
+                    raise CircuitOpenError(url, scope, wait, circuit.probe_in_flight and circuit.state == HALF_OPEN)
+            probes = {}
+            for scope in scopes:
+                circuit = self._circuits[scope]
+                if circuit.state != CLOSED:
+                    circuit.state = HALF_OPEN
+                    circuit.probe_in_flight = True
+                    circuit.probe_id += 1
+                    probes[scope] = circuit.probe_id
+            return probes
+
+    def record(self, scopes, ok: bool, probes: dict = None) -> None:
+        """
+        İsteğin sonucunu kapsamlara yazar (ok=False: 5xx, timeout ya da bağlantı hatası). Kapalı devrede her sonuç
+        sayılır; açık / yarı açık devrede sadece o kapsamın güncel probe'u (before'un döndürdüğü numara) devreyi değiştirir.
+        """
+        probes = probes or {}
+        now = time.monotonic()
+        with self._lock:
+            for scope in scopes:
+                circuit = self._circuit(scope)
+                if circuit.state != CLOSED:
+                    if not circuit.probe_in_flight or probes.get(scope) != circuit.probe_id:
+                        # Devre açılmadan önce gönderilmiş isteğin geç gelen sonucu
+                        continue
+                    circuit.probe_in_flight = False
+                if ok:
+                    circuit.state = CLOSED
+                    circuit.failures = 0
+                    continue
+                circuit.failures += 1
+                if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                    if circuit.state != OPEN:
+                        circuit.trips += 1
+                    circuit.state = OPEN
+                    circuit.opened_at = now
+
+    def release(self, scopes, probes: dict = None) -> None:
+        """Sonucu alınamayan (iptal edilen) isteğin probe ayrımını bırakır; devre bir sonraki isteği probe olarak geçirir."""
+        with self._lock:
+            for scope, probe_id in (probes or {}).items():
+                circuit = self._circuits.get(scope)
+                if circuit is not None and circuit.probe_id == probe_id:
+                    circuit.probe_in_flight = False
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        circuits = {}
+        with self._lock:
+            for scope, circuit in self._circuits.items():
+                if circuit.state == CLOSED and not circuit.failures and not circuit.trips:
+                    continue
+                entry = {"state": circuit.state, "failures": circuit.failures, "trips": circuit.trips}
+                wait = self._blocked_for(circuit, now)
+                if wait is not None:
+                    entry["retry_after"] = round(wait, 1)
+                circuits[scope] = entry
+        return {"rejected": self.rejected, "circuits": circuits}
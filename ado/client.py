@@ -0,0 +1,253 @@
+"""
+Azure DevOps REST API için paylaşılan, asyncio tabanlı HTTP istemcisi.
+
+Her çağrıda yeni TCP+TLS bağlantısı açan urllib.request.urlopen yerine,
+aiohttp üzerinde host başına keep-alive bağlantı havuzu kullanır. Aynı worker
+üzerindeki tüm fonksiyonlar ve invocation'lar havuzu paylaşır; istekler
+event loop'u bloklamaz.
+
+Tüm istekler paylaşılan bir token bucket'tan (ado.throttle) geçer. 429/503
+cevapları yalnızca güvenli ya da idempotent isteklerde, Retry-After'a uyan
+jitter'lı exponential backoff ile tekrar denenir.
+
+Her isteğin işlem türüne göre bir timeout'u vardır (süre dolarsa 504 HTTPError).
+Circuit breaker verilmişse (ado.breaker) 5xx, timeout ve bağlantı hataları org ve
+repo devrelerine yazılır; devre açıkken istekler gönderilmeden 503 CircuitOpenError
+ile reddedilir. Admission controller verilmişse (ado.admission) her istek önce
+global ve repo bazlı eşzamanlılık slot'u alır (route istek başına slot tutuyorsa çağrılar
+ayrıca almaz); aşırı yükte 429 AdmissionRejected.
+"""
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import re
+import time
+import urllib.error
+import urllib.parse
+
+import aiohttp
+
+from .admission import AdmissionController
+from .breaker import ORG_SCOPE, CircuitBreaker
+from .metrics import MetricsRegistry, classify_operation
+from .throttle import TokenBucket, backoff_delay, parse_retry_after
+
+# Tekrar gönderilmesi yan etki doğurmayan HTTP metodları
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {429, 503}
+# Devreye hata olarak yazılan cevaplar (ADO'nun kendisinin sağlıksız olduğunu gösterir)
+BREAKER_FAILURE_STATUSES = {500, 502, 503, 504}
+# Admission kuyruğunda okumalardan önce sıra alan işlemler
+WRITE_OPERATIONS = {"ref_update", "merge", "pr_create", "pr_patch"}
+
+_REPO_IN_URL = re.compile(r"/_apis/git/repositories/([^/?]+)/")
+
+
+class AdoClient:
+    """
+    Azure DevOps çağrıları için paylaşılan async istemci.
+    Hata durumunda handler'ların zaten yakaladığı urllib.error.HTTPError fırlatır.
+    """
+
+    def __init__(self, pool_size: int = 10, keepalive_timeout: float = 60.0, limiter: TokenBucket = None,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_cap: float = 8.0,
+                 metrics: MetricsRegistry = None, timeout: float = 30.0, operation_timeouts: dict = None,
+                 breaker: CircuitBreaker = None, admission: AdmissionController = None):
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.metrics = metrics
+        self.timeout = timeout
+        self.operation_timeouts = dict(operation_timeouts or {})
+        self.breaker = breaker
+        self.admission = admission
+        self._session = None
+        self._loop = None
+        self.retries = 0
+        self.retry_exhausted = 0
+        self.timeouts = 0
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Session'ı çalışan event loop'a bağlı olarak ilk kullanımda oluşturur. Loop değişmişse
+        (ör. art arda asyncio.run) önceki loop'un session'ı ve connector'ı kapatılır.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            stale, stale_loop = self._session, self._loop
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+            if stale is not None and not stale.closed:
+                await self._close_stale_session(stale, stale_loop)
+        return self._session
+
+    @staticmethod
+    async def _close_stale_session(session: aiohttp.ClientSession, loop) -> None:
+        """Başka bir loop'a ait session'ı kapatır; o loop hâlâ çalışıyorsa kapatma kendi loop'unda yapılır."""
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        try:
+            await session.close()
+        except (RuntimeError, OSError) as e:
+            # Kapanmış loop'un transport'ları kendi loop'u olmadan düzgün kapatılamaz
+            logging.warning(f"Could not close the previous ADO session cleanly: {e}")
+
+    async def request(self, url: str, method: str = 'GET', payload=None, headers: dict = None,
+                      idempotent: bool = None) -> dict:
+        """
+        İsteği havuzdaki bir bağlantı üzerinden gönderir, JSON cevabı döndürür.
+        idempotent verilmezse metoda göre belirlenir; oldObjectId kontrollü refs
+        POST'ları gibi tekrarı güvenli istekler için çağıran True geçebilir.
+        """
+        return (await self._send(url, method, payload, headers, idempotent))[0]
+
+    async def iter_pages(self, url: str, headers: dict = None, page_size: int = None):
+        """
+        Listeleme uç noktasını (ör. refs) continuation token ile sayfa sayfa okur ve her
+        sayfanın 'value' listesini yield eder; tüm liste hiçbir zaman belleğe alınmaz.
+        """
+        token = None
+        while True:
+            params = {}
+            if page_size:
+                params["$top"] = page_size
+            if token:
+                params["continuationToken"] = token
+            page_url = url + ("&" if "?" in url else "?") + urllib.parse.urlencode(params) if params else url
+            data, resp_headers = await self._send(page_url, 'GET', None, headers, True)
+            yield data.get("value", [])
+            token = resp_headers.get("x-ms-continuationtoken") or data.get("continuationToken")
+            if not token:
+                return
+
+    async def _send(self, url: str, method: str, payload, headers: dict, idempotent: bool):
+        """İsteği (rate limit ve retry ile) gönderir; (JSON cevap, response header'ları) döndürür."""
+        session = await self._get_session()
+        body = json.dumps(payload).encode() if payload is not None else None
+        req_headers = {"Content-Type": "application/json"}
+        if headers:
+            req_headers.update(headers)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        operation = classify_operation(method, url)
+        timeout = aiohttp.ClientTimeout(total=self.operation_timeouts.get(operation, self.timeout))
+        scopes = self._scopes(url)
+
+        attempt = 0
+        while True:
+            # Slot sadece istek sürerken tutulur; backoff beklemesi sırasında diğer çağrılara bırakılır
+            async with self._slot(url, scopes, operation):
+                # Devre açıksa (ya da probe sürüyorsa) beklemeden 503 CircuitOpenError; probe ise numarası döner
+                probes = self.breaker.before(url, scopes) if self.breaker is not None else None
+                try:
+                    if self.limiter is not None:
+                        await self.limiter.acquire()
+                    started = time.perf_counter()
+                    async with session.request(method, url, data=body, headers=req_headers, timeout=timeout) as resp:
+                        data = await resp.read()
+                except asyncio.TimeoutError:
+                    self._observe(operation, "timeout", started)
+                    self._record(scopes, False, probes)
+                    self.timeouts += 1
+                    message = json.dumps({"message": f"Azure DevOps did not answer within {timeout.total:g}s"}).encode()
+                    raise urllib.error.HTTPError(url, 504, "Gateway Timeout", {}, io.BytesIO(message))
+                except aiohttp.ClientError:
+                    self._observe(operation, "error", started)
+                    self._record(scopes, False, probes)
+                    raise
+                except asyncio.CancelledError:
+                    if self.breaker is not None:
+                        self.breaker.release(scopes, probes)
+                    raise
+            self._observe(operation, resp.status, started)
+            self._record(scopes, resp.status not in BREAKER_FAILURE_STATUSES, probes)
+            if self.limiter is not None:
+                self.limiter.observe(resp.status, resp.headers)
+            if resp.status < 400:
+                break
+            if resp.status in RETRY_STATUSES and idempotent and attempt < self.max_retries:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap,
+                                      parse_retry_after(resp.headers.get("Retry-After")))
+                logging.warning(f"ADO {resp.status} on {method} {url}, retrying in {delay:.2f}s (attempt {attempt + 1})")
+                self.retries += 1
+                attempt += 1
+            else:
+                if resp.status in RETRY_STATUSES and idempotent:
+                    self.retry_exhausted += 1
+                raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(data))
+            await asyncio.sleep(delay)
+
+        txt = data.decode()
+        return (json.loads(txt) if txt else {}), resp.headers
+
+    @staticmethod
+    def _scopes(url: str) -> tuple:
+        """İsteğin yazıldığı devreler: her zaman org, repo uç noktalarında ayrıca repo id'si."""
+        match = _REPO_IN_URL.search(url)
+        return (ORG_SCOPE, match.group(1)) if match else (ORG_SCOPE,)
+
+    def _slot(self, url: str, scopes: tuple, operation: str):
+        """
+        Admission controller varsa isteğin slot'u (repo kapsamlı, yazmalar öncelikli), yoksa boş context.
+        Slot'u istek başına tutan bir route'un içindeki çağrılar ayrıca slot almaz.
+        """
+        if self.admission is None or self.admission.in_request():
+            return contextlib.nullcontext()
+        repo = scopes[1] if len(scopes) > 1 else None
+        return self.admission.slot(url, repo, write=operation in WRITE_OPERATIONS)
+
+    def request_slot(self, url: str, repo_id: str = None, write: bool = False):
+        """
+        Route'un istek başına admission slot'u (bekleme süresi dolarsa 429 AdmissionRejected), yoksa boş context.
+        Birden fazla repoya yayılan route'lar her repo için bunu repo id'si ile tekrar çağırır.
+        """
+        if self.admission is None:
+            return contextlib.nullcontext()
+        return self.admission.request(url, repo_id, write)
+
+    def admission_retry_after(self, repo_id: str = None) -> float:
+        """Admission yük atıyorsa (yeni iş beklemeden reddedilecekse) önerilen bekleme süresi, değilse None."""
+        if self.admission is None:
+            return None
+        return self.admission.retry_after(repo_id)
+
+    def _record(self, scopes: tuple, ok: bool, probes: dict = None) -> None:
+        if self.breaker is not None:
+            self.breaker.record(scopes, ok, probes)
+
+    def circuit_retry_after(self, repo_id: str = None) -> float:
+        """Org ya da verilen repo devresi açıksa önerilen bekleme süresi (saniye), değilse None."""
+        if self.breaker is None:
+            return None
+        return self.breaker.retry_after((ORG_SCOPE, repo_id) if repo_id else (ORG_SCOPE,))
+
+    def _observe(self, operation: str, status, started: float) -> None:
+        if self.metrics is not None:
+            self.metrics.observe_ado(operation, status, time.perf_counter() - started)
+
+    def stats(self) -> dict:
+        stats = {"retries": self.retries, "retry_exhausted": self.retry_exhausted, "timeouts": self.timeouts}
+        if self.limiter is not None:
+            stats["rate_limiter"] = self.limiter.stats()
+        if self.breaker is not None:
+            stats["circuit_breaker"] = self.breaker.stats()
+        if self.admission is not None:
+            stats["admission"] = self.admission.stats()
+        return stats
+
+    async def close(self) -> None:
+        """Session'ı ve havuzdaki tüm bağlantıları kapatır."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,135 @@
+"""
+Tekrarlanan webhook çağrıları için idempotency katmanı.
+
+Jira automation aynı geçişi birkaç saniye içinde tekrar gönderebiliyor.
+Aynı anahtarla (endpoint, ticket, repo) gelen istekler:
+- ilk istek sürerken ona bağlanır ve aynı sonucu paylaşır (single-flight),
+- ilk istek bittikten sonra pencere süresi boyunca cache'ten tekrar oynatılır.
+
+`store` verilirse (ado.state_store) bu davranış worker'lar arasında da geçerlidir:
+isteği ilk alan worker anahtarı sürüm kontrolüyle (kayıt yoksa) sahiplenir, diğer
+worker'lar sonucun store'a yazılmasını bekler; sonuçlar pencere süresince store'dan
+tekrar oynatılır. Sonuçlar store'a yazılabilmesi için JSON'a çevrilebilir olmalıdır.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def _shared_key(key) -> str:
+    return json.dumps(list(key) if isinstance(key, tuple) else key)
+
+
+class IdempotencyCache:
+    """Süre pencereli, LRU ile sınırlandırılmış sonuç cache'i + in-flight birleştirme."""
+
+    NAMESPACE = "idempotency"
+
+    def __init__(self, window: float = 30.0, max_entries: int = 1024, store=None,
+                 claim_timeout: float = 60.0, poll_interval: float = 0.1):
+        self.window = window
+        self.max_entries = max_entries
+        self.store = store
+        self.claim_timeout = claim_timeout
+        self.poll_interval = poll_interval
+        self._results = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.replays = 0
+        self.coalesced = 0
+        self.shared_replays = 0
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._results[key]
+                return None
+            self._results.move_to_end(key)
+            return entry[0]
+
+    def _store(self, key, result) -> None:
+        with self._lock:
+            self._results[key] = (result, time.monotonic() + self.window)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    async def run(self, key, factory, cacheable=lambda result: True):
+        """
+        `await factory()` sonucunu döndürür; (sonuç, tekrar_mı) tuple'ı verir.
+        Aynı anahtarla süren bir çağrı varsa onun sonucunu bekler. Hatalar ve
+        cacheable(sonuç) False olan sonuçlar cache'e yazılmaz.
+        """
+        result = self._cached(key)
+        if result is not None:
+            self.replays += 1
+            return result, True
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), True
+
+        claim = None
+        if self.store is not None:
+            replayed, result, claim = await self._claim_shared(key)
+            if replayed:
+                self._store(key, result)
+                self.shared_replays += 1
+                return result, True
+
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+
+        def _done(t):
+            self._inflight.pop(key, None)
+            ok = not t.cancelled() and t.exception() is None and cacheable(t.result())
+            if ok:
+                self._store(key, t.result())
+            if claim is not None:
+                if ok:
+                    self.store.put(self.NAMESPACE, _shared_key(key), {"done": True, "result": t.result()}, ttl=self.window)
+                else:
+                    # Sonuç paylaşılmaz; bekleyen worker'lar isteği kendileri çalıştırır
+                    self.store.delete(self.NAMESPACE, _shared_key(key), version=claim)
+
+        task.add_done_callback(_done)
+        # İsteği başlatan çağrı iptal edilse bile bekleyen diğer kopyalar sonucu alır
+        return await asyncio.shield(task), False
+
+    async def _claim_shared(self, key):
+        """
+        (tekrar_mı, sonuç, claim sürümü) döndürür. Anahtar boşsa sürüm kontrolüyle sahiplenir.
+        Başka bir worker sahiplenmişse sonucunu bekler; sahibi sonuç yazmadan bırakırsa ya da
+        claim_timeout dolarsa yeniden sahiplenmeyi dener. Store'a yazılamazsa claim'siz çalışılır.
+        """
+        shared_key = _shared_key(key)
+        deadline = time.monotonic() + self.claim_timeout
+        while True:
+            entry = self.store.get(self.NAMESPACE, shared_key)
+            if entry is not None and entry.value.get("done"):
+                return True, entry.value["result"], None
+            expired = time.monotonic() >= deadline
+            if entry is None or expired:
+                claim = self.store.put(self.NAMESPACE, shared_key, {"done": False}, ttl=self.claim_timeout,
+                                       version=entry.version if entry is not None else 0)
+                if claim is not None or expired:
+                    return False, None, claim
+            await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = len(self._results)
+        return {
+            "replays": self.replays,
+            "coalesced": self.coalesced,
+            "shared_replays": self.shared_replays,
+            "inflight": len(self._inflight),
+            "entries": entries,
+            "window_seconds": self.window,
+        }
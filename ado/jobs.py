@@ -0,0 +1,203 @@
+"""
+Asenkron job modu için kuyruk ve job kayıt backend'leri.
+
+HTTP route'u isteği doğrulayıp kuyruğa atar ve hemen 202 döner; kuyruktaki
+mesajı bir worker mevcut handler mantığıyla işler, sonucu job store'a yazar.
+
+Kuyruk backend'leri (JOB_QUEUE_BACKEND):
+- storage: Azure Storage Queue (queue-triggered worker fonksiyonu işler)
+- memory:  aynı process içinde asyncio task'ı ile işler (local / test)
+- sqlite:  mesajları sqlite tablosunda tutar, aynı process içinde sırayla işler
+
+Job store backend'leri (JOB_STORE_BACKEND): memory, sqlite, state (paylaşılan state store)
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+JOB_QUEUED = "JOB_QUEUED"
+JOB_RUNNING = "JOB_RUNNING"
+JOB_COMPLETED = "JOB_COMPLETED"
+JOB_FAILED = "JOB_FAILED"
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+# --- Job store'lar ---
+
+class InMemoryJobStore:
+    """Process içi job kayıtları (eski kayıtlar max_jobs aşılınca atılır)."""
+
+    def __init__(self, max_jobs: int = 1000):
+        self.max_jobs = max_jobs
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, endpoint: str, params: dict) -> dict:
+        now = time.time()
+        job = {"id": job_id, "endpoint": endpoint, "params": params, "status": JOB_QUEUED,
+               "created_at": now, "updated_at": now, "result": None}
+        with self._lock:
+            self._jobs[job_id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.pop(next(iter(self._jobs)))
+        return dict(job)
+
+    def update(self, job_id: str, status: str, result: dict = None) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(status=status, result=result, updated_at=time.time())
+
+    def get(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+
+class SqliteJobStore:
+    """sqlite dosyasında tutulan job kayıtları."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, endpoint TEXT, params TEXT, status TEXT,"
+            " created_at REAL, updated_at REAL, result TEXT)"
+        )
+
+    def create(self, job_id: str, endpoint: str, params: dict) -> dict:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                (job_id, endpoint, json.dumps(params), JOB_QUEUED, now, now)
+            )
+        return self.get(job_id)
+
+    def update(self, job_id: str, status: str, result: dict = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, time.time(), job_id)
+            )
+
+    def get(self, job_id: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, endpoint, params, status, created_at, updated_at, result FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "endpoint": row[1], "params": json.loads(row[2]), "status": row[3],
+                "created_at": row[4], "updated_at": row[5], "result": json.loads(row[6]) if row[6] else None}
+
+
+class StateJobStore:
+    """
+    Paylaşılan state store'da (ado.state_store) tutulan job kayıtları; job'ı kuyruğa atan
+    worker ile işleyen ya da durumunu soran worker farklı olabilir.
+    """
+
+    NAMESPACE = "jobs"
+
+    def __init__(self, store, ttl: float = 86400.0, max_attempts: int = 5):
+        self.store = store
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+
+    def create(self, job_id: str, endpoint: str, params: dict) -> dict:
+        now = time.time()
+        job = {"id": job_id, "endpoint": endpoint, "params": params, "status": JOB_QUEUED,
+               "created_at": now, "updated_at": now, "result": None}
+        self.store.put(self.NAMESPACE, job_id, job, ttl=self.ttl)
+        return dict(job)
+
+    def update(self, job_id: str, status: str, result: dict = None) -> None:
+        # Okuma-değiştirme-yazma sürüm kontrollü; arada başka yazma olduysa güncel kayıt üzerinden tekrar
+        for _ in range(self.max_attempts):
+            entry = self.store.get(self.NAMESPACE, job_id)
+            if entry is None:
+                return
+            job = dict(entry.value, status=status, result=result, updated_at=time.time())
+            if self.store.put(self.NAMESPACE, job_id, job, ttl=self.ttl, version=entry.version) is not None:
+                return
+        logging.warning(f"Job {job_id} status update to {status} lost after {self.max_attempts} attempts")
+
+    def get(self, job_id: str):
+        entry = self.store.get(self.NAMESPACE, job_id)
+        return dict(entry.value) if entry else None
+
+
+# --- Kuyruklar ---
+
+class MemoryJobQueue:
+    """Mesajı aynı process içinde arka plan task'ı olarak işler."""
+
+    def __init__(self, runner):
+        self.runner = runner
+        self._tasks = set()
+
+    async def enqueue(self, message: dict) -> None:
+        task = asyncio.ensure_future(self.runner(message))
+        # Task referansı tutulmazsa garbage collector tarafından erken toplanabilir
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+class SqliteJobQueue:
+    """Mesajları sqlite tablosunda tutar; process içinde tek bir drain task'ı sırayla işler."""
+
+    def __init__(self, path: str, runner):
+        self.runner = runner
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._conn.execute("CREATE TABLE IF NOT EXISTS job_queue (seq INTEGER PRIMARY KEY AUTOINCREMENT, message TEXT)")
+        self._drain_task = None
+
+    async def enqueue(self, message: dict) -> None:
+        with self._lock:
+            self._conn.execute("INSERT INTO job_queue (message) VALUES (?)", (json.dumps(message),))
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.ensure_future(self.drain())
+
+    def _pop(self):
+        with self._lock:
+            row = self._conn.execute("SELECT seq, message FROM job_queue ORDER BY seq LIMIT 1").fetchone()
+            if row is None:
+                return None
+            self._conn.execute("DELETE FROM job_queue WHERE seq = ?", (row[0],))
+        return json.loads(row[1])
+
+    async def drain(self) -> None:
+        """Tablodaki bekleyen tüm mesajları işler (restart sonrası kalanlar dahil)."""
+        while True:
+            message = self._pop()
+            if message is None:
+                return
+            try:
+                await self.runner(message)
+            except Exception as e:
+                logging.error(f"Job {message.get('id')} failed in sqlite queue: {str(e)}")
+
+
+class StorageJobQueue:
+    """Azure Storage Queue'ya mesaj yazar; mesajı queue-triggered worker fonksiyonu işler."""
+
+    def __init__(self, connection_string: str, queue_name: str):
+        from azure.storage.queue import QueueClient, TextBase64EncodePolicy
+
+        # Functions host varsayılan olarak base64 kodlanmış queue mesajı bekler
+        self._client = QueueClient.from_connection_string(
+            connection_string, queue_name, message_encode_policy=TextBase64EncodePolicy()
+        )
+
+    async def enqueue(self, message: dict) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._client.send_message, json.dumps(message))
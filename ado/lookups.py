@@ -0,0 +1,61 @@
+"""
+Birden fazla adımı olan tek bir işlem (ör. bir Jira geçişinin planı) için paylaşılan lookup kapsamı.
+
+Kapsam açıkken aynı anahtarla yapılan lookup'lar (ör. bir branch'in SHA'sı) tek
+bir çağrıya bağlanır; paralel çalışan adımlar sonucu (ya da hatayı) paylaşır.
+Kapsam contextvar ile taşındığı için handler'lar değişmeden çağrılabilir;
+kapsam yoksa shared() doğrudan factory'yi çalıştırır.
+"""
+import asyncio
+import contextlib
+import contextvars
+
+_current_scope = contextvars.ContextVar("ado_lookup_scope", default=None)
+
+
+class LookupScope:
+    """anahtar -> lookup task'ı; her anahtar kapsam boyunca en fazla bir kez çalışır."""
+
+    def __init__(self):
+        self._tasks = {}
+        self.fetches = 0
+        self.shared = 0
+
+    async def get(self, key, factory):
+        task = self._tasks.get(key)
+        if task is None:
+            self.fetches += 1
+            task = self._tasks[key] = asyncio.ensure_future(factory())
+        else:
+            self.shared += 1
+        # Bekleyen adımlardan biri iptal edilse bile diğerleri sonucu alır
+        return await asyncio.shield(task)
+
+    def seed(self, key, value) -> None:
+        """Başka bir çağrıdan zaten öğrenilmiş değeri kapsama ekler (ör. refs listesindeki SHA)."""
+        if key not in self._tasks:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._tasks[key] = future
+
+    def stats(self) -> dict:
+        return {"fetched": self.fetches, "shared": self.shared}
+
+
+@contextlib.contextmanager
+def lookup_scope():
+    """Blok boyunca (ve blokta başlatılan task'larda) geçerli yeni bir LookupScope açar."""
+    scope = LookupScope()
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+async def shared(key, factory):
+    """Açık bir kapsam varsa lookup'ı onunla paylaşır, yoksa `await factory()` döndürür."""
+    scope = _current_scope.get()
+    if scope is None:
+        return await factory()
+    return await scope.get(key, factory)
@@ -0,0 +1,162 @@
+"""
+Repo bazlı DevMerge kuyruğu (merge train).
+
+Kısa bir pencere içinde aynı repoya gelen DevMerge istekleri toplanır, dev'in
+güncel head'i üzerine sırayla merge edilir ve tüm batch için tek bir
+refs/heads/dev update'i yapılır. dev bu arada başka biri tarafından
+ilerletilmişse (oldObjectId reddi) batch güncel head üzerinden baştan kurulur.
+Her çağıran kendi merge commit'ini ya da conflict sonucunu alır; bir isteğin
+merge hatası (409 dışı) sadece o isteğe döner, batch'in kalanı dev'e yazılır.
+
+`lock` verilirse (ör. state store kilidi) her batch repo kilidi altında çalışır;
+böylece farklı worker process'lerinin batch'leri aynı dev head'i üzerine
+merge kurup ref update'inde birbirini reddetmez.
+"""
+import asyncio
+import contextlib
+import logging
+import urllib.error
+
+from .tracing import current_trace, span
+
+
+class _PendingMerge:
+    def __init__(self, ticket: str, source_sha: str, ops: dict):
+        self.ticket = ticket
+        self.source_sha = source_sha
+        self.ops = ops
+        # Batch başka isteğin task'ında çalışır; aşama süreleri bu isteğin trace'ine yazılır
+        self.trace = current_trace()
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class MergeTrain:
+    """
+    Her repo için tek bir runner task'ı batch'leri sırayla işler, böylece aynı
+    worker içindeki merge'ler dev ref update'inde birbiriyle yarışmaz.
+
+    ops sözlüğü:
+        get_dev_sha(fresh: bool) -> str                       (repo bazlı; batch'in ilk isteğininki kullanılır)
+        create_merge(source_sha, dev_sha, ticket) -> merge commit SHA (her isteğin kendisininki; conflict'te HTTPError 409)
+        update_dev(old_sha, new_sha) -> bool                  (repo bazlı; oldObjectId reddedilirse False)
+    """
+
+    def __init__(self, window: float = 0.15, max_batch: int = 20, max_attempts: int = 3, lock=None):
+        self.window = window
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        # lock(repo_id) -> async context manager; kilit alındıysa True verir
+        self.lock = lock
+        self._queues = {}
+        self._runners = {}
+        self.batches = 0
+        self.merged = 0
+        self.ref_retries = 0
+        self.unlocked_batches = 0
+
+    async def submit(self, repo_id: str, ticket: str, source_sha: str, **ops) -> dict:
+        """İsteği repo kuyruğuna ekler ve batch sonucundan kendi payını döndürür."""
+        item = _PendingMerge(ticket, source_sha, ops)
+        self._queues.setdefault(repo_id, []).append(item)
+        runner = self._runners.get(repo_id)
+        if runner is None or runner.done():
+            self._runners[repo_id] = asyncio.ensure_future(self._run(repo_id))
+        return await item.future
+
+    async def _run(self, repo_id: str) -> None:
+        queue = self._queues[repo_id]
+        while queue:
+            # Pencere boyunca gelen diğer istekleri de topla
+            await asyncio.sleep(self.window)
+            batch = queue[:self.max_batch]
+            del queue[:self.max_batch]
+            try:
+                results = await self._locked_batch(repo_id, batch)
+            except Exception as e:
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+                continue
+            for item, result in zip(batch, results):
+                if item.future.done():
+                    continue
+                if isinstance(result, Exception):
+                    item.future.set_exception(result)
+                else:
+                    item.future.set_result(result)
+
+    async def _locked_batch(self, repo_id: str, batch: list) -> list:
+        if self.lock is None:
+            return await self._merge_batch(repo_id, batch)
+        async with contextlib.AsyncExitStack() as stack:
+            with span("dev lock", [item.trace for item in batch]):
+                held = await stack.enter_async_context(self.lock(repo_id))
+            if not held:
+                # Kilit alınamadı; oldObjectId kontrolü yine de yarışı güvenli kılar
+                self.unlocked_batches += 1
+            return await self._merge_batch(repo_id, batch)
+
+    async def _merge_batch(self, repo_id: str, batch: list) -> list:
+        """Her item için sonuç dict'i ya da (sadece o item'ın merge'ü başarısızsa) exception döndürür."""
+        ops = batch[0].ops
+        traces = [item.trace for item in batch]
+        self.batches += 1
+        for attempt in range(self.max_attempts):
+            # İlk denemede cache'teki dev kullanılabilir; ret sonrası her zaman taze SHA alınır
+            with span("refresh dev sha" if attempt > 0 else "batch dev sha", traces):
+                base_sha = await ops["get_dev_sha"](attempt > 0)
+            head_sha = base_sha
+            results = []
+            merged_sources = {}
+            for item in batch:
+                if item.source_sha == head_sha or item.source_sha == base_sha:
+                    results.append({"status": "ALREADY_UP_TO_DATE", "dev_sha": head_sha})
+                    continue
+                if item.source_sha in merged_sources:
+                    # Aynı batch'te aynı commit ikinci kez merge edilmez
+                    results.append(dict(merged_sources[item.source_sha]))
+                    continue
+                try:
+                    with span("create merge", [item.trace]):
+                        merge_sha = await item.ops["create_merge"](item.source_sha, head_sha, item.ticket)
+                except urllib.error.HTTPError as e:
+                    if e.code != 409:
+                        # Sadece bu istek başarısız; önceki merge'ler dev'e yazılır, sonrakiler devam eder
+                        results.append(e)
+                        continue
+                    results.append({"status": "MERGE_CONFLICT", "dev_sha": head_sha})
+                    continue
+                result = {"status": "DEV_MERGE_OK", "dev_old_sha": head_sha, "merge_commit": merge_sha}
+                merged_sources[item.source_sha] = result
+                results.append(result)
+                head_sha = merge_sha
+
+            updated = head_sha == base_sha
+            if not updated:
+                with span("update ref", traces):
+                    updated = await ops["update_dev"](base_sha, head_sha)
+            if updated:
+                for result in results:
+                    if isinstance(result, dict) and result["status"] == "DEV_MERGE_OK":
+                        result["dev_new_sha"] = head_sha
+                        result["batch_size"] = len(batch)
+                self.merged += len(merged_sources)
+                return results
+
+            self.ref_retries += 1
+            logging.warning(f"Dev moved during merge train batch of {len(batch)} in repo {repo_id} (attempt {attempt + 1}), rebuilding on fresh dev")
+
+        return [
+            {"status": "DEV_UPDATE_CONFLICT", "dev_sha": None} if isinstance(r, dict) and r["status"] == "DEV_MERGE_OK" else r
+            for r in results
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "merged": self.merged,
+            "ref_retries": self.ref_retries,
+            "unlocked_batches": self.unlocked_batches,
+            "pending": sum(len(q) for q in self._queues.values()),
+            "window_seconds": self.window,
+        }
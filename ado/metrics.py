@@ -0,0 +1,145 @@
+"""
+Process içi metrik kaydı ve Prometheus text formatı (0.0.4) çıktısı.
+
+Route bazında istek sayısı / status kodu / gecikme histogramı ve ADO'ya giden
+her işlem türü (ref lookup, ref update, merge, PR create/search/get/patch)
+için ayrı gecikme histogramı tutar. Jira geçişleri yavaşladığında hangi
+aşamanın yavaş olduğu /api/metrics üzerinden görülebilir.
+"""
+import re
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_REFS = re.compile(r"/_apis/git/repositories/[^/]+/refs")
+_MERGES = re.compile(r"/_apis/git/repositories/[^/]+/merges")
+_PR_ITEM = re.compile(r"/_apis/git/repositories/[^/]+/pullrequests/\d+")
+_PRS = re.compile(r"/_apis/git/repositories/[^/]+/pullrequests")
+_BRANCH_STATS = re.compile(r"/_apis/git/repositories/[^/]+/stats/branches")
+_COMMIT_DIFFS = re.compile(r"/_apis/git/repositories/[^/]+/diffs/commits")
+_REPOS = re.compile(r"/_apis/git/repositories/?(?:\?|$)")
+
+
+def classify_operation(method: str, url: str) -> str:
+    """ADO isteğini metrik etiketi olarak kullanılan işlem türüne çevirir."""
+    method = method.upper()
+    if _REFS.search(url):
+        return "ref_update" if method == "POST" else "ref_lookup"
+    if _MERGES.search(url):
+        return "merge"
+    if _BRANCH_STATS.search(url):
+        return "branch_stats"
+    if _COMMIT_DIFFS.search(url):
+        return "commit_diff"
+    if _PR_ITEM.search(url):
+        return "pr_patch" if method == "PATCH" else "pr_get"
+    if _PRS.search(url):
+        return "pr_create" if method == "POST" else "pr_search"
+    if _REPOS.search(url):
+        return "repo_list"
+    return "other"
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """Thread-safe sayaç ve histogram kaydı; tanımlar ilk kullanımda oluşur."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._help = {}
+        self._types = {}
+        self._counters = {}
+        self._histograms = {}
+
+    def _declare(self, name: str, kind: str, help_text: str) -> None:
+        self._types.setdefault(name, kind)
+        self._help.setdefault(name, help_text)
+
+    def inc(self, name: str, labels: dict = None, value: float = 1, help_text: str = "") -> None:
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._declare(name, "counter", help_text)
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: dict = None, help_text: str = "") -> None:
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._declare(name, "histogram", help_text)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    def observe_request(self, route: str, status: int, seconds: float) -> None:
+        """Bir HTTP route çağrısını kaydeder."""
+        self.inc("jira_ado_http_requests_total", {"route": route, "status": str(status)},
+                 help_text="HTTP requests handled, by route and status code")
+        self.observe("jira_ado_http_request_duration_seconds", seconds, {"route": route},
+                     help_text="HTTP request latency by route")
+
+    def observe_ado(self, operation: str, status, seconds: float) -> None:
+        """ADO'ya giden tek bir HTTP denemesini kaydeder (status bağlantı hatasında 'error', timeout'ta 'timeout')."""
+        self.inc("jira_ado_outbound_requests_total", {"operation": operation, "status": str(status)},
+                 help_text="Outbound Azure DevOps requests, by operation and status code")
+        self.observe("jira_ado_outbound_request_duration_seconds", seconds, {"operation": operation},
+                     help_text="Outbound Azure DevOps request latency by operation")
+
+    def render(self, gauges: list = ()) -> str:
+        """
+        Prometheus text formatını üretir. gauges: render anında okunan
+        (isim, help, tip, {etiketler}, değer) kayıtları (ör. cache sayaçları).
+        """
+        lines = []
+        with self._lock:
+            by_name = {}
+            for (name, labels), value in self._counters.items():
+                by_name.setdefault(name, []).append((dict(labels), value))
+            for (name, labels), histogram in self._histograms.items():
+                by_name.setdefault(name, []).append((dict(labels), histogram))
+
+            for name in sorted(by_name):
+                lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {self._types[name]}")
+                for labels, value in sorted(by_name[name], key=lambda item: sorted(item[0].items())):
+                    if isinstance(value, _Histogram):
+                        for bound, count in zip(value.buckets, value.counts):
+                            lines.append(f"{name}_bucket{_format_labels({**labels, 'le': repr(bound)})} {count}")
+                        lines.append(f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {value.total}")
+                        lines.append(f"{name}_sum{_format_labels(labels)} {value.sum}")
+                        lines.append(f"{name}_count{_format_labels(labels)} {value.total}")
+                    else:
+                        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        declared = set()
+        for name, help_text, kind, labels, value in gauges:
+            if name not in declared:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                declared.add(name)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,132 @@
+"""
+(repo, branch) -> açık PR eşlemesi için kalıcı index.
+
+PrOpen oluşturduğu PR'ın id'sini ve source commit'ini buraya yazar; PrApprove
+Jira'dan pr_id gelmediğinde pullrequests araması ve ayrı PR detay GET'i yerine
+bu kaydı kullanır. Kayıtlar paylaşılan state store'da tutulur (worker yeniden
+başlasa da, aynı makinedeki başka bir worker'da da görünür; store verilmezse path'teki sqlite
+dosyası kullanılır), önünde LRU ile sınırlandırılmış bir bellek cache'i vardır.
+Kayıt eskiyse (PR kapanmış, branch'e yeni commit gelmiş) çağıran taraf kaydı
+siler ve aramaya geri döner. Service hook'tan gelen kayıtlar süreyle sınırlıdır.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .state_store import SqliteStateStore
+
+NAMESPACE = "pr_index"
+
+
+def _key(repo_id: str, branch: str) -> str:
+    return f"{repo_id}:{branch}"
+
+
+def _public(entry: dict) -> dict:
+    return {"pr_id": entry["pr_id"], "source_commit": entry["source_commit"]}
+
+
+class PrIndex:
+    """Thread-safe (repo_id, branch) -> {pr_id, source_commit} index'i; store ve path verilmezse sadece bellekte tutar."""
+
+    def __init__(self, path: str = None, max_entries: int = 1024, store=None):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._store = store
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        if store is None and path:
+            try:
+                self._store = SqliteStateStore(path)
+            except sqlite3.Error as e:
+                logging.warning(f"Could not open PR index at {path}, using memory only: {str(e)}")
+
+    def _remember(self, key, entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _lookup(self, repo_id: str, branch: str):
+        key = (repo_id, branch)
+        entry = self._entries.get(key)
+        if entry is not None and entry.get("expires_at", float("inf")) <= time.time():
+            # Service hook'tan gelen süreli kayıt: süresi geçince okunmaz
+            del self._entries[key]
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+        elif self._store is not None:
+            shared = self._store.get(NAMESPACE, _key(repo_id, branch))
+            if shared is not None:
+                entry = shared.value
+                self._remember(key, entry)
+        return entry
+
+    def get(self, repo_id: str, branch: str):
+        """Kayıt varsa {'pr_id', 'source_commit'} döndürür, yoksa None (hit/miss sayılır)."""
+        with self._lock:
+            entry = self._lookup(repo_id, branch)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return _public(entry)
+
+    def peek(self, repo_id: str, branch: str):
+        """get() gibi, ama hit/miss sayılmaz (PR araması yerine kullanılmayan kontroller için)."""
+        with self._lock:
+            entry = self._lookup(repo_id, branch)
+            return _public(entry) if entry is not None else None
+
+    def has(self, repo_id: str, branch: str) -> bool:
+        """Branch için bilinen bir PR var mı (hit/miss sayılmaz)."""
+        return self.peek(repo_id, branch) is not None
+
+    def put(self, repo_id: str, branch: str, pr_id: int, source_commit: str, ttl: float = None) -> None:
+        """Kaydı yazar; ttl verilirse (service hook'tan gelen kayıt) en fazla o kadar saniye okunur."""
+        entry = {"pr_id": int(pr_id), "source_commit": source_commit}
+        if ttl is not None:
+            entry["expires_at"] = time.time() + ttl
+        with self._lock:
+            self._remember((repo_id, branch), entry)
+            if self._store is not None:
+                self._store.put(NAMESPACE, _key(repo_id, branch), entry, ttl=ttl)
+
+    def remove(self, repo_id: str, branch: str, stale: bool = False, pr_id: int = None) -> None:
+        """
+        Kaydı siler; stale=True ise kaydın işe yaramadığı (aramaya düşüldüğü) sayılır.
+        pr_id verilirse kayıt sadece o PR'a aitse silinir (aynı branch'in eski PR'ları için).
+        """
+        key = (repo_id, branch)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (pr_id is None or entry["pr_id"] == int(pr_id)):
+                del self._entries[key]
+            if stale:
+                self.stale += 1
+            if self._store is None:
+                return
+            if pr_id is None:
+                self._store.delete(NAMESPACE, _key(repo_id, branch))
+                return
+            # Başka bir worker arada yeni PR'ı yazdıysa o kayıt silinmez (sürüm kontrolü)
+            shared = self._store.get(NAMESPACE, _key(repo_id, branch))
+            if shared is not None and shared.value["pr_id"] == int(pr_id):
+                self._store.delete(NAMESPACE, _key(repo_id, branch), version=shared.version)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = len(self._entries)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "cached_entries": entries,
+            "persistent": self._store is not None,
+        }
@@ -0,0 +1,189 @@
+"""
+Repo bazlı, kısa TTL'li ve LRU ile sınırlandırılmış ref SHA cache'i.
+
+dev/test gibi sık sorgulanan branch head'lerinin refs API'ye her istekte
+gitmesini engeller. Uygulama kendisi bir ref yazdığında (branch oluşturma/silme,
+DevMerge ref update, PR completion) cache anında güncellenir veya düşürülür;
+ADO service hook push'ları da yeni SHA'yı süresi sınırlı olarak yazar.
+
+`store` verilirse (ado.state_store) kayıtlar worker'lar arasında paylaşılır:
+bellekte olmayan branch önce store'a sorulur, yazmalar store'a da yansıtılır.
+API'den okunan SHA, okuma öncesi görülen store sürümüyle yazılır; arada başka
+bir worker ref'i güncellediyse eski SHA onun kaydının üzerine yazılmaz.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+ZERO_SHA = "0000000000000000000000000000000000000000"
+
+
+def _short_name(ref_name: str) -> str:
+    """'refs/heads/dev' -> 'dev'"""
+    return ref_name[len("refs/heads/"):] if ref_name.startswith("refs/heads/") else ref_name
+
+
+def _namespace(repo_id: str) -> str:
+    return f"refs:{repo_id}"
+
+
+class RefCache:
+    """Thread-safe ref cache: repo_id -> OrderedDict(branch -> (sha, expires_at))."""
+
+    def __init__(self, ttl: float = 10.0, max_entries_per_repo: int = 64, store=None):
+        self.ttl = ttl
+        self.max_entries_per_repo = max_entries_per_repo
+        self.store = store
+        self._repos = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.shared_hits = 0
+
+    def _lookup(self, repo_id: str, branch: str):
+        """(SHA ya da None, görülen store sürümü) döndürür; bellekte yoksa paylaşılan katmana bakar."""
+        now = time.monotonic()
+        with self._lock:
+            entries = self._repos.get(repo_id)
+            entry = entries.get(branch) if entries else None
+            if entry is not None and entry[1] > now:
+                entries.move_to_end(branch)
+                self.hits += 1
+                return entry[0], None
+            if entry is not None:
+                del entries[branch]
+            if self.store is None:
+                self.misses += 1
+                return None, None
+            shared = self.store.get(_namespace(repo_id), branch)
+            if shared is None:
+                self.misses += 1
+                return None, 0
+            # Bellekteki kopya paylaşılan kaydın süresini aşmaz
+            remaining = self.ttl if shared.expires_at is None else min(self.ttl, max(shared.expires_at - time.time(), 0))
+            self._put_locked(repo_id, branch, shared.value, remaining)
+            self.hits += 1
+            self.shared_hits += 1
+            return shared.value, shared.version
+
+    def get(self, repo_id: str, branch: str):
+        """Geçerli bir kayıt varsa SHA'yı döndürür, yoksa None (hit/miss sayılır)."""
+        return self._lookup(repo_id, branch)[0]
+
+    def put(self, repo_id: str, branch: str, sha: str, ttl: float = None, version: int = None) -> None:
+        """
+        Kaydı yazar. version verilirse paylaşılan kayıt sadece hâlâ o sürümdeyse güncellenir
+        (API'den okunan SHA için); tutmazsa başka worker'ın daha yeni kaydı korunur.
+        """
+        with self._lock:
+            self._put_locked(repo_id, branch, sha, ttl)
+            self._publish(repo_id, branch, sha, ttl, version)
+
+    def _publish(self, repo_id: str, branch: str, sha: str, ttl: float = None, version: int = None) -> None:
+        if self.store is not None:
+            self.store.put(_namespace(repo_id), branch, sha, ttl=self.ttl if ttl is None else ttl, version=version)
+
+    def _unpublish(self, repo_id: str, branch: str) -> None:
+        if self.store is not None:
+            self.store.delete(_namespace(repo_id), branch)
+
+    def _put_locked(self, repo_id: str, branch: str, sha: str, ttl: float = None) -> None:
+        entries = self._repos.setdefault(repo_id, OrderedDict())
+        entries[branch] = (sha, time.monotonic() + (self.ttl if ttl is None else ttl))
+        entries.move_to_end(branch)
+        while len(entries) > self.max_entries_per_repo:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_fetch(self, repo_id: str, branch: str, fetch) -> str:
+        """Cache'te yoksa `await fetch(branch)` ile API'den alır ve cache'e yazar."""
+        sha, version = self._lookup(repo_id, branch)
+        if sha is None:
+            sha = await fetch(branch)
+            self.put(repo_id, branch, sha, version=version)
+        return sha
+
+    def invalidate(self, repo_id: str, branch: str = None) -> None:
+        """Tek bir branch'i ya da (branch verilmezse) repo'nun tüm kayıtlarını düşürür."""
+        with self._lock:
+            if branch is None:
+                if self.store is not None:
+                    self.store.clear(_namespace(repo_id))
+            else:
+                self._unpublish(repo_id, branch)
+            entries = self._repos.get(repo_id)
+            if not entries:
+                return
+            if branch is None:
+                self.invalidations += len(entries)
+                entries.clear()
+            elif entries.pop(branch, None) is not None:
+                self.invalidations += 1
+
+    def apply_updates(self, repo_id: str, updates: list) -> None:
+        """
+        Uygulamanın kendi yaptığı refs POST'unu cache'e yansıtır (write-through).
+        Sadece zaten cache'te olan branch'ler güncellenir; silinenler düşürülür.
+        Paylaşılan katmanda güncellenmeyen branch'lerin (başka worker'ın) kaydı düşürülür.
+        """
+        with self._lock:
+            entries = self._repos.get(repo_id) or {}
+            for update in updates:
+                branch = _short_name(update["name"])
+                new_sha = update.get("newObjectId", ZERO_SHA)
+                if branch not in entries or new_sha == ZERO_SHA:
+                    if branch in entries:
+                        del entries[branch]
+                        self.invalidations += 1
+                    self._unpublish(repo_id, branch)
+                else:
+                    self._put_locked(repo_id, branch, new_sha)
+                    self._publish(repo_id, branch, new_sha)
+
+    def apply_push(self, repo_id: str, updates: list, ttl: float, track=()) -> int:
+        """
+        Doğrulanmış service hook push'unu cache'e uygular; değişen kayıt sayısını döndürür.
+        Cache'teki branch'ler ve `track` içindekiler yeni SHA ile en fazla `ttl` saniye (event'in
+        kalan okunabilir süresi) tutulur. Süre dolmuşsa, branch silindiyse ya da cache'teki SHA ne
+        eski ne yeni SHA ise (sıra dışı event) kayıt düşürülür ve sonraki okuma API'ye gider.
+        """
+        applied = 0
+        with self._lock:
+            entries = self._repos.get(repo_id) or {}
+            for update in updates:
+                branch = _short_name(update["name"])
+                new_sha = update.get("newObjectId", ZERO_SHA)
+                entry = entries.get(branch)
+                out_of_order = entry is not None and entry[0] not in (update.get("oldObjectId"), new_sha)
+                if new_sha == ZERO_SHA or ttl <= 0 or out_of_order:
+                    if entry is not None:
+                        del entries[branch]
+                        self.invalidations += 1
+                        applied += 1
+                    # Başka bir worker'ın paylaşılan kaydı da eski olabilir
+                    self._unpublish(repo_id, branch)
+                elif entry is not None or branch in track:
+                    self._put_locked(repo_id, branch, new_sha, ttl)
+                    self._publish(repo_id, branch, new_sha, ttl)
+                    entries = self._repos[repo_id]
+                    applied += 1
+                else:
+                    # Bu worker'da yok ama başka bir worker cache'lemiş olabilir
+                    self._unpublish(repo_id, branch)
+        return applied
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": sum(len(e) for e in self._repos.values()),
+                "shared_hits": self.shared_hits,
+                "ttl_seconds": self.ttl,
+            }
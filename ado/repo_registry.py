@@ -0,0 +1,149 @@
+"""
+Repo adı -> repo id eşlemesi (ADO repositories API'sinden).
+
+Sabit REPO_MAP yerine eşleme ADO'dan okunur ve yerel bir dosyada saklanır;
+worker açılırken dosya (yoksa sabit fallback map) kullanıldığı için cold start
+ağı beklemez. Okumalar her zaman O(1) dict lookup'ıdır. TTL dolduğunda yenileme
+arka planda yapılır; bilinmeyen bir repo adı en fazla tek, birleştirilmiş
+(coalesced) bir yenilemeyi tetikler ve bu da MISS_REFRESH_INTERVAL ile sınırlıdır.
+"""
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from collections.abc import Mapping
+
+
+class RepoRegistry(Mapping):
+    """
+    dict gibi kullanılabilen (repo_name in registry, registry[repo_name], keys())
+    repo eşlemesi. fetch: `await fetch()` -> {repo_name: repo_id}.
+    """
+
+    def __init__(self, fallback: dict, fetch=None, ttl: float = 3600.0, persist_path: str = None,
+                 miss_refresh_interval: float = 60.0):
+        self.fallback = dict(fallback)
+        self.fetch = fetch
+        self.ttl = ttl
+        self.persist_path = persist_path
+        self.miss_refresh_interval = miss_refresh_interval
+        self._map = dict(self.fallback)
+        self._loaded_at = 0.0
+        self._last_miss_refresh = 0.0
+        self._refresh_task = None
+        self.source = "fallback"
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._load_persisted()
+
+    # --- Mapping arayüzü (hot path; ağ çağrısı yapmaz) ---
+    def __getitem__(self, name: str) -> str:
+        self._refresh_if_stale()
+        return self._map[name]
+
+    def __contains__(self, name) -> bool:
+        return name in self._map
+
+    def __iter__(self):
+        return iter(self._map)
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    # --- Kalıcılık ---
+    def _load_persisted(self) -> None:
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, encoding="utf-8") as f:
+                data = json.load(f)
+            self._map = {**self.fallback, **data["repos"]}
+            # Dosyadaki yaş korunur; eskiyse ilk kullanımda arka planda yenilenir
+            self._loaded_at = time.monotonic() - max(0.0, time.time() - data.get("saved_at", 0))
+            self.source = "file"
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Could not load repo map from {self.persist_path}: {str(e)}")
+
+    def _persist(self, repos: dict) -> None:
+        if not self.persist_path:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(self.persist_path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".repo_map")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"saved_at": time.time(), "repos": repos}, f)
+            # Yarım yazılmış dosya okunmasın diye atomik olarak değiştir
+            os.replace(tmp_path, self.persist_path)
+        except OSError as e:
+            logging.warning(f"Could not persist repo map to {self.persist_path}: {str(e)}")
+
+    # --- Yenileme ---
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._loaded_at >= self.ttl
+
+    def _refresh_if_stale(self) -> None:
+        """TTL dolduysa ve çalışan bir event loop varsa arka planda yenileme başlatır."""
+        if self.fetch is None or not self._is_stale():
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._start_refresh()
+
+    def _start_refresh(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._refresh())
+        return self._refresh_task
+
+    async def _refresh(self) -> None:
+        try:
+            repos = await self.fetch()
+        except Exception as e:
+            self.refresh_errors += 1
+            # Başarısız denemeden sonra her istekte yeniden denememek için zaman damgası ilerletilir
+            self._loaded_at = time.monotonic() - self.ttl + min(self.ttl, self.miss_refresh_interval)
+            logging.warning(f"Repo map refresh failed, keeping {len(self._map)} known repos: {str(e)}")
+            return
+        self._map = {**self.fallback, **repos}
+        self._loaded_at = time.monotonic()
+        self.source = "ado"
+        self.refreshes += 1
+        self._persist(repos)
+        logging.info(f"Repo map refreshed from Azure DevOps: {len(repos)} repos")
+
+    async def refresh(self) -> None:
+        """Yenilemeyi başlatır (sürmekte olan varsa ona bağlanır) ve bitmesini bekler."""
+        if self.fetch is not None:
+            await asyncio.shield(self._start_refresh())
+
+    async def resolve(self, name: str):
+        """
+        Repo id'sini döndürür; bilinmeyen isim için (MISS_REFRESH_INTERVAL'de en fazla bir kez)
+        birleştirilmiş yenilemeyi bekler. Hâlâ yoksa None.
+        """
+        repo_id = self._map.get(name)
+        if repo_id is not None:
+            self._refresh_if_stale()
+            return repo_id
+        if self.fetch is None:
+            return None
+        now = time.monotonic()
+        running = self._refresh_task is not None and not self._refresh_task.done()
+        if running or now - self._last_miss_refresh >= self.miss_refresh_interval:
+            if not running:
+                self._last_miss_refresh = now
+            await self.refresh()
+        return self._map.get(name)
+
+    def stats(self) -> dict:
+        return {
+            "repos": len(self._map),
+            "source": self.source,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "ttl_seconds": self.ttl,
+        }
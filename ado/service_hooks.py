@@ -0,0 +1,97 @@
+"""
+Azure DevOps service hook (Web Hooks) event'lerini process içi duruma uygular.
+
+Route secret'ı doğruladıktan sonra git.push event'lerinin yeni SHA'ları ref
+cache'ine, git.pullrequest.* event'lerinin PR durumu PR index'ine yazılır;
+böylece handler'lar dev/test head'ini ve branch'in açık PR'ını ADO'ya sormadan
+bulabilir. Hook'tan gelen kayıtlar event'in oluşturulma zamanından (createdDate)
+itibaren en fazla `max_age` saniye okunur; süresi geçmiş, zamanı bilinmeyen ya da
+sıra dışı gelen event'ler sadece kayıt düşürür ve sonraki okuma API'ye gider.
+"""
+import time
+from datetime import datetime
+
+from .ref_cache import _short_name
+
+PUSH_EVENT = "git.push"
+PR_EVENTS = ("git.pullrequest.created", "git.pullrequest.updated", "git.pullrequest.merged")
+
+
+def _resolve_repo(resource: dict, repos):
+    """Payload'daki repo adını REPO_MAP'teki id'ye çevirir; bilinmeyen repolar için None."""
+    name = (resource.get("repository") or {}).get("name")
+    return name, (repos[name] if name in repos else None)
+
+
+def _remaining_age(event: dict, max_age: float, now: float = None) -> float:
+    """Event'ten gelen kaydın daha kaç saniye okunabileceği; createdDate yoksa ya da okunamıyorsa 0."""
+    try:
+        created = datetime.fromisoformat(event["createdDate"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+    now = time.time() if now is None else now
+    # Saat farkıyla gelecekte görünen event şimdi oluşmuş sayılır
+    return max(0.0, max_age - max(0.0, now - created))
+
+
+def apply_event(event: dict, repos, ref_cache, pr_index, max_age: float = 60.0,
+                track_branches=("dev", "test"), pr_target: str = "test", now: float = None) -> dict:
+    """
+    Tek bir service hook payload'ını uygular; {'event', 'repo', 'applied'} döndürür.
+    Eksik/bozuk payload'da ValueError fırlatır. Desteklenmeyen event'ler ve
+    bilinmeyen repolar 'ignored' sebebiyle döner, durum değişmez.
+    """
+    if not isinstance(event, dict) or not isinstance(event.get("resource"), dict):
+        raise ValueError("Payload must be a service hook event with a 'resource' object")
+    event_type = event.get("eventType")
+    resource = event["resource"]
+    result = {"event": event_type, "repo": None, "applied": 0}
+
+    if event_type != PUSH_EVENT and event_type not in PR_EVENTS:
+        result["ignored"] = "unsupported event"
+        return result
+    repo_name, repo_id = _resolve_repo(resource, repos)
+    result["repo"] = repo_name
+    if repo_id is None:
+        result["ignored"] = "unknown repository"
+        return result
+
+    remaining = _remaining_age(event, max_age, now)
+    if event_type == PUSH_EVENT:
+        updates = resource.get("refUpdates")
+        if not isinstance(updates, list) or not all(isinstance(u, dict) and u.get("name") for u in updates):
+            raise ValueError("git.push payload must contain refUpdates with ref names")
+        result["applied"] = ref_cache.apply_push(repo_id, updates, remaining, track=track_branches)
+        return result
+
+    pr_id = resource.get("pullRequestId")
+    source = _short_name(resource.get("sourceRefName") or "")
+    target = _short_name(resource.get("targetRefName") or "")
+    if not pr_id or not source:
+        raise ValueError("Pull request payload must contain pullRequestId and sourceRefName")
+    if target != pr_target:
+        result["ignored"] = f"target is not '{pr_target}'"
+        return result
+
+    status = resource.get("status")
+    commit = (resource.get("lastMergeSourceCommit") or {}).get("commitId")
+    if status == "active":
+        entry = pr_index.peek(repo_id, source)
+        if entry is not None and entry["pr_id"] == int(pr_id) and entry["source_commit"] == commit:
+            return result
+        if commit and remaining > 0:
+            pr_index.put(repo_id, source, pr_id, commit, ttl=remaining)
+            result["applied"] = 1
+        elif entry is not None:
+            # Event eski ya da commit'siz: index'teki kayda güvenilmez, PrApprove aramaya düşer
+            pr_index.remove(repo_id, source)
+            result["applied"] = 1
+    elif status in ("completed", "abandoned"):
+        pr_index.remove(repo_id, source, pr_id=pr_id)
+        if status == "completed":
+            # Merge target'ı ilerletir; push event'i gecikirse eski head okunmasın
+            ref_cache.invalidate(repo_id, target)
+        result["applied"] = 1
+    else:
+        result["ignored"] = f"status '{status}'"
+    return result
@@ -0,0 +1,276 @@
+"""
+Worker'lar arasında paylaşılan durum (state) store'u.
+
+Her worker process'i kendi cache'lerini ayrı ısıtır; soğuk worker'lar burst
+sırasında ADO'ya tam yük bindirir. Bu modül ref SHA, PR id, idempotency ve job
+kayıtları için ortak bir anahtar-değer katmanı sağlar. Bellekteki LRU katmanı
+(RefCache, PrIndex, IdempotencyCache) önde kalır, store paylaşılan katmandır:
+- MemoryStateStore: process içi KV (local / test için paylaşılan katmanın yerine geçer)
+- SqliteStateStore: aynı instance'taki worker process'lerinin paylaştığı yerel sqlite
+  dosyası. sqlite kilitleri ağ dosya sistemlerinde (SMB / Azure Files) güvenilir
+  olmadığından dosya instance'lar arasında paylaşılmamalıdır.
+
+Store çağrıları senkron ve event loop üzerindedir; sqlite'ın busy timeout'u bu
+yüzden kısa tutulur. Kilit beklemesi aşılırsa çağrı hata sayar ve bellek
+katmanıyla devam edilir (loop saniyelerce bloklanmaz).
+
+Her kayıt bir sürüm (version) taşır. put/delete'e beklenen sürüm verilirse yazma
+sadece kayıt o sürümdeyse yapılır (compare-and-set; 0 = kayıt yok). Süresi dolmuş
+kayıtlar yok sayılır. Aynı mekanizma üzerinden lease'li kilitler (lock) verilir.
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+
+# value: JSON'a çevrilebilir değer, version: her yazmada artan sürüm, expires_at: time.time() bazında (None = süresiz)
+StateEntry = namedtuple("StateEntry", ["value", "version", "expires_at"])
+
+
+class StateStore:
+    """get/put/delete/clear sağlayan store'lar için ortak kilit ve sayaç mantığı."""
+
+    def __init__(self):
+        self.conflicts = 0
+        self.lock_waits = 0
+        self.lock_timeouts = 0
+
+    def get(self, namespace: str, key: str):
+        raise NotImplementedError
+
+    def put(self, namespace: str, key: str, value, ttl: float = None, version: int = None):
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str, version: int = None) -> bool:
+        raise NotImplementedError
+
+    def clear(self, namespace: str) -> None:
+        raise NotImplementedError
+
+    @contextlib.asynccontextmanager
+    async def lock(self, namespace: str, key: str, lease: float = 30.0, timeout: float = 10.0, poll: float = 0.05):
+        """
+        Worker'lar arası lease'li kilit. Blok boyunca kilit tutulursa True, timeout içinde
+        alınamazsa False verir (çağıran kilitsiz devam edip etmeyeceğine kendi karar verir).
+        Kilidi tutan worker düşerse kayıt lease sonunda süresi dolmuş sayılır.
+        """
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + timeout
+        version = None
+        waited = False
+        while True:
+            version = self._try_lock(namespace, key, owner, lease)
+            if version is not None or time.monotonic() >= deadline:
+                break
+            waited = True
+            await asyncio.sleep(poll)
+        if waited:
+            self.lock_waits += 1
+        if version is None:
+            self.lock_timeouts += 1
+            logging.warning(f"Could not acquire state lock {namespace}/{key} within {timeout:g}s")
+        try:
+            yield version is not None
+        finally:
+            if version is not None:
+                self._unlock(namespace, key, version)
+
+    def _try_lock(self, namespace: str, key: str, owner: str, lease: float):
+        """Kilit kaydını yoksa (ya da süresi dolmuşsa) yazar; sürümü ya da None döndürür."""
+        return self.put(namespace, key, {"owner": owner}, ttl=lease, version=0)
+
+    def _unlock(self, namespace: str, key: str, version: int) -> None:
+        self.delete(namespace, key, version=version)
+
+    def _counters(self) -> dict:
+        return {"conflicts": self.conflicts, "lock_waits": self.lock_waits, "lock_timeouts": self.lock_timeouts}
+
+
+class MemoryStateStore(StateStore):
+    """
+    Process içi, LRU ile sınırlandırılmış KV; (namespace, key) -> StateEntry.
+    Kilitler LRU dışında ayrı tutulur (tutulan bir kilit cache baskısıyla atılmaz, lease ile düşer).
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._next_version = 0
+
+    def _live(self, key, entries=None):
+        entries = self._entries if entries is None else entries
+        entry = entries.get(key)
+        if entry is not None and entry.expires_at is not None and entry.expires_at <= time.time():
+            del entries[key]
+            return None
+        return entry
+
+    def _try_lock(self, namespace: str, key: str, owner: str, lease: float):
+        with self._lock:
+            if self._live((namespace, key), self._locks) is not None:
+                self.conflicts += 1
+                return None
+            self._next_version += 1
+            self._locks[(namespace, key)] = StateEntry({"owner": owner}, self._next_version, time.time() + lease)
+            return self._next_version
+
+    def _unlock(self, namespace: str, key: str, version: int) -> None:
+        with self._lock:
+            current = self._live((namespace, key), self._locks)
+            if current is not None and current.version == version:
+                del self._locks[(namespace, key)]
+
+    def get(self, namespace: str, key: str):
+        with self._lock:
+            entry = self._live((namespace, key))
+            if entry is not None:
+                self._entries.move_to_end((namespace, key))
+            return entry
+
+    def put(self, namespace: str, key: str, value, ttl: float = None, version: int = None):
+        """Yeni sürümü döndürür; beklenen sürüm tutmazsa None (kayıt değişmez)."""
+        with self._lock:
+            current = self._live((namespace, key))
+            if version is not None and (current.version if current else 0) != version:
+                self.conflicts += 1
+                return None
+            self._next_version += 1
+            self._entries[(namespace, key)] = StateEntry(
+                json.loads(json.dumps(value)), self._next_version, time.time() + ttl if ttl is not None else None
+            )
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return self._next_version
+
+    def delete(self, namespace: str, key: str, version: int = None) -> bool:
+        with self._lock:
+            current = self._live((namespace, key))
+            if current is None:
+                return False
+            if version is not None and current.version != version:
+                self.conflicts += 1
+                return False
+            del self._entries[(namespace, key)]
+            return True
+
+    def clear(self, namespace: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = len(self._entries)
+            locks = sum(1 for key in list(self._locks) if self._live(key, self._locks) is not None)
+        return {"backend": "memory", "entries": entries, "locks": locks, **self._counters()}
+
+
+class SqliteStateStore(StateStore):
+    """Yerel sqlite dosyasında tutulan, aynı makinedeki birden fazla process'in aynı anda kullanabildiği KV."""
+
+    def __init__(self, path: str, busy_timeout: float = 0.1):
+        super().__init__()
+        self.path = path
+        self.errors = 0
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.Error as e:
+            logging.warning(f"Could not enable WAL for state store at {path}: {str(e)}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS state (namespace TEXT, key TEXT, value TEXT, version INTEGER,"
+            " expires_at REAL, PRIMARY KEY (namespace, key))"
+        )
+        self._purge_expired()
+
+    def _purge_expired(self) -> None:
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM state WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+            except sqlite3.Error as e:
+                self._failed("purge", e, None)
+
+    def _row(self, namespace: str, key: str):
+        row = self._conn.execute(
+            "SELECT value, version, expires_at FROM state WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if row is None or (row[2] is not None and row[2] <= time.time()):
+            return None, row[1] if row else 0
+        return StateEntry(json.loads(row[0]), row[1], row[2]), row[1]
+
+    def get(self, namespace: str, key: str):
+        with self._lock:
+            try:
+                return self._row(namespace, key)[0]
+            except sqlite3.Error as e:
+                return self._failed("lookup", e, None)
+
+    def put(self, namespace: str, key: str, value, ttl: float = None, version: int = None):
+        """Yeni sürümü döndürür; beklenen sürüm tutmazsa None (kayıt değişmez)."""
+        with self._lock:
+            try:
+                # Sürüm kontrolü ve yazma diğer process'lere karşı tek yazma transaction'ında;
+                # kilit busy timeout içinde alınamazsa ("database is locked") yazma hata sayılır
+                self._conn.execute("BEGIN IMMEDIATE")
+                current, stored_version = self._row(namespace, key)
+                if version is not None and (current.version if current else 0) != version:
+                    self._conn.execute("ROLLBACK")
+                    self.conflicts += 1
+                    return None
+                # Süresi dolmuş kaydın üzerine yazılırken de sürüm artar (eski sahibinin silmesi tutmaz)
+                new_version = stored_version + 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO state VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, json.dumps(value), new_version, time.time() + ttl if ttl is not None else None)
+                )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                return self._failed("write", e, None)
+            return new_version
+
+    def delete(self, namespace: str, key: str, version: int = None) -> bool:
+        with self._lock:
+            try:
+                if version is None:
+                    return self._conn.execute("DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key)).rowcount > 0
+                deleted = self._conn.execute(
+                    "DELETE FROM state WHERE namespace = ? AND key = ? AND version = ?", (namespace, key, version)
+                ).rowcount > 0
+            except sqlite3.Error as e:
+                return self._failed("delete", e, False)
+            if not deleted:
+                self.conflicts += 1
+            return deleted
+
+    def clear(self, namespace: str) -> None:
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM state WHERE namespace = ?", (namespace,))
+            except sqlite3.Error as e:
+                self._failed("clear", e, None)
+
+    def _failed(self, operation: str, error: Exception, default):
+        # Paylaşılan katman erişilemezse bellek katmanıyla devam edilir (PrIndex'teki davranış)
+        self.errors += 1
+        logging.warning(f"State store {operation} failed: {str(error)}")
+        return default
+
+    def stats(self) -> dict:
+        with self._lock:
+            try:
+                entries = self._conn.execute("SELECT COUNT(*) FROM state").fetchone()[0]
+            except sqlite3.Error:
+                entries = None
+        return {"backend": "sqlite", "entries": entries, "errors": self.errors, **self._counters()}
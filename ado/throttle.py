@@ -0,0 +1,121 @@
+"""
+Azure DevOps rate limit'ine uyumlu giden istek sınırlayıcısı.
+
+ADO, kullanıcı başına kota dolmaya yaklaşınca X-RateLimit-* header'ları,
+dolunca 429 + Retry-After döndürür. Tüm istekler tek bir token bucket'tan
+geçer; bucket'ın hızı bu header'lara göre düşürülür, Retry-After süresince
+yeni istek gönderilmez ve kota açıldıkça hız yapılandırılan değere geri döner.
+"""
+import asyncio
+import email.utils
+import random
+import threading
+import time
+
+
+def parse_retry_after(value) -> float:
+    """Retry-After değerini (saniye ya da HTTP-date) saniyeye çevirir; geçersizse None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: float = None) -> float:
+    """Full-jitter exponential backoff; Retry-After daha uzunsa ona uyulur."""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket: saniyede `rate` istek, en fazla `burst` ani istek.
+    observe() ile ADO cevap header'larına göre hızı ve duraklamayı ayarlar.
+    """
+
+    def __init__(self, rate: float = 20.0, burst: int = 40, min_rate: float = 1.0):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min(min_rate, rate)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.throttled = 0
+        self.adjustments = 0
+
+    def _refill_locked(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Bir token alınana kadar (ve varsa Retry-After duraklaması bitene kadar) bekler."""
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill_locked(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    if waited:
+                        self.waits += 1
+                    return
+                delay = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            waited = True
+            await asyncio.sleep(delay)
+
+    def observe(self, status: int, headers) -> None:
+        """Cevap header'larından Retry-After ve X-RateLimit-Remaining/Reset bilgisini uygular."""
+        retry_after = parse_retry_after(headers.get("Retry-After")) if headers else None
+        remaining = headers.get("X-RateLimit-Remaining") if headers else None
+        reset = headers.get("X-RateLimit-Reset") if headers else None
+        now = time.monotonic()
+
+        with self._lock:
+            if status == 429:
+                self.throttled += 1
+            if retry_after is not None and status in (429, 503):
+                # Duraklama süresince biriken token'lar kullanılmasın
+                self._paused_until = max(self._paused_until, now + retry_after)
+                self._tokens = 0.0
+
+            if remaining is not None:
+                try:
+                    remaining = float(remaining)
+                    window = max(1.0, float(reset) - time.time()) if reset else 1.0
+                except ValueError:
+                    return
+                # Kalan kotayı reset'e kadar eşit dağıt; kota bolsa yapılandırılan hıza dön
+                new_rate = min(self.base_rate, max(self.min_rate, remaining / window))
+            elif status < 400:
+                # Header gelmiyorsa kota baskısı yok; hızı kademeli olarak geri artır
+                new_rate = min(self.base_rate, self.rate * 1.1)
+            else:
+                return
+
+            if new_rate != self.rate:
+                self._refill_locked(now)
+                self.rate = new_rate
+                self.adjustments += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate_per_second": round(self.rate, 2),
+                "base_rate_per_second": self.base_rate,
+                "burst": self.burst,
+                "paused_seconds": round(max(0.0, self._paused_until - time.monotonic()), 2),
+                "waits": self.waits,
+                "throttled": self.throttled,
+                "adjustments": self.adjustments,
+            }
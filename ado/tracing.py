@@ -0,0 +1,91 @@
+"""
+İstek bazında aşama (stage) süre ölçümü.
+
+Her HTTP isteği için bir RequestTrace açılır ve contextvar üzerinden handler
+içindeki span()'lara ulaşır; asyncio.gather ile başlatılan paralel adımlar da
+aynı trace'e yazar. İstek bitince aşamalar tek bir yapılandırılmış log
+satırında (ve istenirse ?debug_timing=1 ile JSON cevapta) raporlanır.
+"""
+import contextlib
+import contextvars
+import time
+
+_current_trace = contextvars.ContextVar("ado_request_trace", default=None)
+
+
+class RequestTrace:
+    """Bir isteğin başlangıca göre ms cinsinden aşama süreleri."""
+
+    def __init__(self, route: str):
+        self.route = route
+        self.started = time.perf_counter()
+        self.ended = None
+        self.stages = []
+
+    def add(self, name: str, started: float, ended: float, error: bool = False) -> None:
+        # İstek bittikten sonra (ör. merge train'in sonraki batch'i) gelen kayıtlar yok sayılır
+        if self.ended is not None:
+            return
+        stage = {
+            "stage": name,
+            "start_ms": round((started - self.started) * 1000, 1),
+            "duration_ms": round((ended - started) * 1000, 1),
+        }
+        if error:
+            stage["error"] = True
+        self.stages.append(stage)
+
+    def finish(self) -> None:
+        if self.ended is None:
+            self.ended = time.perf_counter()
+
+    def summary(self) -> dict:
+        ended = self.ended if self.ended is not None else time.perf_counter()
+        return {"total_ms": round((ended - self.started) * 1000, 1), "stages": sorted(self.stages, key=lambda stage: stage["start_ms"])}
+
+
+def start_trace(route: str):
+    """Yeni trace açar; (trace, token) döndürür, token end_trace'e verilir."""
+    trace = RequestTrace(route)
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(trace: RequestTrace, token) -> None:
+    trace.finish()
+    _current_trace.reset(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+async def traced(name: str, aw):
+    """Awaitable'ı span içinde bekler; asyncio.gather ile paralel adımları ölçmek için."""
+    with span(name):
+        return await aw
+
+
+@contextlib.contextmanager
+def span(name: str, traces=None):
+    """
+    Bloğun süresini aşama olarak kaydeder. traces verilmezse çalışan isteğin
+    trace'ine yazar; merge train gibi birden fazla isteğe hizmet eden kod
+    ilgili trace'leri açıkça geçer.
+    """
+    if traces is None:
+        traces = [_current_trace.get()]
+    traces = [t for t in traces if t is not None]
+    if not traces:
+        yield
+        return
+    started = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        ended = time.perf_counter()
+        for trace in traces:
+            trace.add(name, started, ended, error)
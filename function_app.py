@@ -2,11 +2,129 @@ import azure.functions as func
 import logging
 import os
 import json
+import asyncio
+import math
+import re
+import time
+import base64
+import datetime
+import functools
+import hmac
+import tempfile
+import urllib.error
+import urllib.parse
+
+from ado import AdmissionController, AdmissionRejected, AdoClient, AncestryCache, CircuitBreaker, CircuitOpenError, IdempotencyCache, MemoryStateStore, MergeTrain, MetricsRegistry, PrIndex, RefCache, RepoRegistry, SqliteStateStore, TokenBucket
+from ado import jobs, lookups, service_hooks, tracing
 
 app = func.FunctionApp()
 
-# Repo mapping
-REPO_MAP = {
+# Route ve ADO işlemi bazında sayaç/histogramlar (/api/metrics, Prometheus formatı)
+metrics = MetricsRegistry()
+
+# Tüm fonksiyonların paylaştığı keep-alive Azure DevOps istemcisi (warm worker'da yeniden kullanılır).
+# Giden istekler ADO rate limit header'larına uyum sağlayan ortak bir token bucket'tan geçer.
+ado = AdoClient(
+    limiter=TokenBucket(
+        rate=float(os.environ.get("ADO_RATE_LIMIT_RPS", "50")),
+        burst=int(os.environ.get("ADO_RATE_LIMIT_BURST", "100"))
+    ),
+    max_retries=int(os.environ.get("ADO_MAX_RETRIES", "3")),
+    backoff_base=float(os.environ.get("ADO_BACKOFF_BASE_MS", "500")) / 1000,
+    metrics=metrics,
+    # Okumalar kısa, ADO tarafında iş yapan yazmalar (merge, PR create/complete) daha uzun timeout ile
+    timeout=float(os.environ.get("ADO_TIMEOUT_SECONDS", "10")),
+    operation_timeouts={
+        operation: float(os.environ.get("ADO_WRITE_TIMEOUT_SECONDS", "30"))
+        for operation in ("ref_update", "merge", "pr_create", "pr_patch")
+    },
+    # ADO kesintisinde org/repo devresi açılır, handler'lar thread bağlamadan 503 döner
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.environ.get("ADO_BREAKER_FAILURE_THRESHOLD", "5")),
+        reset_timeout=float(os.environ.get("ADO_BREAKER_RESET_SECONDS", "30"))
+    ),
+    # Worker ve repo başına eşzamanlı ADO çağrısı sınırı; yazmalar kuyrukta okumalardan önce, kuyruk doluysa 429
+    admission=AdmissionController(
+        max_concurrency=int(os.environ.get("ADO_MAX_CONCURRENCY", "16")),
+        per_repo=int(os.environ.get("ADO_MAX_CONCURRENCY_PER_REPO", "4")),
+        max_queue=int(os.environ.get("ADO_ADMISSION_QUEUE_SIZE", "32")),
+        max_queue_per_repo=int(os.environ.get("ADO_ADMISSION_QUEUE_SIZE_PER_REPO", "8")),
+        queue_timeout=float(os.environ.get("ADO_ADMISSION_QUEUE_TIMEOUT_SECONDS", "5"))
+    )
+)
+
+def _build_state_store():
+    """
+    STATE_STORE_BACKEND'e göre worker'ların paylaştığı state store'u oluşturur.
+    none (varsayılan): her worker sadece kendi bellek cache'lerini kullanır.
+    """
+    backend = os.environ.get("STATE_STORE_BACKEND", "none")
+    if backend == "sqlite":
+        path = os.environ.get("STATE_STORE_PATH", os.path.join(tempfile.gettempdir(), "ado_state.sqlite"))
+        try:
+            # Store loop üzerinde senkron çağrılır; kilit beklemesi kısa tutulur, aşılırsa bellek katmanıyla devam edilir
+            return SqliteStateStore(path, busy_timeout=float(os.environ.get("STATE_STORE_BUSY_TIMEOUT_MS", "100")) / 1000)
+        except Exception as e:
+            logging.warning(f"Could not open state store at {path}, caches stay per worker: {str(e)}")
+            return None
+    if backend == "memory":
+        return MemoryStateStore(max_entries=int(os.environ.get("STATE_STORE_MAX_ENTRIES", "10000")))
+    return None
+
+
+# Ref SHA, PR id, idempotency ve job kayıtlarının worker'lar arasında paylaşılan katmanı; bellekteki cache'ler önünde kalır
+state_store = _build_state_store()
+
+# dev/test head'leri için kısa TTL'li ref cache - uygulamanın kendi ref yazımlarında güncellenir
+ref_cache = RefCache(
+    ttl=float(os.environ.get("REF_CACHE_TTL_SECONDS", "10")),
+    max_entries_per_repo=int(os.environ.get("REF_CACHE_MAX_ENTRIES", "64")),
+    store=state_store
+)
+
+# Jira'nın tekrar gönderdiği aynı (endpoint, ticket, repo) çağrılarını birleştirir ve kısa süre tekrar oynatır
+idempotency = IdempotencyCache(
+    window=float(os.environ.get("IDEMPOTENCY_WINDOW_SECONDS", "30")),
+    max_entries=int(os.environ.get("IDEMPOTENCY_MAX_ENTRIES", "1024")),
+    store=state_store
+)
+
+
+def _dev_merge_lock(repo_id: str):
+    """Worker'lar arası repo kilidi: aynı anda tek bir worker dev üzerine batch kurar."""
+    return state_store.lock(
+        "locks", f"devmerge:{repo_id}",
+        lease=float(os.environ.get("DEV_MERGE_LOCK_LEASE_SECONDS", "60")),
+        timeout=float(os.environ.get("DEV_MERGE_LOCK_TIMEOUT_SECONDS", "10"))
+    )
+
+
+# Aynı repoya kısa pencerede gelen DevMerge'leri tek dev ref update'inde toplayan kuyruk
+merge_train = MergeTrain(
+    window=float(os.environ.get("MERGE_TRAIN_WINDOW_MS", "150")) / 1000,
+    max_batch=int(os.environ.get("MERGE_TRAIN_MAX_BATCH", "20")),
+    max_attempts=int(os.environ.get("MERGE_TRAIN_MAX_ATTEMPTS", "3")),
+    lock=_dev_merge_lock if state_store is not None else None
+)
+
+# PrOpen'ın açtığı PR'lar: PrApprove pr_id olmadan geldiğinde PR aramasını ve detay GET'ini atlar
+# (state store varsa kayıtlar orada, yoksa PR_INDEX_PATH dosyasında tutulur)
+pr_index = PrIndex(
+    path=os.environ.get("PR_INDEX_PATH", os.path.join(tempfile.gettempdir(), "ado_pr_index.sqlite")),
+    max_entries=int(os.environ.get("PR_INDEX_MAX_ENTRIES", "1024")),
+    store=state_store
+)
+
+# DevMerge: feature branch dev'e zaten merge edilmiş mi? (SHA çifti bazında, süresiz LRU)
+ancestry_cache = AncestryCache(
+    max_entries=int(os.environ.get("ANCESTRY_CACHE_MAX_ENTRIES", "4096"))
+)
+
+# Çoklu repo işlemlerinde aynı anda çalışan en fazla ADO işlemi
+FANOUT_MAX_CONCURRENCY = int(os.environ.get("FANOUT_MAX_CONCURRENCY", "5"))
+
+# Bilinen repolar: ADO'dan liste alınamazsa (ya da henüz alınmadıysa) fallback olarak kullanılır
+STATIC_REPO_MAP = {
     "CustomsOnlineAI": "4890959d-88d1-4ca0-a3ed-f114ac012f13",
     "CustomsOnlineAngular": "8b7baf0c-0000-49d2-a874-254bc6478103",
     "CustomsOnlineBackEnd": "ff0446c2-c9c2-4dea-a598-2226fb886392",
@@ -14,12 +132,432 @@ REPO_MAP = {
     "CTJira": "37b3a1ae-60f2-4ab8-9d2b-da5d8ba743e2"
 }
 
+# Uygulamanın yönettiği repolar: 'repo=all' ve repo verilmeyen toplu işlemler sadece bunları dolaşır.
+# REPO_MAP projedeki tüm repoları isimden çözebilir, ama varsayılan kapsamı genişletmez.
+MANAGED_REPOS = [r.strip() for r in os.environ.get("MANAGED_REPOS", ",".join(STATIC_REPO_MAP)).split(",") if r.strip()]
+
+
+async def _fetch_repo_map() -> dict:
+    """Projedeki (disabled olmayan) repoların isim -> id eşlemesini ADO repositories API'sinden alır."""
+    auth_headers = _ado_auth_headers()
+    if auth_headers is None:
+        raise ValueError("AZURE_PAT environment variable not set")
+    url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories?api-version=7.1-preview.1"
+    repos = (await ado.request(url, headers=auth_headers)).get("value", [])
+    return {repo["name"]: repo["id"] for repo in repos if not repo.get("isDisabled")}
+
+
+# Repo mapping: dict gibi kullanılır; ADO'dan TTL ile arka planda yenilenir ve dosyada saklanır
+REPO_MAP = RepoRegistry(
+    STATIC_REPO_MAP,
+    fetch=_fetch_repo_map,
+    ttl=float(os.environ.get("REPO_MAP_TTL_SECONDS", "3600")),
+    persist_path=os.environ.get("REPO_MAP_CACHE_PATH", os.path.join(tempfile.gettempdir(), "ado_repo_map.json")),
+    miss_refresh_interval=float(os.environ.get("REPO_MAP_MISS_REFRESH_SECONDS", "60"))
+)
+
 # Branch regex kontrolü - SADECE STRING OLARAK
 BRANCH_REGEX = r"(?i)^(?!.*\s)(?:AI|BE|CT|DO|FE|MP|SQL|TD|UI)-\d+(?:-[a-z0-9]+){2,}$"
 
 AZURE_ORG = "customstechnologies"
 AZURE_PROJECT = "CustomsOnline"
 
+# REST API kök adresi; local emülatör (tools/fake_ado.py) için değiştirilebilir
+AZURE_DEVOPS_URL = os.environ.get("AZURE_DEVOPS_URL", "https://dev.azure.com").rstrip('/')
+
+# Geçerli ticket prefix'leri ve silinemeyen branch'ler
+VALID_PREFIXES = ["AI-", "BE-", "CT-", "DO-", "FE-", "MP-", "SQL-", "TD-", "UI-"]
+PROTECTED_BRANCHES = ["main", "master", "dev", "develop", "release"]
+
+ZERO_SHA = "0000000000000000000000000000000000000000"
+
+# Tek refs POST'unda gönderilecek en fazla ref update sayısı
+REFS_BATCH_SIZE = int(os.environ.get("REFS_BATCH_SIZE", "100"))
+
+# Aktif PR listelemesinde sayfa başına PR sayısı
+ACTIVE_PR_PAGE_SIZE = 1000
+
+# Ticket prefix kontrolü için tek str.startswith çağrısı
+_VALID_PREFIX_TUPLE = tuple(VALID_PREFIXES)
+
+
+@functools.lru_cache(maxsize=4)
+def _basic_auth_headers(azure_pat: str) -> dict:
+    return {"Authorization": f"Basic {base64.b64encode(f':{azure_pat}'.encode()).decode()}"}
+
+
+def _ado_auth_headers():
+    """
+    AZURE_PAT için Basic auth header'ı; PAT başına bir kez hesaplanır ve tüm istekler aynı
+    (değiştirilmemesi gereken) dict'i kullanır. PAT tanımlı değilse None döner.
+    """
+    azure_pat = os.environ.get("AZURE_PAT")
+    return _basic_auth_headers(azure_pat) if azure_pat else None
+
+
+# Worker açılırken header'ı hazırla; ilk istek base64 hesaplamasını beklemez
+_ado_auth_headers()
+
+def _branch_name_error(ticket: str):
+    """
+    Branch isminin prefix kontrolü (folder/branch formatı dahil).
+    Geçerliyse None, değilse (error, example) döndürür.
+    """
+    if '/' in ticket:
+        # folder/branch formatı: herhangi-folder/AI-123-feature -> AI-123-feature kısmını kontrol et
+        branch_part = ticket.split('/')[-1].upper()
+        if not branch_part.startswith(_VALID_PREFIX_TUPLE):
+            return (
+                f"Branch part '{branch_part}' must start with valid prefix: {', '.join(VALID_PREFIXES)}",
+                "developer/AI-123-feature-name or AI-123-feature-name"
+            )
+    elif not ticket.upper().startswith(_VALID_PREFIX_TUPLE):
+        # Direkt branch formatı: AI-123-feature
+        return (
+            f"Ticket must start with valid prefix: {', '.join(VALID_PREFIXES)}",
+            "AI-123-feature-name"
+        )
+    return None
+
+
+async def _gather_or_raise(*aws):
+    """Bağımsız çağrıları asyncio.gather ile paralel çalıştırır; hata varsa verilen sıradaki ilkini fırlatır."""
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+def _instrumented(route: str):
+    """
+    Handler'ın süresini ve status kodunu route etiketiyle metrics'e yazar (sync ve async handler'lar için).
+    İstek boyunca bir aşama trace'i açar, bitişte aşama sürelerini tek log satırı olarak yazar;
+    ?debug_timing=1 verilirse JSON cevaba 'timing' alanı olarak da ekler.
+    """
+    def _finish(req, resp, trace, token, status_code):
+        tracing.end_trace(trace, token)
+        summary = trace.summary()
+        metrics.observe_request(route, status_code, summary["total_ms"] / 1000)
+        logging.info(json.dumps({"event": "request_timing", "route": route, "status": status_code, **summary}))
+        if resp is None or req.params.get('debug_timing') != '1' or resp.mimetype != "application/json":
+            return resp
+        try:
+            body = json.loads(resp.get_body())
+        except ValueError:
+            return resp
+        if not isinstance(body, dict):
+            return resp
+        body["timing"] = summary
+        return func.HttpResponse(json.dumps(body), status_code=resp.status_code, mimetype=resp.mimetype, headers=dict(resp.headers))
+
+    def decorator(handler):
+        if asyncio.iscoroutinefunction(handler):
+            @functools.wraps(handler)
+            async def wrapper(req: func.HttpRequest) -> func.HttpResponse:
+                trace, token = tracing.start_trace(route)
+                resp = None
+                try:
+                    resp = await handler(req)
+                finally:
+                    resp = _finish(req, resp, trace, token, resp.status_code if resp is not None else 500)
+                return resp
+        else:
+            @functools.wraps(handler)
+            def wrapper(req: func.HttpRequest) -> func.HttpResponse:
+                trace, token = tracing.start_trace(route)
+                resp = None
+                try:
+                    resp = handler(req)
+                finally:
+                    resp = _finish(req, resp, trace, token, resp.status_code if resp is not None else 500)
+                return resp
+        return wrapper
+    return decorator
+
+
+def _circuit_open_response(retry_after: float, repo_name: str = None, error: str = None) -> func.HttpResponse:
+    target = f"repository '{repo_name}'" if repo_name else "Azure DevOps"
+    body = {
+        "status": "ADO_UNAVAILABLE",
+        "message": f"⛔ {target} is currently unavailable, please retry in {math.ceil(retry_after)}s.",
+        "retry_after": math.ceil(retry_after),
+        "success": False
+    }
+    if error:
+        body["error"] = error
+    return func.HttpResponse(json.dumps(body), status_code=503, mimetype="application/json",
+                             headers={"Retry-After": str(math.ceil(retry_after))})
+
+
+def _overloaded_response(retry_after: float, repo_name: str = None, error: str = None) -> func.HttpResponse:
+    target = f"repository '{repo_name}'" if repo_name else "Azure DevOps"
+    body = {
+        "status": "TOO_MANY_REQUESTS",
+        "message": f"⏳ Too many concurrent operations for {target}, please retry in {math.ceil(retry_after)}s.",
+        "retry_after": math.ceil(retry_after),
+        "success": False
+    }
+    if error:
+        body["error"] = error
+    return func.HttpResponse(json.dumps(body), status_code=429, mimetype="application/json",
+                             headers={"Retry-After": str(math.ceil(retry_after))})
+
+
+def _response_error(resp: func.HttpResponse):
+    """Handler cevabındaki ADO hata metni (handler'lar HTTPError gövdesini 'error' ya da 'details' alanına yazar)."""
+    try:
+        body = json.loads(resp.get_body())
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(body, dict):
+        return None
+    for field in ("error", "details"):
+        if isinstance(body.get(field), str) and body[field].startswith("{"):
+            return body[field]
+    return body.get("error") if isinstance(body.get("error"), str) else None
+
+
+def _error_type_key(error: str):
+    """ADO hata gövdesindeki typeKey (AdmissionRejected / CircuitOpenError gövdeleri dahil)."""
+    try:
+        return json.loads(error).get("typeKey")
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _request_repo_name(req: func.HttpRequest):
+    """İsteğin tek repo adı: 'repo' query parametresi, yoksa JSON body'deki 'repo' (bulk endpoint'ler)."""
+    repo_name = req.params.get('repo')
+    if repo_name:
+        return repo_name
+    try:
+        body = req.get_json()
+    except ValueError:
+        return None
+    return body.get('repo') if isinstance(body, dict) and isinstance(body.get('repo'), str) else None
+
+
+def _fail_fast(handler=None, *, write: bool = False):
+    """
+    Handler'ı hiç çalıştırmadan reddeder: ADO circuit breaker'ı (org ya da istenen repo) açıksa 503,
+    admission yük atıyorsa 429 (ikisi de Retry-After ile).
+    Handler istek başına bir admission slot'u içinde çalışır (slot beklemesi queue_timeout'u aşarsa 429);
+    içindeki ADO çağrıları ayrıca slot almaz. ADO'ya yazan route'lar @_fail_fast(write=True) ile işaretlenir,
+    kuyrukta okumalardan önce slot alırlar. Birden fazla repoya yayılan istekler repo'suz slot tutar; her
+    repo için ayrıca ado.request_slot(url, repo_id) alınır. Handler devre ya da admission yüzünden 5xx
+    döndürdüyse cevap da aynı şekilde çevrilir.
+    """
+    if handler is None:
+        return functools.partial(_fail_fast, write=write)
+
+    @functools.wraps(handler)
+    async def wrapper(req: func.HttpRequest) -> func.HttpResponse:
+        repo_name = _request_repo_name(req)
+        repo_id = REPO_MAP[repo_name] if repo_name and repo_name in REPO_MAP else None
+        retry_after = ado.circuit_retry_after(repo_id)
+        if retry_after is not None:
+            logging.warning(f"ADO circuit open, rejecting {req.url} (retry after {retry_after:.1f}s)")
+            # Sadece repo devresi açıksa mesajda repo adı geçer
+            repo_only = ado.circuit_retry_after() is None
+            return _circuit_open_response(retry_after, repo_name if repo_only else None)
+        retry_after = ado.admission_retry_after(repo_id)
+        if retry_after is not None:
+            logging.warning(f"ADO admission overloaded, shedding {req.url} (retry after {retry_after:.1f}s)")
+            return _overloaded_response(retry_after, repo_name if repo_id else None)
+
+        try:
+            async with ado.request_slot(req.url, repo_id, write=write):
+                resp = await handler(req)
+        except AdmissionRejected as e:
+            logging.warning(f"ADO admission rejected {req.url} (retry after {e.retry_after:.1f}s)")
+            return _overloaded_response(e.retry_after, repo_name if repo_id else None)
+        if resp.status_code >= 500:
+            error = _response_error(resp)
+            type_key = _error_type_key(error)
+            retry_after = ado.circuit_retry_after(repo_id)
+            if retry_after is not None:
+                return _circuit_open_response(retry_after, error=error)
+            if type_key == CircuitOpenError.TYPE_KEY:
+                # Probe sürerken reddedildi; devre cevap anında kapanmış olabilir, kısa süre sonra tekrar denenir
+                return _circuit_open_response(json.loads(error).get("retry_after") or 1.0, error=error)
+            if type_key == AdmissionRejected.TYPE_KEY:
+                return _overloaded_response(ado.admission.retry_after_seconds, error=error)
+        return resp
+    return wrapper
+
+
+# Tekrar oynatılabilecek cevaplar: tam başarı ve tekrar denense de değişmeyecek kesin sonuçlar
+# (400 parametre/isim hatası, 403 protected branch). 207 (kısmi başarı), 404 (PR/branch henüz yok),
+# 409 (eşzamanlı güncelleme, "tekrar deneyin"), 429/5xx (geçici) cache'lenmez; tekrar gelen istek yeniden çalışır.
+IDEMPOTENT_CACHEABLE_STATUS = (200, 201, 400, 403)
+
+
+def _idempotent(endpoint: str, key_params=("ticket", "repo")):
+    """
+    Handler'ı idempotency katmanıyla sarar: aynı (endpoint, ticket, repo) ile süren bir istek varsa
+    onun sonucunu paylaşır, bitmiş bir istek varsa pencere süresince sonucu tekrar oynatır.
+    Sadece IDEMPOTENT_CACHEABLE_STATUS cevapları tekrar oynatılır; tekrar oynatılan cevaplarda
+    'X-Idempotent-Replay: true' header'ı bulunur.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(req: func.HttpRequest) -> func.HttpResponse:
+            values = tuple(req.params.get(name) for name in key_params)
+            if not all(values[:2]):
+                return await handler(req)
+            
+            async def _run():
+                resp = await handler(req)
+                # Sonuç paylaşılan state store'a JSON olarak yazılabilsin diye gövde metin olarak tutulur
+                return resp.status_code, resp.get_body().decode(), resp.mimetype, dict(resp.headers)
+            
+            (status_code, body, mimetype, headers), replayed = await idempotency.run(
+                (endpoint,) + values, _run, cacheable=lambda result: result[0] in IDEMPOTENT_CACHEABLE_STATUS
+            )
+            if replayed:
+                logging.info(f"{endpoint}: duplicate request for {values} served from idempotency cache")
+                headers = {**headers, "X-Idempotent-Replay": "true"}
+            return func.HttpResponse(body, status_code=status_code, mimetype=mimetype, headers=headers)
+        return wrapper
+    return decorator
+
+
+# --- Asenkron job modu (?async=1) ---
+# Storage Queue backend'inde mesajları AdoJobWorker fonksiyonu işler
+JOB_QUEUE_NAME = "ado-jobs"
+
+
+async def _validate_job_request(endpoint: str, req: func.HttpRequest):
+    """
+    Job kuyruğa atılmadan önce yapılan hızlı kontroller (parametre, REPO_MAP, prefix, protected branch).
+    Hata varsa HttpResponse, yoksa None döndürür.
+    """
+    ticket = req.params.get('ticket')
+    repo_param = req.params.get('repo')
+    if not ticket or not repo_param:
+        return func.HttpResponse(json.dumps({"status": "MISSING_PARAMETERS", "message": "❌ 'ticket' and 'repo' parameters are required", "success": False}), status_code=400, mimetype="application/json")
+    
+    if endpoint == "newBranch" and repo_param.strip().lower() == "all":
+        repo_names = list(MANAGED_REPOS)
+    elif endpoint == "newBranch":
+        repo_names = [r.strip() for r in repo_param.split(',') if r.strip()]
+    else:
+        repo_names = [repo_param]
+    unknown_repos = [r for r in repo_names if await REPO_MAP.resolve(r) is None]
+    if unknown_repos or not repo_names:
+        return func.HttpResponse(json.dumps({"status": "INVALID_REPO", "message": f"❌ Unknown repository '{', '.join(unknown_repos) or repo_param}'", "error": f"Available repos: {', '.join(REPO_MAP.keys())}", "success": False}), status_code=400, mimetype="application/json")
+    
+    if endpoint == "newBranch":
+        name_error = _branch_name_error(ticket)
+        if name_error:
+            return func.HttpResponse(json.dumps({"status": "BRANCH_NAME_WRONG", "message": f"❌ BRANCH NAME ERROR: '{ticket}' format is invalid", "error": name_error[0], "example": name_error[1], "ticket": ticket, "success": False}), status_code=400, mimetype="application/json")
+    
+    if endpoint == "deleteBranch" and ticket.lower() in PROTECTED_BRANCHES:
+        return func.HttpResponse(json.dumps({"status": "PROTECTED_BRANCH", "message": f"❌ ERROR: Cannot delete protected branch '{ticket}'", "error": f"Protected branches: {', '.join(PROTECTED_BRANCHES)}", "success": False}), status_code=403, mimetype="application/json")
+    
+    return None
+
+
+def _async_job(endpoint: str):
+    """
+    ?async=1 verilirse isteği sadece doğrular, job kuyruğuna atar ve hemen 202 + job id döner.
+    Job, kuyruk worker'ı tarafından aynı handler ile (async parametresi olmadan) çalıştırılır.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(req: func.HttpRequest) -> func.HttpResponse:
+            if req.params.get('async') != '1':
+                return await handler(req)
+            
+            error_response = await _validate_job_request(endpoint, req)
+            if error_response is not None:
+                return error_response
+            
+            params = {key: value for key, value in req.params.items() if key != 'async'}
+            job_id = jobs.new_job_id()
+            job_store.create(job_id, endpoint, params)
+            await job_queue.enqueue({"id": job_id, "endpoint": endpoint, "params": params})
+            logging.info(f"{endpoint}: queued job {job_id} for {params}")
+            
+            status_url = f"/api/jobs/{job_id}"
+            return func.HttpResponse(
+                json.dumps({
+                    "status": "JOB_ACCEPTED",
+                    "message": f"⏳ Request accepted, processing in background. Check '{status_url}' for the result.",
+                    "job_id": job_id,
+                    "endpoint": endpoint,
+                    "status_url": status_url,
+                    "success": True
+                }),
+                status_code=202,
+                mimetype="application/json",
+                headers={"Location": status_url}
+            )
+        return wrapper
+    return decorator
+
+
+JOB_RETRYABLE_STATUS = (429, 503)
+
+
+async def _run_job(message: dict) -> None:
+    """Kuyruktan gelen job'ı ilgili handler ile çalıştırır ve sonucu job store'a yazar."""
+    job_id = message["id"]
+    endpoint = message["endpoint"]
+    # Job'ı kuyruğa atan isteğin admission slot'u job'a geçmez; handler kendi slot'unu alır
+    if ado.admission is not None:
+        ado.admission.detach()
+    job_store.update(job_id, jobs.JOB_RUNNING)
+    try:
+        handler = JOB_HANDLERS[endpoint]
+        req = func.HttpRequest(method="GET", url=f"/api/{endpoint}", params=message["params"], body=b"")
+        resp = await handler(req)
+        body = resp.get_body()
+        try:
+            body = json.loads(body)
+        except ValueError:
+            body = body.decode()
+        # 429/503 (yük atıldı, devre açık) tamamlanmış sayılmaz; job tekrar gönderilebilir
+        retryable = resp.status_code in JOB_RETRYABLE_STATUS
+        status = jobs.JOB_FAILED if retryable or resp.status_code >= 500 else jobs.JOB_COMPLETED
+        result = {"status_code": resp.status_code, "body": body}
+        if retryable:
+            result.update(retryable=True, retry_after=resp.headers.get("Retry-After"))
+        job_store.update(job_id, status, result)
+        logging.info(f"Job {job_id} ({endpoint}) finished with {resp.status_code}")
+    except Exception as e:
+        logging.error(f"Job {job_id} ({endpoint}) failed: {str(e)}")
+        job_store.update(job_id, jobs.JOB_FAILED, {"error": str(e)})
+
+
+def _build_job_backends():
+    """JOB_STORE_BACKEND / JOB_QUEUE_BACKEND ortam değişkenlerine göre job store ve kuyruğu oluşturur."""
+    sqlite_path = os.environ.get("JOB_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "ado_jobs.sqlite"))
+    
+    store_backend = os.environ.get("JOB_STORE_BACKEND", "memory")
+    if store_backend == "state" and state_store is None:
+        logging.warning("JOB_STORE_BACKEND=state requires STATE_STORE_BACKEND, using memory job store")
+    if store_backend == "state" and state_store is not None:
+        store = jobs.StateJobStore(state_store)
+    elif store_backend == "sqlite":
+        store = jobs.SqliteJobStore(sqlite_path)
+    else:
+        store = jobs.InMemoryJobStore()
+    
+    queue_backend = os.environ.get("JOB_QUEUE_BACKEND", "memory")
+    if queue_backend == "storage":
+        queue = jobs.StorageJobQueue(os.environ["AzureWebJobsStorage"], JOB_QUEUE_NAME)
+    elif queue_backend == "sqlite":
+        queue = jobs.SqliteJobQueue(sqlite_path, _run_job)
+    else:
+        queue = jobs.MemoryJobQueue(_run_job)
+    return store, queue
+
+
+job_store, job_queue = _build_job_backends()
+
+
 def format_pr_title(branch_name: str) -> str:
     """
     Branch ismini PR title formatına çevirir.
@@ -49,8 +587,19 @@ def format_pr_title(branch_name: str) -> str:
     # Final format: CT-8594: Firma Firma Ekle İlgililer
     return f"{ticket_code}: {formatted_description}"
 
+
+def _test_pr_payload(ticket: str) -> dict:
+    """Feature branch'ten 'test'e açılan PR'ın gövdesi (PrOpen ve BulkPrOpen aynı başlığı kullanır)."""
+    return {
+        "sourceRefName": f"refs/heads/{ticket}",
+        "targetRefName": "refs/heads/test",
+        "title": format_pr_title(ticket),
+        "description": f"Automated PR from '{ticket}' to 'test' for code review process."
+    }
+
 @app.function_name(name="HttpExample")
 @app.route(route="test", methods=["get", "post"], auth_level=func.AuthLevel.ANONYMOUS)
+@_instrumented("test")
 def test_function(req: func.HttpRequest) -> func.HttpResponse:
     logging.info('Python HTTP trigger function processed a request.')
 
@@ -72,18 +621,93 @@ def test_function(req: func.HttpRequest) -> func.HttpResponse:
         )
 
 
+async def _create_branch_in_repo(ticket: str, repo_name: str, auth_headers: dict):
+    """
+    Tek bir repoda dev'den ticket branch'i oluşturur.
+    (status_code, response_dict) döndürür; çoklu repo isteklerinde paralel çağrılır.
+    """
+    repo_id = REPO_MAP[repo_name]
+    
+    try:
+        # 1️⃣ Dev branch'in SHA'sını al (cache'te yoksa API'den)
+        async def _fetch_dev_sha(branch_name: str) -> str:
+            dev_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs/heads/{branch_name}?api-version=7.1-preview.1"
+            dev_data = await ado.request(dev_url, headers=auth_headers)
+            return dev_data["value"][0]["objectId"]
+        
+        with tracing.span(f"get dev sha [{repo_name}]"):
+            sha = await lookups.shared(("branch_sha", repo_id, 'dev'), lambda: ref_cache.get_or_fetch(repo_id, 'dev', _fetch_dev_sha))
+        logging.info(f"Got dev branch SHA: {sha}")
+        
+        # 2️⃣ Yeni branch oluştur
+        create_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?api-version=7.1-preview.1"
+        
+        payload = [{
+            "name": f"refs/heads/{ticket}",
+            "oldObjectId": ZERO_SHA,
+            "newObjectId": sha
+        }]
+        
+        with tracing.span(f"create ref [{repo_name}]"):
+            create_result = await ado.request(create_url, method='POST', payload=payload, headers=auth_headers, idempotent=True)
+        ref_cache.apply_updates(repo_id, payload)
+        logging.info(f"Branch created successfully: {ticket}")
+        
+        # ✅ Başarılı response
+        return 200, {
+            "status": "BRANCH_CREATED",
+            "message": f"✅ SUCCESS: Branch '{ticket}' created successfully in '{repo_name}'",
+            "branch": ticket,
+            "repo": repo_name,
+            "repo_id": repo_id,
+            "commit": sha,
+            "success": True
+        }
+        
+    except urllib.error.HTTPError as e:
+        error_msg = e.read().decode() if e.fp else str(e)
+        logging.error(f"Azure DevOps API error: {e.code} - {error_msg}")
+        
+        if e.code == 409:
+            # Branch zaten var, ama hata vermeyelim - başarılı olarak gösterelim
+            logging.info(f"Branch '{ticket}' already exists, returning success")
+            return 200, {
+                "status": "BRANCH_ALREADY_EXISTS",
+                "message": f"✅ SUCCESS: Branch '{ticket}' already exists in '{repo_name}'",
+                "branch": ticket,
+                "repo": repo_name,
+                "repo_id": repo_id,
+                "note": "Branch was already created previously",
+                "success": True
+            }
+        return 500, {"error": "Azure DevOps API error", "details": error_msg, "repo": repo_name, "success": False}
+    
+    except Exception as api_error:
+        logging.error(f"API call failed: {str(api_error)}")
+        return 500, {"error": "Failed to create branch", "details": str(api_error), "repo": repo_name, "success": False}
+
+
 @app.function_name(name="NewBranch")
 @app.route(route="newBranch", methods=["get"], auth_level=func.AuthLevel.ANONYMOUS)
-def new_branch(req: func.HttpRequest) -> func.HttpResponse:
+@_instrumented("newBranch")
+@_fail_fast(write=True)
+@_async_job("newBranch")
+@_idempotent("newBranch")
+async def new_branch(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Dev'den yeni branch oluşturur.
+    'repo' tek repo, virgülle ayrılmış liste (CustomsOnlineAngular,CustomsOnlineBackEnd) ya da 'all' olabilir;
+    birden fazla repo varsa branch'ler paralel oluşturulur ve sonuçlar tek response'ta döner.
+    """
     logging.info('NewBranch function called.')
     
     try:
         # Parametreleri al
         ticket = req.params.get('ticket')
-        repo_name = req.params.get('repo')
+        repo_param = req.params.get('repo')
         
         # Basit kontroller
-        if not ticket or not repo_name:
+        if not ticket or not repo_param:
             return func.HttpResponse(
                 json.dumps({
                     "status": "MISSING_PARAMETERS",
@@ -95,11 +719,18 @@ def new_branch(req: func.HttpRequest) -> func.HttpResponse:
                 mimetype="application/json"
             )
         
-        if repo_name not in REPO_MAP:
+        if repo_param.strip().lower() == "all":
+            repo_names = list(MANAGED_REPOS)
+        else:
+            # Sırayı koruyarak tekrarları at
+            repo_names = list(dict.fromkeys(r.strip() for r in repo_param.split(',') if r.strip()))
+        
+        unknown_repos = [r for r in repo_names if await REPO_MAP.resolve(r) is None]
+        if unknown_repos or not repo_names:
             return func.HttpResponse(
                 json.dumps({
                     "status": "INVALID_REPO",
-                    "message": f"❌ ERROR: Unknown repository '{repo_name}'",
+                    "message": f"❌ ERROR: Unknown repository '{', '.join(unknown_repos) or repo_param}'",
                     "error": f"Available repos: {', '.join(REPO_MAP.keys())}",
                     "success": False
                 }),
@@ -109,145 +740,67 @@ def new_branch(req: func.HttpRequest) -> func.HttpResponse:
         
         # REGEX kontrolü - FOLDER/BRANCH formatını da destekle
         # Format: AI-123-feature-name veya herhangi-folder/AI-123-feature-name
-        ticket_upper = ticket.upper()
-        valid_prefixes = ["AI-", "BE-", "CT-", "DO-", "FE-", "MP-", "SQL-", "TD-", "UI-"]
-        
-        # Folder varsa son kısmı kontrol et, yoksa direkt kontrol et
-        if '/' in ticket:
-            # folder/branch formatı: herhangi-folder/AI-123-feature -> AI-123-feature kısmını kontrol et
-            branch_part = ticket.split('/')[-1].upper()
-            if not any(branch_part.startswith(prefix) for prefix in valid_prefixes):
-                return func.HttpResponse(
-                    json.dumps({
-                        "status": "BRANCH_NAME_WRONG",
-                        "message": f"❌ BRANCH NAME ERROR: '{ticket}' format is invalid",
-                        "error": f"Branch part '{branch_part}' must start with valid prefix: {', '.join(valid_prefixes)}",
-                        "example": "developer/AI-123-feature-name or AI-123-feature-name",
-                        "ticket": ticket,
-                        "success": False
-                    }),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-        else:
-            # Direkt branch formatı: AI-123-feature
-            if not any(ticket_upper.startswith(prefix) for prefix in valid_prefixes):
-                return func.HttpResponse(
-                    json.dumps({
-                        "status": "BRANCH_NAME_WRONG",
-                        "message": f"❌ BRANCH NAME ERROR: '{ticket}' format is invalid",
-                        "error": f"Ticket must start with valid prefix: {', '.join(valid_prefixes)}",
-                        "example": "AI-123-feature-name",
-                        "ticket": ticket,
-                        "success": False
-                    }),
-                    status_code=400,
-                    mimetype="application/json"
-                )
+        name_error = _branch_name_error(ticket)
+        if name_error:
+            error, example = name_error
+            return func.HttpResponse(
+                json.dumps({
+                    "status": "BRANCH_NAME_WRONG",
+                    "message": f"❌ BRANCH NAME ERROR: '{ticket}' format is invalid",
+                    "error": error,
+                    "example": example,
+                    "ticket": ticket,
+                    "success": False
+                }),
+                status_code=400,
+                mimetype="application/json"
+            )
         
         # AZURE_PAT kontrolü
-        azure_pat = os.environ.get("AZURE_PAT")
-        if not azure_pat:
+        auth_headers = _ado_auth_headers()
+        if auth_headers is None:
             return func.HttpResponse(
                 json.dumps({"error": "AZURE_PAT environment variable not set"}),
                 status_code=500,
                 mimetype="application/json"
             )
         
-        repo_id = REPO_MAP[repo_name]
-        
-        # 🌐 GERÇEK AZURE DEVOPS API ÇAĞRISI - urllib kullanarak
-        import urllib.request
-        import urllib.parse
-        import base64
-        
-        # Basic Authentication için header hazırla
-        credentials = f":{azure_pat}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        
-        try:
-            # 1️⃣ Dev branch'in SHA'sını al
-            dev_url = f"https://dev.azure.com/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs/heads/dev?api-version=7.1-preview.1"
-            
-            req_dev = urllib.request.Request(dev_url)
-            req_dev.add_header("Authorization", f"Basic {encoded_credentials}")
-            req_dev.add_header("Content-Type", "application/json")
-            
-            with urllib.request.urlopen(req_dev) as response:
-                dev_data = json.loads(response.read().decode())
-                sha = dev_data["value"][0]["objectId"]
-                logging.info(f"Got dev branch SHA: {sha}")
-            
-            # 2️⃣ Yeni branch oluştur
-            create_url = f"https://dev.azure.com/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?api-version=7.1-preview.1"
-            
-            payload = [{
-                "name": f"refs/heads/{ticket}",
-                "oldObjectId": "0000000000000000000000000000000000000000",
-                "newObjectId": sha
-            }]
-            
-            data = json.dumps(payload).encode()
-            
-            req_create = urllib.request.Request(create_url, data=data, method='POST')
-            req_create.add_header("Authorization", f"Basic {encoded_credentials}")
-            req_create.add_header("Content-Type", "application/json")
-            
-            with urllib.request.urlopen(req_create) as response:
-                create_result = json.loads(response.read().decode())
-                logging.info(f"Branch created successfully: {ticket}")
-            
-            # ✅ Başarılı response
-            response_data = {
-                "status": "BRANCH_CREATED",
-                "message": f"✅ SUCCESS: Branch '{ticket}' created successfully in '{repo_name}'",
-                "branch": ticket,
-                "repo": repo_name,
-                "repo_id": repo_id,
-                "commit": sha,
-                "success": True
-            }
-            
+        # 🌐 GERÇEK AZURE DEVOPS API ÇAĞRISI - paylaşılan ado istemcisi ile
+        # Tek repo: önceki response formatı aynen korunur
+        if len(repo_names) == 1:
+            status_code, response_data = await _create_branch_in_repo(ticket, repo_names[0], auth_headers)
             return func.HttpResponse(
                 json.dumps(response_data),
-                status_code=200,
+                status_code=status_code,
                 mimetype="application/json"
             )
-            
-        except urllib.error.HTTPError as e:
-            error_msg = e.read().decode() if e.fp else str(e)
-            logging.error(f"Azure DevOps API error: {e.code} - {error_msg}")
-            
-            if e.code == 409:
-                # Branch zaten var, ama hata vermeyelim - başarılı olarak gösterelim
-                logging.info(f"Branch '{ticket}' already exists, returning success")
-                return func.HttpResponse(
-                    json.dumps({
-                        "status": "BRANCH_ALREADY_EXISTS",
-                        "message": f"✅ SUCCESS: Branch '{ticket}' already exists in '{repo_name}'",
-                        "branch": ticket,
-                        "repo": repo_name,
-                        "repo_id": repo_id,
-                        "note": "Branch was already created previously",
-                        "success": True
-                    }),
-                    status_code=200,
-                    mimetype="application/json"
-                )
-            else:
-                return func.HttpResponse(
-                    json.dumps({"error": "Azure DevOps API error", "details": error_msg}),
-                    status_code=500,
-                    mimetype="application/json"
-                )
         
-        except Exception as api_error:
-            logging.error(f"API call failed: {str(api_error)}")
-            return func.HttpResponse(
-                json.dumps({"error": "Failed to create branch", "details": str(api_error)}),
-                status_code=500,
-                mimetype="application/json"
-            )
+        # Çoklu repo: FANOUT_MAX_CONCURRENCY ile sınırlı şekilde paralel oluştur
+        semaphore = asyncio.Semaphore(FANOUT_MAX_CONCURRENCY)
+        
+        async def _bounded_create(repo: str):
+            try:
+                async with semaphore, ado.request_slot(req.url, REPO_MAP[repo], write=True):
+                    return await _create_branch_in_repo(ticket, repo, auth_headers)
+            except AdmissionRejected as e:
+                return 429, {"error": "Azure DevOps API error", "details": e.read().decode(), "repo": repo, "success": False}
+        
+        outcomes = await asyncio.gather(*(_bounded_create(repo) for repo in repo_names))
+        results = {repo: outcome[1] for repo, outcome in zip(repo_names, outcomes)}
+        all_success = all(result.get("success") for result in results.values())
+        
+        return func.HttpResponse(
+            json.dumps({
+                "status": "MULTI_REPO_RESULT",
+                "message": f"{'✅' if all_success else '⚠️'} Branch '{ticket}' processed in {len(repo_names)} repos",
+                "branch": ticket,
+                "repos": repo_names,
+                "results": results,
+                "success": all_success
+            }),
+            status_code=200 if all_success else 207,
+            mimetype="application/json"
+        )
         
     except Exception as e:
         logging.error(f"Unexpected error: {str(e)}")
@@ -260,7 +813,11 @@ def new_branch(req: func.HttpRequest) -> func.HttpResponse:
 
 @app.function_name(name="DeleteBranch")
 @app.route(route="deleteBranch", methods=["get"], auth_level=func.AuthLevel.ANONYMOUS)
-def delete_branch(req: func.HttpRequest) -> func.HttpResponse:
+@_instrumented("deleteBranch")
+@_fail_fast(write=True)
+@_async_job("deleteBranch")
+@_idempotent("deleteBranch")
+async def delete_branch(req: func.HttpRequest) -> func.HttpResponse:
     logging.info('DeleteBranch function called.')
     
     try:
@@ -281,7 +838,7 @@ def delete_branch(req: func.HttpRequest) -> func.HttpResponse:
                 mimetype="application/json"
             )
         
-        if repo_name not in REPO_MAP:
+        if await REPO_MAP.resolve(repo_name) is None:
             return func.HttpResponse(
                 json.dumps({
                     "status": "INVALID_REPO",
@@ -294,13 +851,12 @@ def delete_branch(req: func.HttpRequest) -> func.HttpResponse:
             )
         
         # Main/master/dev branch'lerini korumalı kontrol
-        protected_branches = ["main", "master", "dev", "develop", "release"]
-        if ticket.lower() in protected_branches:
+        if ticket.lower() in PROTECTED_BRANCHES:
             return func.HttpResponse(
                 json.dumps({
                     "status": "PROTECTED_BRANCH",
                     "message": f"❌ ERROR: Cannot delete protected branch '{ticket}'",
-                    "error": f"Protected branches: {', '.join(protected_branches)}",
+                    "error": f"Protected branches: {', '.join(PROTECTED_BRANCHES)}",
                     "success": False
                 }),
                 status_code=403,
@@ -308,8 +864,8 @@ def delete_branch(req: func.HttpRequest) -> func.HttpResponse:
             )
         
         # AZURE_PAT kontrolü
-        azure_pat = os.environ.get("AZURE_PAT")
-        if not azure_pat:
+        auth_headers = _ado_auth_headers()
+        if auth_headers is None:
             return func.HttpResponse(
                 json.dumps({"error": "AZURE_PAT environment variable not set"}),
                 status_code=500,
@@ -318,30 +874,18 @@ def delete_branch(req: func.HttpRequest) -> func.HttpResponse:
         
         repo_id = REPO_MAP[repo_name]
         
-        # 🌐 GERÇEK AZURE DEVOPS API ÇAĞRISI - urllib kullanarak
-        import urllib.request
-        import urllib.parse
-        import base64
-        
-        # Basic Authentication için header hazırla
-        credentials = f":{azure_pat}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        
+        # 🌐 GERÇEK AZURE DEVOPS API ÇAĞRISI - paylaşılan ado istemcisi ile
         try:
             # 1️⃣ Önce branch'in var olup olmadığını kontrol et
             # URL encode ticket name for proper API call
             encoded_ticket = urllib.parse.quote(ticket, safe='')
-            check_url = f"https://dev.azure.com/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs/heads/{encoded_ticket}?api-version=7.1-preview.1"
-            
-            req_check = urllib.request.Request(check_url)
-            req_check.add_header("Authorization", f"Basic {encoded_credentials}")
-            req_check.add_header("Content-Type", "application/json")
+            check_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs/heads/{encoded_ticket}?api-version=7.1-preview.1"
             
             try:
-                with urllib.request.urlopen(req_check) as response:
-                    branch_data = json.loads(response.read().decode())
-                    current_sha = branch_data["value"][0]["objectId"]
-                    logging.info(f"Found branch '{ticket}' with SHA: {current_sha}")
+                with tracing.span("get branch sha"):
+                    branch_data = await ado.request(check_url, headers=auth_headers)
+                current_sha = branch_data["value"][0]["objectId"]
+                logging.info(f"Found branch '{ticket}' with SHA: {current_sha}")
             except urllib.error.HTTPError as check_error:
                 if check_error.code == 404:
                     return func.HttpResponse(
@@ -360,23 +904,18 @@ def delete_branch(req: func.HttpRequest) -> func.HttpResponse:
                     raise check_error
             
             # 2️⃣ Branch'i sil
-            delete_url = f"https://dev.azure.com/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?api-version=7.1-preview.1"
+            delete_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?api-version=7.1-preview.1"
             
             payload = [{
                 "name": f"refs/heads/{ticket}",
                 "oldObjectId": current_sha,
-                "newObjectId": "0000000000000000000000000000000000000000"
+                "newObjectId": ZERO_SHA
             }]
             
-            data = json.dumps(payload).encode()
-            
-            req_delete = urllib.request.Request(delete_url, data=data, method='POST')
-            req_delete.add_header("Authorization", f"Basic {encoded_credentials}")
-            req_delete.add_header("Content-Type", "application/json")
-            
-            with urllib.request.urlopen(req_delete) as response:
-                delete_result = json.loads(response.read().decode())
-                logging.info(f"Branch deleted successfully: {ticket}")
+            with tracing.span("update ref"):
+                delete_result = await ado.request(delete_url, method='POST', payload=payload, headers=auth_headers, idempotent=True)
+            ref_cache.apply_updates(repo_id, payload)
+            logging.info(f"Branch deleted successfully: {ticket}")
             
             # ✅ Başarılı response
             response_data = {
@@ -435,100 +974,1072 @@ def delete_branch(req: func.HttpRequest) -> func.HttpResponse:
         )
 
 
-@app.function_name(name="HealthCheck")
-@app.route(route="healthcheck", methods=["get"], auth_level=func.AuthLevel.ANONYMOUS)
-def healthcheck(req: func.HttpRequest) -> func.HttpResponse:
-    logging.info('HealthCheck function called.')
-    return func.HttpResponse("OK - All systems working!")
-
-
-@app.function_name(name="DevMerge")
-@app.route(route="devmerge", methods=["get"], auth_level=func.AuthLevel.ANONYMOUS)
-def dev_merge(req: func.HttpRequest) -> func.HttpResponse:
+async def _iter_ref_updates(repo_id: str, updates: list, auth_headers: dict):
     """
-    Feature branch'i 'dev' branch'ine merge eder (branch'i silmez).
-    Hem 'In Development -> Code Review' hem 'Code Review -> Analyst Appr.' için kullanılır.
+    Ref update'lerini REFS_BATCH_SIZE'lık parçalar halinde tek refs POST'u ile gönderir.
+    Her parça bittikçe (ref ismi, ADO sonucu {"success", "updateStatus", ...}) çiftlerini yield eder.
     """
-    logging.info('DevMerge function called.')
-    
-    try:
-        ticket = req.params.get('ticket')
-        repo_name = req.params.get('repo')
-
-        # --- 1. Parametre ve Ortam Değişkeni Kontrolleri ---
-        if not ticket or not repo_name:
-            return func.HttpResponse(json.dumps({"status": "MISSING_PARAMETERS", "message": "❌ 'ticket' and 'repo' parameters are required"}), status_code=400, mimetype="application/json")
+    url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?api-version=7.1-preview.1"
+    for i in range(0, len(updates), REFS_BATCH_SIZE):
+        chunk = updates[i:i + REFS_BATCH_SIZE]
+        try:
+            with tracing.span(f"update refs [{i // REFS_BATCH_SIZE + 1}]"):
+                values = (await ado.request(url, method='POST', payload=chunk, headers=auth_headers, idempotent=True)).get('value', [])
+        except urllib.error.HTTPError as e:
+            error_msg = e.read().decode() if e.fp else str(e)
+            logging.error(f"Azure DevOps API error on batched ref update: {e.code} - {error_msg}")
+            # Tüm update'ler reddedildiğinde ADO 409 ile birlikte ref bazında sonuçları da döndürebilir
+            try:
+                values = json.loads(error_msg).get('value') or []
+            except ValueError:
+                values = []
+            if not values:
+                values = [{"name": u["name"], "success": False, "updateStatus": None, "error": error_msg} for u in chunk]
         
-        if repo_name not in REPO_MAP:
+        results = {value["name"]: value for value in values}
+        for update in chunk:
+            results.setdefault(update["name"], {"name": update["name"], "success": False, "updateStatus": "unknown"})
+        
+        ref_cache.apply_updates(repo_id, [u for u in chunk if results[u["name"]].get("success")])
+        for update in chunk:
+            yield update["name"], results[update["name"]]
+
+
+async def _post_ref_updates(repo_id: str, updates: list, auth_headers: dict) -> dict:
+    """Tüm parçaları gönderir; ref ismi -> ADO sonucu sözlüğü döndürür."""
+    return {name: result async for name, result in _iter_ref_updates(repo_id, updates, auth_headers)}
+
+
+async def _list_active_prs(repo_id: str, auth_headers: dict) -> list:
+    """Repodaki tüm aktif PR'ları $top/$skip ile sayfalayarak listeler (PR listesi continuation token döndürmez)."""
+    url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/pullrequests?searchCriteria.status=active&api-version=7.1-preview.1"
+    prs = []
+    while True:
+        page = (await ado.request(f"{url}&$top={ACTIVE_PR_PAGE_SIZE}&$skip={len(prs)}", headers=auth_headers)).get("value", [])
+        prs.extend(page)
+        if len(page) < ACTIVE_PR_PAGE_SIZE:
+            return prs
+
+
+def _bulk_params(req: func.HttpRequest):
+    """Bulk endpoint'ler için (repo, tickets) döndürür; tickets JSON body listesi ya da virgüllü query olabilir."""
+    repo_name = req.params.get('repo')
+    tickets = req.params.get('tickets')
+    tickets = tickets.split(',') if tickets else []
+    try:
+        body = req.get_json()
+    except ValueError:
+        body = None
+    if isinstance(body, dict):
+        repo_name = body.get('repo', repo_name)
+        tickets = body.get('tickets', tickets) or []
+    # Sırayı koruyarak tekrarları ve boşlukları at
+    tickets = list(dict.fromkeys(t.strip() for t in tickets if isinstance(t, str) and t.strip()))
+    return repo_name, tickets
+
+
+def _bulk_response(status: str, repo_name: str, results: dict, **extra) -> func.HttpResponse:
+    """Bulk sonuçlarını status özetiyle birlikte tek response'ta döndürür (hepsi başarılıysa 200, değilse 207)."""
+    summary = {}
+    for result in results.values():
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    all_success = all(result.get("success") for result in results.values())
+    return func.HttpResponse(
+        json.dumps({
+            "status": status,
+            "message": f"{'✅' if all_success else '⚠️'} {len(results)} branches processed in '{repo_name}'",
+            "repo": repo_name,
+            **extra,
+            "summary": summary,
+            "results": results,
+            "success": all_success
+        }),
+        status_code=200 if all_success else 207,
+        mimetype="application/json"
+    )
+
+
+def _wants_ndjson(req: func.HttpRequest) -> bool:
+    """?format=ndjson ya da 'Accept: application/x-ndjson' ile bulk sonuçları satır başına bir JSON (NDJSON) istenir."""
+    return req.params.get('format') == 'ndjson' or 'application/x-ndjson' in (req.headers.get('Accept') or '')
+
+
+async def _ndjson_response(items, status: str, **extra) -> func.HttpResponse:
+    """
+    Bulk sonuçlarını NDJSON çıktı formatında döndürür: her sonuç tamamlandığı sırayla tek satır JSON,
+    son satır {"status", "done": true, "summary", "success"} özetidir. Python worker HttpResponse gövdesini
+    tek parça gönderdiği için cevap tüm sonuçlar bitince döner (akış yok); status kodu JSON cevaptaki gibi 200 / 207'dir.
+    """
+    lines = []
+    summary = {}
+    all_success = True
+    async for item in items:
+        summary[item["status"]] = summary.get(item["status"], 0) + 1
+        all_success = all_success and bool(item.get("success"))
+        lines.append(json.dumps(item))
+    lines.append(json.dumps({"status": status, "done": True, **extra, "summary": summary, "success": all_success}))
+    return func.HttpResponse("\n".join(lines) + "\n", status_code=200 if all_success else 207, mimetype="application/x-ndjson")
+
+
+async def _bulk_items_response(req: func.HttpRequest, status: str, repo_name: str, tickets: list, items, **extra) -> func.HttpResponse:
+    """(ticket, sonuç) akışını NDJSON olarak ya da ticket sırasıyla toplanmış tek JSON (_bulk_response) olarak döndürür."""
+    if _wants_ndjson(req):
+        async def _lines():
+            async for ticket, result in items:
+                yield {"ticket": ticket, "repo": repo_name, **result}
+        return await _ndjson_response(_lines(), status, repo=repo_name, **extra)
+    results = {ticket: result async for ticket, result in items}
+    return _bulk_response(status, repo_name, {ticket: results[ticket] for ticket in tickets}, **extra)
+
+
+@app.function_name(name="BulkNewBranch")
+@app.route(route="bulkNewBranch", methods=["get", "post"], auth_level=func.AuthLevel.ANONYMOUS)
+@_instrumented("bulkNewBranch")
+@_fail_fast(write=True)
+async def bulk_new_branch(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Bir repoda çok sayıda ticket branch'ini tek seferde oluşturur.
+    dev SHA'sı bir kez alınır, tüm ref'ler parçalı (REFS_BATCH_SIZE) refs POST'larıyla gönderilir.
+    """
+    logging.info('BulkNewBranch function called.')
+    
+    try:
+        repo_name, tickets = _bulk_params(req)
+        
+        if not tickets or not repo_name:
+            return func.HttpResponse(json.dumps({"status": "MISSING_PARAMETERS", "message": "❌ 'tickets' and 'repo' parameters are required", "success": False}), status_code=400, mimetype="application/json")
+        
+        if await REPO_MAP.resolve(repo_name) is None:
+            return func.HttpResponse(json.dumps({"status": "INVALID_REPO", "message": f"❌ Unknown repository '{repo_name}'", "error": f"Available repos: {', '.join(REPO_MAP.keys())}", "success": False}), status_code=400, mimetype="application/json")
+        
+        auth_headers = _ado_auth_headers()
+        if auth_headers is None:
+            return func.HttpResponse(json.dumps({"error": "AZURE_PAT environment variable not set"}), status_code=500, mimetype="application/json")
+        
+        repo_id = REPO_MAP[repo_name]
+        
+        # 1️⃣ Dev SHA'sı tek sefer
+        async def _fetch_dev_sha(branch_name: str) -> str:
+            dev_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs/heads/{branch_name}?api-version=7.1-preview.1"
+            return (await ado.request(dev_url, headers=auth_headers))["value"][0]["objectId"]
+        
+        with tracing.span("get dev sha"):
+            sha = await ref_cache.get_or_fetch(repo_id, 'dev', _fetch_dev_sha)
+        
+        async def _items():
+            # Branch ismi hatalı olanlar API'ye gönderilmez
+            valid_tickets = []
+            for ticket in tickets:
+                name_error = _branch_name_error(ticket)
+                if name_error:
+                    yield ticket, {"status": "BRANCH_NAME_WRONG", "error": name_error[0], "success": False}
+                else:
+                    valid_tickets.append(ticket)
+            
+            # 2️⃣ Tüm branch'ler batched refs POST ile; sonuçlar her parça bittikçe döner
+            updates = [{"name": f"refs/heads/{ticket}", "oldObjectId": ZERO_SHA, "newObjectId": sha} for ticket in valid_tickets]
+            async for ref_name, ref_result in _iter_ref_updates(repo_id, updates, auth_headers):
+                ticket = ref_name[len("refs/heads/"):]
+                if ref_result.get("success"):
+                    yield ticket, {"status": "BRANCH_CREATED", "commit": sha, "success": True}
+                elif ref_result.get("updateStatus") == "staleOldObjectId":
+                    # oldObjectId=0 ile create stale olarak reddedildiyse branch zaten var (NewBranch'teki 409 davranışı);
+                    # diğer tüm GitRefUpdateStatus değerleri (invalidRefName, rejectedByPolicy, ...) hatadır
+                    yield ticket, {"status": "BRANCH_ALREADY_EXISTS", "update_status": ref_result.get("updateStatus"), "success": True}
+                else:
+                    yield ticket, {"status": "BRANCH_CREATE_FAILED", "update_status": ref_result.get("updateStatus"), "error": ref_result.get("error"), "success": False}
+            logging.info(f"Bulk branch creation finished for {len(tickets)} tickets in '{repo_name}'")
+        
+        return await _bulk_items_response(req, "BULK_BRANCH_RESULT", repo_name, tickets, _items(), commit=sha)
+    
+    except Exception as e:
+        logging.error(f"Unexpected error in BulkNewBranch: {str(e)}")
+        return func.HttpResponse(json.dumps({"error": "Internal server error", "details": str(e)}), status_code=500, mimetype="application/json")
+
+
+@app.function_name(name="BulkDeleteBranch")
+@app.route(route="bulkDeleteBranch", methods=["get", "post"], auth_level=func.AuthLevel.ANONYMOUS)
+@_instrumented("bulkDeleteBranch")
+@_fail_fast(write=True)
+async def bulk_delete_branch(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Bir repoda çok sayıda branch'i tek seferde siler (release sonrası temizlik).
+    Güncel SHA'lar tek refs listesinden alınır, silmeler parçalı refs POST'larıyla gönderilir.
+    """
+    logging.info('BulkDeleteBranch function called.')
+    
+    try:
+        repo_name, tickets = _bulk_params(req)
+        
+        if not tickets or not repo_name:
+            return func.HttpResponse(json.dumps({"status": "MISSING_PARAMETERS", "message": "❌ 'tickets' and 'repo' parameters are required", "success": False}), status_code=400, mimetype="application/json")
+        
+        if await REPO_MAP.resolve(repo_name) is None:
+            return func.HttpResponse(json.dumps({"status": "INVALID_REPO", "message": f"❌ Unknown repository '{repo_name}'", "error": f"Available repos: {', '.join(REPO_MAP.keys())}", "success": False}), status_code=400, mimetype="application/json")
+        
+        auth_headers = _ado_auth_headers()
+        if auth_headers is None:
+            return func.HttpResponse(json.dumps({"error": "AZURE_PAT environment variable not set"}), status_code=500, mimetype="application/json")
+        
+        repo_id = REPO_MAP[repo_name]
+        
+        # 1️⃣ Tüm branch head'lerini tek listede al
+        list_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?filter=heads/&api-version=7.1-preview.1"
+        with tracing.span("list refs"):
+            current_shas = {ref["name"]: ref["objectId"] for ref in (await ado.request(list_url, headers=auth_headers)).get("value", [])}
+        
+        async def _items():
+            updates = []
+            for ticket in tickets:
+                ref_name = f"refs/heads/{ticket}"
+                if ticket.lower() in PROTECTED_BRANCHES:
+                    yield ticket, {"status": "PROTECTED_BRANCH", "success": False}
+                elif ref_name not in current_shas:
+                    yield ticket, {"status": "BRANCH_NOT_FOUND", "success": False}
+                else:
+                    updates.append({"name": ref_name, "oldObjectId": current_shas[ref_name], "newObjectId": ZERO_SHA})
+            
+            # 2️⃣ Silmeler batched refs POST ile; sonuçlar her parça bittikçe döner
+            async for ref_name, ref_result in _iter_ref_updates(repo_id, updates, auth_headers):
+                ticket = ref_name[len("refs/heads/"):]
+                if ref_result.get("success"):
+                    yield ticket, {"status": "BRANCH_DELETED", "success": True}
+                else:
+                    yield ticket, {"status": "BRANCH_DELETE_FAILED", "update_status": ref_result.get("updateStatus"), "error": ref_result.get("error"), "success": False}
+            logging.info(f"Bulk branch deletion finished for {len(tickets)} tickets in '{repo_name}'")
+        
+        return await _bulk_items_response(req, "BULK_BRANCH_RESULT", repo_name, tickets, _items())
+    
+    except Exception as e:
+        logging.error(f"Unexpected error in BulkDeleteBranch: {str(e)}")
+        return func.HttpResponse(json.dumps({"error": "Internal server error", "details": str(e)}), status_code=500, mimetype="application/json")
+
+
+def _list_param(req: func.HttpRequest, body, name: str) -> list:
+    """Query'de virgüllü ya da JSON body'de liste olarak verilen parametreyi sırayı koruyarak tekilleştirir."""
+    values = req.params.get(name)
+    values = values.split(',') if values else []
+    if isinstance(body, dict) and body.get(name):
+        values = body[name]
+        if isinstance(values, str):
+            values = values.split(',')
+    return list(dict.fromkeys(v.strip() for v in values if isinstance(v, str) and v.strip()))
+
+
+async def _repo_branch_status(repo_id: str, tickets: list, auth_headers: dict) -> dict:
+    """
+    Bir repoda verilen ticket'ların branch SHA'sını ve açık PR'ını döndürür: ticket -> durum.
+    Refs tek sorguda (tek ticket'ta filterContains, çoklu ticket'ta sayfalı tam liste) ve aktif PR'lar
+    tek listede okunur; eşleştirme ref ismi üzerinden hash index ile bellekte yapılır.
+    """
+    wanted = {f"refs/heads/{ticket}": ticket for ticket in tickets}
+    refs_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?filter=heads/&api-version=7.1-preview.1"
+    if len(tickets) == 1:
+        refs_url += f"&filterContains={urllib.parse.quote(tickets[0], safe='')}"
+
+    async def _branch_shas() -> dict:
+        shas = {}
+        # Sadece istenen ref'ler tutulur; tam liste belleğe alınmaz
+        async for page in ado.iter_pages(refs_url, headers=auth_headers):
+            for ref in page:
+                if ref["name"] in wanted:
+                    shas[wanted[ref["name"]]] = ref["objectId"]
+        return shas
+
+    shas, prs = await _gather_or_raise(
+        tracing.traced("list refs", _branch_shas()),
+        tracing.traced("list open PRs", _list_active_prs(repo_id, auth_headers))
+    )
+
+    prs_by_ticket = {}
+    for pr in prs:
+        ticket = wanted.get(pr.get("sourceRefName"))
+        if ticket is not None:
+            prs_by_ticket.setdefault(ticket, []).append(pr)
+
+    results = {}
+    for ticket in tickets:
+        # Aynı branch'ten birden fazla açık PR varsa test'e açılan öne alınır
+        ticket_prs = sorted(prs_by_ticket.get(ticket, []), key=lambda pr: pr.get("targetRefName") != "refs/heads/test")
+        pr = ticket_prs[0] if ticket_prs else None
+        results[ticket] = {
+            "branch_exists": ticket in shas,
+            "sha": shas.get(ticket),
+            "pr_id": pr.get("pullRequestId") if pr else None,
+            "pr_status": pr.get("status") if pr else None,
+            "pr_merge_status": pr.get("mergeStatus") if pr else None,
+            "pr_target": pr.get("targetRefName", "")[len("refs/heads/"):] if pr else None,
+        }
+        # PrApprove'un aramasız tamamlayabilmesi için test PR'ları index'e de yazılır
+        if pr and pr.get("targetRefName") == "refs/heads/test" and pr.get("lastMergeSourceCommit", {}).get("commitId"):
+            pr_index.put(repo_id, ticket, pr["pullRequestId"], pr["lastMergeSourceCommit"]["commitId"])
+    return results
+
+
+@app.function_name(name="BulkStatus")
+@app.route(route="bulkStatus", methods=["get", "post"], auth_level=func.AuthLevel.ANONYMOUS)
+@_instrumented("bulkStatus")
+@_fail_fast
+async def bulk_status(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Çok sayıda ticket için repo bazında branch SHA'sı ve açık PR bilgisini döndürür.
+    Ticket başına ayrı çağrı yerine repo başına bir refs ve bir aktif PR listesi kullanılır (N×M yerine ~2×M çağrı).
+    repos verilmezse REPO_MAP'teki tüm repolar sorgulanır.
+    """
+    logging.info('BulkStatus function called.')
+    
+    try:
+        try:
+            body = req.get_json()
+        except ValueError:
+            body = None
+        tickets = _list_param(req, body, 'tickets')
+        repo_names = _list_param(req, body, 'repos') or _list_param(req, body, 'repo') or list(MANAGED_REPOS)
+        
+        if not tickets:
+            return func.HttpResponse(json.dumps({"status": "MISSING_PARAMETERS", "message": "❌ 'tickets' parameter is required", "success": False}), status_code=400, mimetype="application/json")
+        
+        unknown = [name for name in repo_names if await REPO_MAP.resolve(name) is None]
+        if unknown:
+            return func.HttpResponse(json.dumps({"status": "INVALID_REPO", "message": f"❌ Unknown repository '{', '.join(unknown)}'", "error": f"Available repos: {', '.join(REPO_MAP.keys())}", "success": False}), status_code=400, mimetype="application/json")
+        
+        auth_headers = _ado_auth_headers()
+        if auth_headers is None:
+            return func.HttpResponse(json.dumps({"error": "AZURE_PAT environment variable not set"}), status_code=500, mimetype="application/json")
+        
+        semaphore = asyncio.Semaphore(FANOUT_MAX_CONCURRENCY)
+        
+        async def _one(repo_name: str):
+            async with semaphore, ado.request_slot(req.url, REPO_MAP[repo_name]):
+                return await _repo_branch_status(REPO_MAP[repo_name], tickets, auth_headers)
+        
+        repo_results = await asyncio.gather(*(_one(name) for name in repo_names), return_exceptions=True)
+        
+        results = {ticket: {} for ticket in tickets}
+        errors = {}
+        for repo_name, repo_result in zip(repo_names, repo_results):
+            if isinstance(repo_result, Exception):
+                error_message = repo_result.read().decode() if isinstance(repo_result, urllib.error.HTTPError) and repo_result.fp else str(repo_result)
+                logging.error(f"BulkStatus failed for '{repo_name}': {error_message}")
+                errors[repo_name] = error_message
+                continue
+            for ticket, status in repo_result.items():
+                results[ticket][repo_name] = status
+        
+        return func.HttpResponse(
+            json.dumps({
+                "status": "BULK_STATUS_RESULT",
+                "message": f"{'⚠️' if errors else '✅'} {len(tickets)} tickets checked in {len(repo_names)} repos",
+                "repos": repo_names,
+                "results": results,
+                "errors": errors,
+                "success": not errors
+            }),
+            status_code=207 if errors else 200,
+            mimetype="application/json"
+        )
+    
+    except Exception as e:
+        logging.error(f"Unexpected error in BulkStatus: {str(e)}")
+        return func.HttpResponse(json.dumps({"error": "Internal server error", "details": str(e)}), status_code=500, mimetype="application/json")
+
+
+# Bulk PR açma: sprint sonunda toplu "Code Review" geçişleri için
+BULK_PR_MAX_CONCURRENCY = int(os.environ.get("BULK_PR_MAX_CONCURRENCY", "5"))
+
+
+def _pr_pairs(req: func.HttpRequest, body) -> list:
+    """
+    (ticket, repo) çiftlerini sırayı koruyarak tekilleştirir. Body'de {"items": [{"ticket", "repo"}, ...]},
+    ya da tek repo için {"repo", "tickets"} / ?repo=&tickets= kabul edilir.
+    """
+    pairs = []
+    items = body.get('items') if isinstance(body, dict) else None
+    if isinstance(items, list):
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get('ticket'), str) and isinstance(item.get('repo'), str):
+                pairs.append((item['ticket'].strip(), item['repo'].strip()))
+    else:
+        repo_name, tickets = _bulk_params(req)
+        pairs = [(ticket, repo_name.strip()) for ticket in tickets] if repo_name else []
+    return list(dict.fromkeys((ticket, repo) for ticket, repo in pairs if ticket and repo))
+
+
+async def _prepare_repo_prs(repo_name: str, tickets: list, auth_headers: dict) -> dict:
+    """
+    Bir repoda PR açmadan önceki okumalar: test head'i bir kez (ref cache), source branch'ler ve açık PR'lar
+    BulkStatus'taki tek refs / PR listesiyle. ticket -> branch durumu döndürür; test yoksa ValueError.
+    """
+    repo_id = REPO_MAP[repo_name]
+    with tracing.span(f"get test sha [{repo_name}]"):
+        await ref_cache.get_or_fetch(repo_id, 'test', lambda name: _fetch_branch_sha(repo_id, name, auth_headers))
+    with tracing.span(f"branch status [{repo_name}]"):
+        return await _repo_branch_status(repo_id, tickets, auth_headers)
+
+
+async def _open_test_pr(repo_name: str, ticket: str, status: dict, semaphore: asyncio.Semaphore, auth_headers: dict) -> dict:
+    """Tek ticket için test'e PR açar; açık PR'ı olan ticket'lar PR_ALREADY_OPEN döner."""
+    repo_id = REPO_MAP[repo_name]
+    if not status["branch_exists"]:
+        return {"status": "SOURCE_BRANCH_NOT_FOUND", "error": f"Source branch '{ticket}' does not exist in repository.", "success": False}
+    if status["pr_target"] == "test":
+        return {"status": "PR_ALREADY_OPEN", "pr_id": status["pr_id"],
+                "pr_url": f"https://dev.azure.com/{AZURE_ORG}/{AZURE_PROJECT}/_git/{repo_name}/pullrequest/{status['pr_id']}", "success": True}
+    pr_create_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/pullrequests?api-version=7.1-preview.1"
+    try:
+        async with semaphore:
+            pr = await ado.request(pr_create_url, method='POST', payload=_test_pr_payload(ticket), headers=auth_headers)
+    except urllib.error.HTTPError as e:
+        error_message = e.read().decode() if e.fp else str(e)
+        # Liste alındıktan sonra başka biri açtıysa ADO TF401179 ile 409 döner
+        if e.code == 409 and "TF401179" in error_message:
+            return {"status": "PR_ALREADY_OPEN", "pr_id": None, "error": error_message, "success": True}
+        logging.error(f"BulkPrOpen failed for '{ticket}' in '{repo_name}': {e.code} - {error_message}")
+        return {"status": "PR_CREATE_FAILED", "error": error_message, "success": False}
+    pr_id = pr.get("pullRequestId")
+    if pr_id:
+        pr_index.put(repo_id, ticket, pr_id, pr.get("lastMergeSourceCommit", {}).get("commitId") or status["sha"])
+    return {"status": "PR_OPENED", "pr_id": pr_id,
+            "pr_url": f"https://dev.azure.com/{AZURE_ORG}/{AZURE_PROJECT}/_git/{repo_name}/pullrequest/{pr_id}", "success": True}
+
+
+async def _iter_bulk_pr_open(url: str, tickets_by_repo: dict, auth_headers: dict):
+    """
+    Tüm (ticket, repo) çiftleri için PR açar ve (ticket, repo, sonuç) üçlülerini tamamlandıkları sırayla yield eder.
+    Repo hazırlığı repo başına bir kez yapılır; PR create'ler tüm repolarda BULK_PR_MAX_CONCURRENCY sınırını paylaşır.
+    Hazırlık ve her PR create ilgili reponun admission slot'u içinde çalışır.
+    """
+    semaphore = asyncio.Semaphore(BULK_PR_MAX_CONCURRENCY)
+    
+    async def _prepare(repo_name: str, tickets: list):
+        """Repo hazırlığı; başarısızsa repodaki tüm ticket'lara yazılacak tek sonuç (hata gövdesi bir kez okunur)."""
+        try:
+            async with ado.request_slot(url, REPO_MAP[repo_name]):
+                return await _prepare_repo_prs(repo_name, tickets, auth_headers), None
+        except ValueError:
+            return None, {"status": "TARGET_BRANCH_NOT_FOUND", "error": "Target branch 'test' does not exist in repository.", "success": False}
+        except Exception as e:
+            # AdmissionRejected de HTTPError'dır: repodaki ticket'lar 429 gövdesiyle EXECUTION_ERROR alır
+            error_message = e.read().decode() if isinstance(e, urllib.error.HTTPError) and e.fp else str(e)
+            logging.error(f"BulkPrOpen failed for '{repo_name}': {error_message}")
+            return None, {"status": "EXECUTION_ERROR", "error": error_message, "success": False}
+    
+    prepared = {name: asyncio.ensure_future(_prepare(name, tickets)) for name, tickets in tickets_by_repo.items()}
+    
+    async def _one(ticket: str, repo_name: str):
+        statuses, failure = await asyncio.shield(prepared[repo_name])
+        if failure is not None:
+            return ticket, repo_name, dict(failure)
+        try:
+            async with ado.request_slot(url, REPO_MAP[repo_name], write=True):
+                return ticket, repo_name, await _open_test_pr(repo_name, ticket, statuses[ticket], semaphore, auth_headers)
+        except AdmissionRejected as e:
+            return ticket, repo_name, {"status": "PR_CREATE_FAILED", "error": e.read().decode(), "success": False}
+    
+    pending = [asyncio.ensure_future(_one(ticket, name)) for name, tickets in tickets_by_repo.items() for ticket in tickets]
+    try:
+        for next_done in asyncio.as_completed(pending):
+            yield await next_done
+    finally:
+        for task in pending + list(prepared.values()):
+            task.cancel()
+
+
+@app.function_name(name="BulkPrOpen")
+@app.route(route="bulkPrOpen", methods=["get", "post"], auth_level=func.AuthLevel.ANONYMOUS)
+@_instrumented("bulkPrOpen")
+@_fail_fast(write=True)
+async def bulk_pr_open(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Çok sayıda (ticket, repo) çifti için test'e PR açar (sprint sonu toplu 'Code Review' geçişi).
+    Repo başına test head'i ve branch/PR listeleri bir kez okunur; PR create'ler BULK_PR_MAX_CONCURRENCY ile
+    sınırlı paralel çalışır. Sonuçlar ticket ve repo bazında döner, açık PR'lar hata değil PR_ALREADY_OPEN sayılır.
+    """
+    logging.info('BulkPrOpen function called.')
+    
+    try:
+        try:
+            body = req.get_json()
+        except ValueError:
+            body = None
+        pairs = _pr_pairs(req, body)
+        
+        if not pairs:
+            return func.HttpResponse(json.dumps({"status": "MISSING_PARAMETERS", "message": "❌ 'items' ([{ticket, repo}]) or 'tickets' and 'repo' parameters are required", "success": False}), status_code=400, mimetype="application/json")
+        
+        tickets_by_repo = {}
+        for ticket, repo_name in pairs:
+            tickets_by_repo.setdefault(repo_name, []).append(ticket)
+        unknown = [name for name in tickets_by_repo if await REPO_MAP.resolve(name) is None]
+        if unknown:
+            return func.HttpResponse(json.dumps({"status": "INVALID_REPO", "message": f"❌ Unknown repository '{', '.join(unknown)}'", "error": f"Available repos: {', '.join(REPO_MAP.keys())}", "success": False}), status_code=400, mimetype="application/json")
+        
+        auth_headers = _ado_auth_headers()
+        if auth_headers is None:
+            return func.HttpResponse(json.dumps({"error": "AZURE_PAT environment variable not set"}), status_code=500, mimetype="application/json")
+        
+        repo_names = list(tickets_by_repo)
+        items = _iter_bulk_pr_open(req.url, tickets_by_repo, auth_headers)
+        if _wants_ndjson(req):
+            async def _lines():
+                async for ticket, repo_name, result in items:
+                    yield {"ticket": ticket, "repo": repo_name, **result}
+            return await _ndjson_response(_lines(), "BULK_PR_RESULT", repos=repo_names)
+        
+        collected = {}
+        async for ticket, repo_name, result in items:
+            collected[(ticket, repo_name)] = result
+        results = {}
+        summary = {}
+        for ticket, repo_name in pairs:
+            result = collected[(ticket, repo_name)]
+            results.setdefault(ticket, {})[repo_name] = result
+            summary[result["status"]] = summary.get(result["status"], 0) + 1
+        all_success = all(result["success"] for result in collected.values())
+        logging.info(f"Bulk PR open finished for {len(pairs)} tickets in {len(repo_names)} repos: {summary}")
+        return func.HttpResponse(
+            json.dumps({
+                "status": "BULK_PR_RESULT",
+                "message": f"{'✅' if all_success else '⚠️'} {len(pairs)} PRs processed in {len(repo_names)} repos",
+                "repos": repo_names,
+                "summary": summary,
+                "results": results,
+                "success": all_success
+            }),
+            status_code=200 if all_success else 207,
+            mimetype="application/json"
+        )
+    
+    except Exception as e:
+        logging.error(f"Unexpected error in BulkPrOpen: {str(e)}")
+        return func.HttpResponse(json.dumps({"error": "Internal server error", "details": str(e)}), status_code=500, mimetype="application/json")
+
+
+@app.function_name(name="HealthCheck")
+@app.route(route="healthcheck", methods=["get"], auth_level=func.AuthLevel.ANONYMOUS)
+@_instrumented("healthcheck")
+def healthcheck(req: func.HttpRequest) -> func.HttpResponse:
+    logging.info('HealthCheck function called.')
+    # ADO devresi açıkken worker sağlıklıdır ama ADO işlemleri 503 döner; durum DEGRADED olarak gösterilir
+    # (200 kalır: kesinti tüm instance'ları etkilediği için instance'ın trafikten çıkarılması bir şey çözmez)
+    client_stats = ado.stats()
+    breaker_stats = client_stats.pop("circuit_breaker", {})
+    admission_stats = client_stats.pop("admission", {})
+    ado_retry_after = ado.circuit_retry_after()
+    health_status, health_message = ("OK", "OK - All systems working!") if ado_retry_after is None else \
+        ("DEGRADED", f"DEGRADED - Azure DevOps circuit open, retrying in {math.ceil(ado_retry_after)}s")
+    # ?details=1 ile cache istatistikleri de döner
+    if req.params.get('details') == '1':
+        return func.HttpResponse(
+            json.dumps({
+                "status": health_status,
+                "message": health_message,
+                "ref_cache": ref_cache.stats(),
+                "idempotency": idempotency.stats(),
+                "merge_train": merge_train.stats(),
+                "ado_client": client_stats,
+                "repo_map": REPO_MAP.stats(),
+                "pr_index": pr_index.stats(),
+                "ancestry_cache": ancestry_cache.stats(),
+                "circuit_breaker": breaker_stats,
+                "admission": admission_stats,
+                "state_store": state_store.stats() if state_store is not None else None
+            }),
+            status_code=200,
+            mimetype="application/json"
+        )
+    return func.HttpResponse(health_message)
+
+
+@app.function_name(name="Metrics")
+@app.route(route="metrics", methods=["get"], auth_level=func.AuthLevel.ANONYMOUS)
+def metrics_endpoint(req: func.HttpRequest) -> func.HttpResponse:
+    """Route/ADO işlemi histogramları ile cache ve rate limiter sayaçlarını Prometheus text formatında döndürür."""
+    cache = ref_cache.stats()
+    dedup = idempotency.stats()
+    train = merge_train.stats()
+    client = ado.stats()
+    limiter = client.get("rate_limiter", {})
+    prs = pr_index.stats()
+    ancestry = ancestry_cache.stats()
+    gauges = [
+        ("jira_ado_ref_cache_lookups_total", "Ref cache lookups by result", "counter", {"result": "hit"}, cache["hits"]),
+        ("jira_ado_ref_cache_lookups_total", "Ref cache lookups by result", "counter", {"result": "miss"}, cache["misses"]),
+        ("jira_ado_ref_cache_evictions_total", "Ref cache LRU evictions", "counter", {}, cache["evictions"]),
+        ("jira_ado_ref_cache_invalidations_total", "Ref cache invalidations", "counter", {}, cache["invalidations"]),
+        ("jira_ado_ref_cache_entries", "Ref cache entries", "gauge", {}, cache["entries"]),
+        ("jira_ado_idempotency_replays_total", "Duplicate requests served from the idempotency cache", "counter", {}, dedup["replays"]),
+        ("jira_ado_idempotency_coalesced_total", "Duplicate requests joined to an in-flight request", "counter", {}, dedup["coalesced"]),
+        ("jira_ado_merge_train_batches_total", "DevMerge batches processed", "counter", {}, train["batches"]),
+        ("jira_ado_merge_train_merged_total", "Merges applied through the merge train", "counter", {}, train["merged"]),
+        ("jira_ado_merge_train_ref_retries_total", "Merge train rebuilds after dev moved", "counter", {}, train["ref_retries"]),
+        ("jira_ado_pr_index_lookups_total", "PR index lookups by result", "counter", {"result": "hit"}, prs["hits"]),
+        ("jira_ado_pr_index_lookups_total", "PR index lookups by result", "counter", {"result": "miss"}, prs["misses"]),
+        ("jira_ado_pr_index_stale_total", "Indexed PRs that could not be completed and fell back to search", "counter", {}, prs["stale"]),
+        ("jira_ado_ancestry_cache_lookups_total", "DevMerge ancestry checks by result", "counter", {"result": "hit"}, ancestry["hits"]),
+        ("jira_ado_ancestry_cache_lookups_total", "DevMerge ancestry checks by result", "counter", {"result": "miss"}, ancestry["misses"]),
+        ("jira_ado_outbound_retries_total", "Outbound ADO requests retried after 429/503", "counter", {}, client["retries"]),
+        ("jira_ado_outbound_throttled_total", "ADO 429 responses", "counter", {}, limiter.get("throttled", 0)),
+        ("jira_ado_rate_limit_per_second", "Current outbound rate limit", "gauge", {}, limiter.get("rate_per_second", 0)),
+        ("jira_ado_outbound_timeouts_total", "Outbound ADO requests that hit the client timeout", "counter", {}, client["timeouts"]),
+    ]
+    breaker = client.get("circuit_breaker", {})
+    gauges.append(("jira_ado_circuit_rejected_total", "Outbound ADO requests rejected while a circuit was open", "counter", {}, breaker.get("rejected", 0)))
+    for scope, circuit in breaker.get("circuits", {}).items():
+        gauges.append(("jira_ado_circuit_open", "ADO circuit state (1 = open or half-open)", "gauge", {"scope": scope}, int(circuit["state"] != "closed")))
+    if state_store is not None:
+        shared = state_store.stats()
+        gauges += [
+            ("jira_ado_ref_cache_shared_hits_total", "Ref cache misses served from the shared state store", "counter", {}, cache["shared_hits"]),
+            ("jira_ado_idempotency_shared_replays_total", "Duplicate requests replayed from another worker's result", "counter", {}, dedup["shared_replays"]),
+            ("jira_ado_state_store_conflicts_total", "State store writes rejected by the version check", "counter", {}, shared["conflicts"]),
+            ("jira_ado_state_store_lock_waits_total", "State store lock acquisitions that had to wait", "counter", {}, shared["lock_waits"]),
+            ("jira_ado_state_store_lock_timeouts_total", "State store locks not acquired within the timeout", "counter", {}, shared["lock_timeouts"]),
+            ("jira_ado_merge_train_unlocked_batches_total", "DevMerge batches run without the repo lock", "counter", {}, train["unlocked_batches"]),
+        ]
+    admission = client.get("admission", {})
+    if admission:
+        gauges += [
+            ("jira_ado_admission_active", "ADO calls currently holding a concurrency slot", "gauge", {}, admission["active"]),
+            ("jira_ado_admission_waiting", "ADO calls waiting in the admission queue", "gauge", {}, admission["waiting"]),
+            ("jira_ado_admission_queued_total", "ADO calls that had to wait for a slot", "counter", {}, admission["queued"]),
+            ("jira_ado_admission_rejected_total", "ADO calls shed with 429", "counter", {"reason": "queue_full"}, admission["rejected"]),
+            ("jira_ado_admission_rejected_total", "ADO calls shed with 429", "counter", {"reason": "timeout"}, admission["timed_out"]),
+        ]
+    return func.HttpResponse(
+        metrics.render(gauges),
+        status_code=200,
+        mimetype="text/plain",
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+    )
+
+
+# Warm-up: DNS çözümü, havuzdaki TLS bağlantısı ve dev/test ref cache'i ilk Jira isteğinden önce hazırlanır
+WARMUP_SCHEDULE = os.environ.get("WARMUP_SCHEDULE", "0 */5 * * * *")
+WARMUP_BRANCHES = ("dev", "test")
+# Projedeki tüm repolar yerine sadece Jira akışında kullanılanlar ısıtılır (virgüllü liste ile değiştirilebilir)
+WARMUP_REPOS = [r.strip() for r in os.environ.get("WARMUP_REPOS", ",".join(MANAGED_REPOS)).split(",") if r.strip()]
+
+
+async def _warm_up() -> dict:
+    """Repo listesini yeniler, her repo için dev/test head'lerini alıp ref cache'e yazar; repo -> {branch: sha | hata} döndürür."""
+    auth_headers = _ado_auth_headers()
+    if auth_headers is None:
+        logging.warning("Warm-up skipped: AZURE_PAT environment variable not set")
+        return {}
+    
+    await REPO_MAP.refresh()
+    
+    semaphore = asyncio.Semaphore(FANOUT_MAX_CONCURRENCY)
+    
+    async def _warm_branch(repo_id: str, branch: str) -> str:
+        async with semaphore:
+            url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?filter=heads/{branch}&api-version=7.1-preview.1"
+            try:
+                refs = (await ado.request(url, headers=auth_headers)).get("value", [])
+            except urllib.error.HTTPError as e:
+                return f"error: {e.code}"
+            # filter prefix eşleşmesi yapar (dev -> develop); tam isim aranır
+            sha = next((ref["objectId"] for ref in refs if ref["name"] == f"refs/heads/{branch}"), None)
+            if sha is None:
+                return "not found"
+            ref_cache.put(repo_id, branch, sha)
+            return sha
+    
+    pairs = [(repo_name, branch) for repo_name in WARMUP_REPOS if repo_name in REPO_MAP for branch in WARMUP_BRANCHES]
+    shas = await asyncio.gather(*(_warm_branch(REPO_MAP[repo_name], branch) for repo_name, branch in pairs), return_exceptions=True)
+    results = {}
+    for (repo_name, branch), sha in zip(pairs, shas):
+        results.setdefault(repo_name, {})[branch] = f"error: {sha}" if isinstance(sha, Exception) else sha
+    return results
+
+
+@app.function_name(name="WarmUp")
+@app.timer_trigger(
+    schedule=WARMUP_SCHEDULE,
+    arg_name="timer",
+    run_on_startup=os.environ.get("WARMUP_ON_STARTUP", "true").lower() == "true",
+    use_monitor=False
+)
+async def warm_up(timer: func.TimerRequest) -> None:
+    """Worker'ı sıcak tutar: bağlantı havuzunu açar ve dev/test ref cache'ini doldurur."""
+    results = await _warm_up()
+    logging.info(f"WarmUp finished for {len(results)} repos: {json.dumps(results)}")
+
+
+# ADO service hook'ları (git.push, git.pullrequest.*): yeni ref SHA'larını ve PR durumunu ref cache ile PR index'ine
+# yazar. Zorunlu: hook aboneliğinde 'X-Hook-Secret' header'ı olarak gönderilir; tanımlı değilse route tüm istekleri reddeder.
+SERVICE_HOOK_SECRET = os.environ.get("SERVICE_HOOK_SECRET")
+# Hook'tan gelen kayıtlar event zamanından itibaren en fazla bu süre okunur; sonra (ya da hook gecikirse) API'ye dönülür
+SERVICE_HOOK_MAX_STALENESS_SECONDS = float(os.environ.get("SERVICE_HOOK_MAX_STALENESS_SECONDS", "60"))
+if not SERVICE_HOOK_SECRET:
+    logging.warning("SERVICE_HOOK_SECRET is not set; /api/adohook will reject all requests")
+
+
+@app.function_name(name="AdoServiceHook")
+@app.route(route="adohook", methods=["post"], auth_level=func.AuthLevel.ANONYMOUS)
+@_instrumented("adohook")
+def ado_service_hook(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Azure DevOps service hook payload'larını (git.push, git.pullrequest.created/updated/merged) alır
+    ve ref cache / PR index'ine uygular. Desteklenmeyen event'ler 200 ile yok sayılır.
+    """
+    if not SERVICE_HOOK_SECRET:
+        return func.HttpResponse(json.dumps({"status": "SERVICE_HOOK_NOT_CONFIGURED", "message": "❌ SERVICE_HOOK_SECRET is not configured", "success": False}), status_code=503, mimetype="application/json")
+    if not hmac.compare_digest(req.headers.get("X-Hook-Secret", ""), SERVICE_HOOK_SECRET):
+        return func.HttpResponse(json.dumps({"status": "UNAUTHORIZED", "message": "❌ Invalid or missing X-Hook-Secret header", "success": False}), status_code=401, mimetype="application/json")
+
+    try:
+        event = req.get_json()
+        result = service_hooks.apply_event(
+            event, REPO_MAP, ref_cache, pr_index,
+            max_age=SERVICE_HOOK_MAX_STALENESS_SECONDS, track_branches=WARMUP_BRANCHES
+        )
+    except ValueError as e:
+        logging.warning(f"Rejected service hook payload: {str(e)}")
+        return func.HttpResponse(json.dumps({"status": "INVALID_PAYLOAD", "message": f"❌ {str(e)}", "success": False}), status_code=400, mimetype="application/json")
+
+    applied = result["applied"] > 0
+    metrics.inc("jira_ado_service_hook_events_total",
+                {"event": str(result["event"]), "result": "applied" if applied else "ignored"},
+                help_text="Azure DevOps service hook events received, by event type and result")
+    logging.info(f"Service hook {result['event']} for '{result['repo']}': {result}")
+    return func.HttpResponse(
+        json.dumps({
+            "status": "HOOK_APPLIED" if applied else "HOOK_IGNORED",
+            "message": f"{'✅' if applied else 'ℹ️'} {result['event']}: {result['applied']} cache updates applied",
+            **result,
+            "success": True
+        }),
+        status_code=200,
+        mimetype="application/json"
+    )
+
+
+# Stale branch reaper: ticket isimli branch'lerden REAPER_BASE_BRANCH'teki branch'lerden birine tamamen merge
+# edilmiş ya da son commit'i REAPER_MAX_AGE_DAYS'den eski olanlar silinir. Timer varsayılan olarak sadece raporlar.
+REAPER_SCHEDULE = os.environ.get("REAPER_SCHEDULE", "0 0 3 * * *")
+REAPER_DRY_RUN = os.environ.get("REAPER_DRY_RUN", "true").lower() == "true"
+# Bu uygulamanın akışında iş PR ile test'e girer. dev varsayılan değildir: dev'den yeni açılmış, henüz commit
+# almamış branch da dev'e göre "merge edilmiş" görünür.
+REAPER_BASE_BRANCHES = [b.strip() for b in os.environ.get("REAPER_BASE_BRANCH", "test").split(",") if b.strip()]
+# Silme yapan reaper sadece bu repolara dokunur (projedeki diğer repolar taranmaz)
+REAPER_REPOS = [r.strip() for r in os.environ.get("REAPER_REPOS", ",".join(MANAGED_REPOS)).split(",") if r.strip()]
+REAPER_MAX_AGE_DAYS = float(os.environ.get("REAPER_MAX_AGE_DAYS", "90"))
+REAPER_PAGE_SIZE = int(os.environ.get("REAPER_PAGE_SIZE", "500"))
+_TICKET_BRANCH_PATTERN = re.compile(BRANCH_REGEX)
+
+
+def _commit_timestamp(commit: dict):
+    """Branch stats cevabındaki committer tarihini epoch saniyesine çevirir (yoksa None)."""
+    date = ((commit or {}).get("committer") or {}).get("date")
+    if not date:
+        return None
+    try:
+        parsed = datetime.datetime.strptime(date[:19], "%Y-%m-%dT%H:%M:%S")
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+async def _reap_repo(repo_name: str, dry_run: bool, auth_headers: dict) -> dict:
+    """
+    Repo'nun branch'lerini refs API'sinden sayfa sayfa (continuation token) okur; sayfadaki ticket
+    branch'leri için ahead/behind ve son commit tarihini alır, silinecekleri REFS_BATCH_SIZE'lık
+    refs POST'larıyla siler. Açık PR'ı olan branch'lere dokunulmaz. Repo bazında rapor döndürür.
+    """
+    repo_id = REPO_MAP[repo_name]
+    repo_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}"
+    cutoff = time.time() - REAPER_MAX_AGE_DAYS * 86400
+    semaphore = asyncio.Semaphore(FANOUT_MAX_CONCURRENCY)
+    report = {"repo": repo_name, "dry_run": dry_run, "scanned": 0, "candidates": 0,
+              "skipped_open_pr": 0, "reaped": {}, "failed": {}, "errors": 0}
+    pending = []
+
+    # Açık PR'ların source branch'leri (genelde az sayıda)
+    with tracing.span("list open PRs"):
+        open_pr_refs = {pr.get("sourceRefName") for pr in await _list_active_prs(repo_id, auth_headers)}
+
+    async def _reason(ref: dict):
+        branch = ref["name"][len("refs/heads/"):]
+        stats = None
+        # Base branch'ler sırayla denenir; ilkinde merge edilmiş görünen branch için diğerleri sorulmaz
+        for base_branch in REAPER_BASE_BRANCHES:
+            url = (f"{repo_url}/stats/branches?name={urllib.parse.quote(branch, safe='')}"
+                   f"&baseVersionDescriptor.version={urllib.parse.quote(base_branch, safe='')}"
+                   f"&baseVersionDescriptor.versionType=branch&api-version=7.1-preview.1")
+            async with semaphore:
+                stats = await ado.request(url, headers=auth_headers)
+            if stats.get("aheadCount") == 0:
+                return "merged"
+        committed_at = _commit_timestamp((stats or {}).get("commit"))
+        if committed_at is not None and committed_at < cutoff:
+            return "stale"
+        return None
+
+    async def _flush():
+        batch = pending[:]
+        pending.clear()
+        if dry_run:
+            report["reaped"].update({update["name"][len("refs/heads/"):]: reason for update, reason in batch})
+            return
+        ref_results = await _post_ref_updates(repo_id, [update for update, _ in batch], auth_headers)
+        for update, reason in batch:
+            ref_result = ref_results[update["name"]]
+            branch = update["name"][len("refs/heads/"):]
+            if ref_result.get("success"):
+                report["reaped"][branch] = reason
+            else:
+                report["failed"][branch] = ref_result.get("updateStatus")
+
+    refs_url = f"{repo_url}/refs?filter=heads/&api-version=7.1-preview.1"
+    async for page in ado.iter_pages(refs_url, headers=auth_headers, page_size=REAPER_PAGE_SIZE):
+        report["scanned"] += len(page)
+        candidates = []
+        for ref in page:
+            branch = ref["name"][len("refs/heads/"):]
+            if branch.lower() in PROTECTED_BRANCHES or not _TICKET_BRANCH_PATTERN.match(branch.split('/')[-1]):
+                continue
+            if ref["name"] in open_pr_refs:
+                report["skipped_open_pr"] += 1
+                continue
+            candidates.append(ref)
+        report["candidates"] += len(candidates)
+
+        with tracing.span("branch stats"):
+            reasons = await asyncio.gather(*(_reason(ref) for ref in candidates), return_exceptions=True)
+        for ref, reason in zip(candidates, reasons):
+            if isinstance(reason, Exception):
+                report["errors"] += 1
+                logging.warning(f"Reaper could not read stats for '{ref['name']}' in '{repo_name}': {str(reason)}")
+            elif reason is not None:
+                # oldObjectId kontrolü: tarama sonrası commit alan branch silinmez
+                pending.append(({"name": ref["name"], "oldObjectId": ref["objectId"], "newObjectId": ZERO_SHA}, reason))
+        if len(pending) >= REFS_BATCH_SIZE:
+            await _flush()
+    if pending:
+        await _flush()
+    return report
+
+
+async def _reap_branches(repo_names: list, dry_run: bool) -> list:
+    """
+    Repoları sırayla tarar (ADO'ya yük bindirmemek için); bir repodaki hata diğerlerini durdurmaz.
+    Her repo o reponun admission slot'u içinde taranır (timer'da da istek gibi repo başına tek slot).
+    """
+    auth_headers = _ado_auth_headers()
+    if auth_headers is None:
+        raise ValueError("AZURE_PAT environment variable not set")
+    reports = []
+    for repo_name in repo_names:
+        repo_id = REPO_MAP[repo_name]
+        repo_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}"
+        try:
+            async with ado.request_slot(repo_url, repo_id, write=not dry_run):
+                reports.append(await _reap_repo(repo_name, dry_run, auth_headers))
+        except Exception as e:
+            error_message = e.read().decode() if isinstance(e, urllib.error.HTTPError) and e.fp else str(e)
+            logging.error(f"Reaper failed for '{repo_name}': {error_message}")
+            reports.append({"repo": repo_name, "dry_run": dry_run, "error": error_message})
+    return reports
+
+
+@app.function_name(name="StaleBranchReaper")
+@app.timer_trigger(schedule=REAPER_SCHEDULE, arg_name="timer", run_on_startup=False, use_monitor=True)
+async def stale_branch_reaper(timer: func.TimerRequest) -> None:
+    """Zamanlanmış stale branch temizliği; REAPER_DRY_RUN=false olmadıkça sadece rapor loglar."""
+    reports = await _reap_branches(REAPER_REPOS, REAPER_DRY_RUN)
+    for report in reports:
+        logging.info(json.dumps({"event": "branch_reaper", **report}))
+
+
+@app.function_name(name="ReapBranches")
+@app.route(route="reapBranches", methods=["get", "post"], auth_level=func.AuthLevel.FUNCTION)
+@_instrumented("reapBranches")
+@_fail_fast
+async def reap_branches(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Reaper'ı elle çalıştırır (function key gerekir). Varsayılan dry-run raporudur (silinecek branch'ler
+    ve sebepleri); silmek için dry_run=0 verilmelidir. repo verilmezse REAPER_REPOS repoları taranır,
+    verilirse REAPER_REPOS içinde olmalıdır.
+    """
+    logging.info('ReapBranches function called.')
+    
+    try:
+        repo_name = req.params.get('repo')
+        dry_run = req.params.get('dry_run', '1') != '0'
+        
+        if repo_name and (repo_name not in REAPER_REPOS or await REPO_MAP.resolve(repo_name) is None):
+            return func.HttpResponse(json.dumps({"status": "INVALID_REPO", "message": f"❌ Repository '{repo_name}' is not managed by the reaper", "error": f"Reaper repos: {', '.join(REAPER_REPOS)}", "success": False}), status_code=400, mimetype="application/json")
+        
+        try:
+            reports = await _reap_branches([repo_name] if repo_name else REAPER_REPOS, dry_run)
+        except ValueError as e:
+            return func.HttpResponse(json.dumps({"error": str(e)}), status_code=500, mimetype="application/json")
+        
+        total = sum(len(report.get("reaped", {})) for report in reports)
+        all_success = not any(report.get("error") or report.get("failed") for report in reports)
+        return func.HttpResponse(
+            json.dumps({
+                "status": "REAPER_DRY_RUN" if dry_run else "REAPER_RESULT",
+                "message": f"{'✅' if all_success else '⚠️'} {total} branches {'would be deleted' if dry_run else 'deleted'}",
+                "base_branches": REAPER_BASE_BRANCHES,
+                "max_age_days": REAPER_MAX_AGE_DAYS,
+                "repos": reports,
+                "success": all_success
+            }),
+            status_code=200 if all_success else 207,
+            mimetype="application/json"
+        )
+    
+    except Exception as e:
+        logging.error(f"Unexpected error in ReapBranches: {str(e)}")
+        return func.HttpResponse(json.dumps({"error": "Internal server error", "details": str(e)}), status_code=500, mimetype="application/json")
+
+
+@app.function_name(name="DevMerge")
+@app.route(route="devmerge", methods=["get"], auth_level=func.AuthLevel.ANONYMOUS)
+@_instrumented("devmerge")
+@_fail_fast(write=True)
+@_async_job("devmerge")
+@_idempotent("devmerge")
+async def dev_merge(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Feature branch'i 'dev' branch'ine merge eder (branch'i silmez).
+    Hem 'In Development -> Code Review' hem 'Code Review -> Analyst Appr.' için kullanılır.
+    """
+    logging.info('DevMerge function called.')
+    
+    try:
+        ticket = req.params.get('ticket')
+        repo_name = req.params.get('repo')
+
+        # --- 1. Parametre ve Ortam Değişkeni Kontrolleri ---
+        if not ticket or not repo_name:
+            return func.HttpResponse(json.dumps({"status": "MISSING_PARAMETERS", "message": "❌ 'ticket' and 'repo' parameters are required"}), status_code=400, mimetype="application/json")
+        
+        if await REPO_MAP.resolve(repo_name) is None:
             return func.HttpResponse(json.dumps({"status": "INVALID_REPO", "message": f"❌ Unknown repository '{repo_name}'"}), status_code=400, mimetype="application/json")
 
-        azure_pat = os.environ.get("AZURE_PAT")
-        if not azure_pat:
+        auth_headers = _ado_auth_headers()
+        if auth_headers is None:
             return func.HttpResponse(json.dumps({"error": "AZURE_PAT environment variable not set"}), status_code=500, mimetype="application/json")
 
         repo_id = REPO_MAP[repo_name]
         
         # --- 2. İzole Yardımcı Fonksiyonlar ---
-        import urllib.request, urllib.error, urllib.parse, base64
-
-        def _dm_do_request(url: str, method: str = 'GET', payload: dict = None) -> dict:
-            """DevMerge fonksiyonuna özel request yardımcısı."""
-            headers = {
-                "Authorization": f"Basic {base64.b64encode(f':{azure_pat}'.encode()).decode()}",
-                "Content-Type": "application/json"
-            }
-            data = json.dumps(payload).encode() if payload is not None else None
-            req_obj = urllib.request.Request(url, data=data, method=method, headers=headers)
-            with urllib.request.urlopen(req_obj) as resp:
-                txt = resp.read().decode()
-                return json.loads(txt) if txt else {}
+        async def _dm_do_request(url: str, method: str = 'GET', payload: dict = None, idempotent: bool = None) -> dict:
+            """DevMerge fonksiyonuna özel request yardımcısı (paylaşılan ado istemcisi üzerinden)."""
+            return await ado.request(url, method=method, payload=payload, headers=auth_headers, idempotent=idempotent)
 
-        def _dm_get_branch_sha(branch_name: str) -> str:
+        async def _dm_get_branch_sha(branch_name: str) -> str:
             """DevMerge fonksiyonuna özel SHA alma yardımcısı."""
             encoded_branch = urllib.parse.quote(branch_name, safe='')
-            url = f"https://dev.azure.com/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?filter=heads/{encoded_branch}&api-version=7.1-preview.1"
-            refs = _dm_do_request(url)
+            url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?filter=heads/{encoded_branch}&api-version=7.1-preview.1"
+            refs = await _dm_do_request(url)
             if 'value' in refs and len(refs['value']) > 0:
                 return refs['value'][0]['objectId']
             raise ValueError(f"Branch '{branch_name}' not found or SHA could not be retrieved.")
 
+        async def _dm_get_dev_sha(fresh: bool) -> str:
+            """Merge train için dev SHA'sı; fresh=True ise cache atlanır."""
+            if fresh:
+                ref_cache.invalidate(repo_id, 'dev')
+            return await ref_cache.get_or_fetch(repo_id, 'dev', _dm_get_branch_sha)
+
+        async def _dm_create_merge(source_sha: str, dev_sha: str, branch_name: str) -> str:
+            """Basic 3-way merge (merge commit oluşturur), commit SHA'sını döndürür."""
+            merge_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/merges?api-version=7.1-preview.1"
+            merge_payload = {
+                "parents": [source_sha, dev_sha],
+                "comment": f"Merge {branch_name} into dev"
+            }
+            merge_result = await _dm_do_request(merge_url, method='POST', payload=merge_payload)
+            logging.info(f"Successfully created merge commit: {merge_result['commitId']}")
+            return merge_result['commitId']
+
+        async def _dm_ahead_count(source_sha: str, dev_sha: str) -> int:
+            """Feature branch'in dev'de olmayan commit sayısı (diffs/commits aheadCount)."""
+            diff_url = (f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/diffs/commits"
+                        f"?baseVersion={dev_sha}&baseVersionType=commit&targetVersion={source_sha}&targetVersionType=commit"
+                        f"&$top=1&api-version=7.1-preview.1")
+            diff = await _dm_do_request(diff_url)
+            return int(diff.get('aheadCount', 1))
+
+        async def _dm_is_merged(source_sha: str, dev_sha: str) -> bool:
+            """
+            Feature branch dev'den ulaşılabiliyorsa True; kontrol başarısız olursa merge'e devam edilir.
+            Bilinen SHA'lar (aynı SHA, uygulamanın dev'e merge ettiği source, cache'teki çift) API'ye gitmez;
+            diğer durumlarda diffs/commits aheadCount sorulur (branch dev'e elle ya da başka yoldan girmiş olabilir).
+            """
+            if ancestry_cache.known_merged(repo_id, source_sha, dev_sha):
+                return True
+            try:
+                return await ancestry_cache.is_merged(repo_id, source_sha, dev_sha, _dm_ahead_count)
+            except urllib.error.HTTPError as diff_err:
+                logging.warning(f"Ancestry check failed for '{ticket}' ({diff_err.code}), merging anyway")
+                return False
+
+        async def _dm_update_dev(old_sha: str, new_sha: str) -> bool:
+            """Dev branch'ini oldObjectId kontrolü ile günceller; dev bu arada ilerlediyse False döner."""
+            update_ref_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?api-version=7.1-preview.1"
+            update_payload = [{"name": "refs/heads/dev", "oldObjectId": old_sha, "newObjectId": new_sha}]
+            try:
+                # oldObjectId kontrolü sayesinde tekrar gönderimi güvenli
+                update_result = await _dm_do_request(update_ref_url, method='POST', payload=update_payload, idempotent=True)
+            except urllib.error.HTTPError as update_err:
+                if update_err.code != 409:
+                    raise
+                return False
+            if not all(r.get('success', True) for r in update_result.get('value', [])):
+                return False
+            ref_cache.apply_updates(repo_id, update_payload)
+            logging.info(f"Successfully updated dev branch to: {new_sha}")
+            return True
+
         # --- 3. Ana Akış ---
-        # Branch SHA'larını al
-        source_sha = _dm_get_branch_sha(ticket)
-        target_sha = _dm_get_branch_sha('dev')
+        # Feature branch SHA'sı her zaman API'den, dev SHA'sı ref cache'ten alınır (ikisi paralel).
+        # Jira planı içinde çalışılıyorsa aynı lookup'lar diğer adımlarla paylaşılır.
+        source_sha, target_sha = await _gather_or_raise(
+            tracing.traced("get source sha", lookups.shared(("branch_sha", repo_id, ticket), lambda: _dm_get_branch_sha(ticket))),
+            tracing.traced("get dev sha", lookups.shared(("branch_sha", repo_id, 'dev'), lambda: _dm_get_dev_sha(False)))
+        )
+        
+        # Branch'ler aynı SHA'daysa ya da feature branch dev'in atasıysa (önceki geçişte merge edilmiş) merge gerekli değil
+        with tracing.span("ancestry check"):
+            already_merged = await _dm_is_merged(source_sha, target_sha)
+        if already_merged:
+            result = {"status": "ALREADY_UP_TO_DATE", "dev_sha": target_sha}
+        else:
+            # Aynı repoya kısa sürede gelen merge'ler tek dev update'inde birleştirilir
+            # ("merge train" aşaması batch penceresini de kapsar; merge/update süreleri ayrıca yazılır)
+            with tracing.span("merge train"):
+                result = await merge_train.submit(
+                    repo_id, ticket, source_sha,
+                    get_dev_sha=_dm_get_dev_sha,
+                    create_merge=_dm_create_merge,
+                    update_dev=_dm_update_dev
+                )
         
-        # Eğer branch'ler aynı SHA'ya sahipse, merge gerekli değil
-        if source_sha == target_sha:
+        if result["status"] == "DEV_MERGE_OK":
+            # Aynı SHA ile tekrar gelen DevMerge (sonraki Jira geçişi) diffs çağrısı olmadan atlanır
+            ancestry_cache.mark_merged(repo_id, source_sha)
+
+        if result["status"] == "ALREADY_UP_TO_DATE":
             logging.info(f"Branch '{ticket}' already up to date with dev")
             return func.HttpResponse(json.dumps({
                 "status": "ALREADY_UP_TO_DATE",
                 "message": f"✅ Branch '{ticket}' is already up to date with dev.",
                 "branch": ticket,
                 "repo": repo_name,
-                "dev_sha": target_sha
+                "dev_sha": result["dev_sha"]
             }), status_code=200, mimetype="application/json")
-        else:
-            # Basic 3-way merge (merge commit oluşturur)
-            merge_url = f"https://dev.azure.com/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/merges?api-version=7.1-preview.1"
-            merge_payload = {
-                "parents": [source_sha, target_sha],
-                "comment": f"Merge {ticket} into dev"
-            }
-            try:
-                merge_result = _dm_do_request(merge_url, method='POST', payload=merge_payload)
-                new_merge_commit_sha = merge_result['commitId']
-                logging.info(f"Successfully created merge commit: {new_merge_commit_sha}")
-                
-                # Dev branch'ini yeni merge commit'e güncelle
-                update_ref_url = f"https://dev.azure.com/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?api-version=7.1-preview.1"
-                update_payload = [{"name": "refs/heads/dev", "oldObjectId": target_sha, "newObjectId": new_merge_commit_sha}]
-                _dm_do_request(update_ref_url, method='POST', payload=update_payload)
-                logging.info(f"Successfully updated dev branch to merge commit: {new_merge_commit_sha}")
-                
-            except urllib.error.HTTPError as merge_err:
-                if merge_err.code == 409:
-                    return func.HttpResponse(json.dumps({"status": "MERGE_CONFLICT", "message": f"⚠️ Merge conflict: '{ticket}' has conflicts with dev. Manual merge required."}), status_code=409, mimetype="application/json")
-                raise
+        
+        if result["status"] == "MERGE_CONFLICT":
+            return func.HttpResponse(json.dumps({"status": "MERGE_CONFLICT", "message": f"⚠️ Merge conflict: '{ticket}' has conflicts with dev. Manual merge required."}), status_code=409, mimetype="application/json")
+        
+        if result["status"] == "DEV_UPDATE_CONFLICT":
+            return func.HttpResponse(json.dumps({"status": "MERGE_CONFLICT", "message": f"⚠️ Merge conflict: dev branch was updated concurrently while merging '{ticket}'. Please retry."}), status_code=409, mimetype="application/json")
 
         # Başarılı Sonuç
         resp = {
@@ -536,9 +2047,10 @@ def dev_merge(req: func.HttpRequest) -> func.HttpResponse:
             "message": f"✅ Successfully merged '{ticket}' into dev.",
             "branch": ticket,
             "repo": repo_name,
-            "dev_old_sha": target_sha,
-            "dev_new_sha": new_merge_commit_sha,
-            "merge_commit": new_merge_commit_sha
+            "dev_old_sha": result["dev_old_sha"],
+            "dev_new_sha": result["dev_new_sha"],
+            "merge_commit": result["merge_commit"],
+            "batch_size": result["batch_size"]
         }
         return func.HttpResponse(json.dumps(resp), status_code=200, mimetype="application/json")
 
@@ -555,7 +2067,11 @@ def dev_merge(req: func.HttpRequest) -> func.HttpResponse:
 
 @app.function_name(name="PrOpen")
 @app.route(route="propen", methods=["get"], auth_level=func.AuthLevel.ANONYMOUS)
-def pr_open(req: func.HttpRequest) -> func.HttpResponse:
+@_instrumented("propen")
+@_fail_fast(write=True)
+@_async_job("propen")
+@_idempotent("propen")
+async def pr_open(req: func.HttpRequest) -> func.HttpResponse:
     """
     Feature branch'ten 'test' branch'ine PR açar.
     'In Development -> Code Review' workflow'u için kullanılır.
@@ -570,44 +2086,36 @@ def pr_open(req: func.HttpRequest) -> func.HttpResponse:
         if not ticket or not repo_name:
             return func.HttpResponse(json.dumps({"status": "MISSING_PARAMETERS", "message": "❌ 'ticket' and 'repo' parameters are required"}), status_code=400, mimetype="application/json")
         
-        if repo_name not in REPO_MAP:
+        if await REPO_MAP.resolve(repo_name) is None:
             return func.HttpResponse(json.dumps({"status": "INVALID_REPO", "message": f"❌ Unknown repository '{repo_name}'"}), status_code=400, mimetype="application/json")
 
-        azure_pat = os.environ.get("AZURE_PAT")
-        if not azure_pat:
+        auth_headers = _ado_auth_headers()
+        if auth_headers is None:
             return func.HttpResponse(json.dumps({"error": "AZURE_PAT environment variable not set"}), status_code=500, mimetype="application/json")
 
         repo_id = REPO_MAP[repo_name]
         
         # --- 2. İzole Yardımcı Fonksiyonlar ---
-        import urllib.request, urllib.error, urllib.parse, base64
+        async def _po_do_request(url: str, method: str = 'GET', payload: dict = None) -> dict:
+            """PrOpen fonksiyonuna özel request yardımcısı (paylaşılan ado istemcisi üzerinden)."""
+            return await ado.request(url, method=method, payload=payload, headers=auth_headers)
 
-        def _po_do_request(url: str, method: str = 'GET', payload: dict = None) -> dict:
-            """PrOpen fonksiyonuna özel request yardımcısı."""
-            headers = {
-                "Authorization": f"Basic {base64.b64encode(f':{azure_pat}'.encode()).decode()}",
-                "Content-Type": "application/json"
-            }
-            data = json.dumps(payload).encode() if payload is not None else None
-            req_obj = urllib.request.Request(url, data=data, method=method, headers=headers)
-            with urllib.request.urlopen(req_obj) as resp:
-                txt = resp.read().decode()
-                return json.loads(txt) if txt else {}
-
-        def _po_get_branch_sha(branch_name: str) -> str:
+        async def _po_get_branch_sha(branch_name: str) -> str:
             """PrOpen fonksiyonuna özel SHA alma yardımcısı."""
             encoded_branch = urllib.parse.quote(branch_name, safe='')
-            url = f"https://dev.azure.com/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?filter=heads/{encoded_branch}&api-version=7.1-preview.1"
-            refs = _po_do_request(url)
+            url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?filter=heads/{encoded_branch}&api-version=7.1-preview.1"
+            refs = await _po_do_request(url)
             if 'value' in refs and len(refs['value']) > 0:
                 return refs['value'][0]['objectId']
             raise ValueError(f"Branch '{branch_name}' not found or SHA could not be retrieved.")
 
         # --- 3. Ana Akış ---
-        # Branch'lerin varlığını kontrol et
+        # Branch'lerin varlığını paralel kontrol et (hata önceliği: önce source, sonra test)
         try:
-            source_sha = _po_get_branch_sha(ticket)
-            test_sha = _po_get_branch_sha('test')
+            source_sha, test_sha = await _gather_or_raise(
+                tracing.traced("get source sha", lookups.shared(("branch_sha", repo_id, ticket), lambda: _po_get_branch_sha(ticket))),
+                tracing.traced("get test sha", lookups.shared(("branch_sha", repo_id, 'test'), lambda: ref_cache.get_or_fetch(repo_id, 'test', _po_get_branch_sha)))
+            )
         except ValueError as e:
             if 'test' in str(e):
                 return func.HttpResponse(json.dumps({"status": "TARGET_BRANCH_NOT_FOUND", "message": "❌ Target branch 'test' does not exist in repository. Please create 'test' branch first."}), status_code=404, mimetype="application/json")
@@ -615,17 +2123,14 @@ def pr_open(req: func.HttpRequest) -> func.HttpResponse:
                 return func.HttpResponse(json.dumps({"status": "SOURCE_BRANCH_NOT_FOUND", "message": f"❌ Source branch '{ticket}' does not exist in repository."}), status_code=404, mimetype="application/json")
 
         # 'test' Branch'ine PR Aç
-        pr_create_url = f"https://dev.azure.com/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/pullrequests?api-version=7.1-preview.1"
-        formatted_title = format_pr_title(ticket)
-        pr_payload_test = {
-            "sourceRefName": f"refs/heads/{ticket}",
-            "targetRefName": "refs/heads/test",
-            "title": formatted_title,
-            "description": f"Automated PR from '{ticket}' to 'test' for code review process."
-        }
-        test_pr = _po_do_request(pr_create_url, method='POST', payload=pr_payload_test)
+        pr_create_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/pullrequests?api-version=7.1-preview.1"
+        with tracing.span("create PR"):
+            test_pr = await _po_do_request(pr_create_url, method='POST', payload=_test_pr_payload(ticket))
         test_pr_id = test_pr.get("pullRequestId")
         logging.info(f"Successfully created PR to test: #{test_pr_id}")
+        # PrApprove'un PR araması yapmadan tamamlayabilmesi için PR id'si ve source commit'i kaydedilir
+        if test_pr_id:
+            pr_index.put(repo_id, ticket, test_pr_id, test_pr.get("lastMergeSourceCommit", {}).get("commitId") or source_sha)
 
         # Başarılı Sonuç
         resp = {
@@ -651,7 +2156,11 @@ def pr_open(req: func.HttpRequest) -> func.HttpResponse:
 
 @app.function_name(name="PrApprove")
 @app.route(route="prapprove", methods=["get"], auth_level=func.AuthLevel.ANONYMOUS)
-def pr_approve(req: func.HttpRequest) -> func.HttpResponse:
+@_instrumented("prapprove")
+@_fail_fast(write=True)
+@_async_job("prapprove")
+@_idempotent("prapprove", key_params=("ticket", "repo", "pr_id"))
+async def pr_approve(req: func.HttpRequest) -> func.HttpResponse:
     """
     PR'ı onaylar, test branch'ine merge eder ve feature branch'ini siler.
     'Code Review -> Analyst Appr.' workflow'u için kullanılır.
@@ -667,66 +2176,90 @@ def pr_approve(req: func.HttpRequest) -> func.HttpResponse:
         if not ticket or not repo_name:
             return func.HttpResponse(json.dumps({"status": "MISSING_PARAMETERS", "message": "❌ 'ticket' and 'repo' parameters are required"}), status_code=400, mimetype="application/json")
         
-        if repo_name not in REPO_MAP:
+        if await REPO_MAP.resolve(repo_name) is None:
             return func.HttpResponse(json.dumps({"status": "INVALID_REPO", "message": f"❌ Unknown repository '{repo_name}'"}), status_code=400, mimetype="application/json")
 
-        azure_pat = os.environ.get("AZURE_PAT")
-        if not azure_pat:
+        auth_headers = _ado_auth_headers()
+        if auth_headers is None:
             return func.HttpResponse(json.dumps({"error": "AZURE_PAT environment variable not set"}), status_code=500, mimetype="application/json")
 
         repo_id = REPO_MAP[repo_name]
         
         # --- 2. İzole Yardımcı Fonksiyonlar ---
-        import urllib.request, urllib.error, urllib.parse, base64
+        async def _pa_do_request(url: str, method: str = 'GET', payload: dict = None) -> dict:
+            """PrApprove fonksiyonuna özel request yardımcısı (paylaşılan ado istemcisi üzerinden)."""
+            return await ado.request(url, method=method, payload=payload, headers=auth_headers)
+
+        async def _pa_find_pr():
+            """Branch'ten test'e açık PR'ı arar; (pr_id, source commit) döndürür, bulunamazsa (None, None)."""
+            pr_list_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/pullrequests?searchCriteria.sourceRefName=refs/heads/{urllib.parse.quote(ticket, safe='')}&searchCriteria.targetRefName=refs/heads/test&searchCriteria.status=active&api-version=7.1-preview.1"
+            with tracing.span("search PR"):
+                pr_list = await _pa_do_request(pr_list_url)
+            if not pr_list.get('value') or len(pr_list['value']) == 0:
+                return None, None
+            found = pr_list['value'][0]
+            logging.info(f"Found PR #{found['pullRequestId']} for branch '{ticket}'")
+            return found['pullRequestId'], found.get("lastMergeSourceCommit", {}).get("commitId")
 
-        def _pa_do_request(url: str, method: str = 'GET', payload: dict = None) -> dict:
-            """PrApprove fonksiyonuna özel request yardımcısı."""
-            headers = {
-                "Authorization": f"Basic {base64.b64encode(f':{azure_pat}'.encode()).decode()}",
-                "Content-Type": "application/json"
+        async def _pa_get_source_commit(pr_id) -> str:
+            """PR detaylarından lastMergeSourceCommit'i okur."""
+            pr_details_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/pullrequests/{pr_id}?api-version=7.1-preview.1"
+            with tracing.span("get PR"):
+                pr_details = await _pa_do_request(pr_details_url)
+            return pr_details.get("lastMergeSourceCommit", {}).get("commitId")
+
+        async def _pa_complete_pr(pr_id, last_merge_source_commit: str) -> dict:
+            """PR'ı squash merge ile tamamlar ve source branch'i sildirir."""
+            pr_update_url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/pullrequests/{pr_id}?api-version=7.1-preview.1"
+            formatted_title = format_pr_title(ticket)
+            pr_update_payload = {
+                "status": "completed",
+                "lastMergeSourceCommit": {"commitId": last_merge_source_commit},
+                "completionOptions": {
+                    "mergeCommitMessage": f"Approved and merged: {formatted_title}",
+                    "deleteSourceBranch": True,  # Branch'i otomatik sil
+                    "mergeStrategy": "squash"  # Squash merge
+                }
             }
-            data = json.dumps(payload).encode() if payload is not None else None
-            req_obj = urllib.request.Request(url, data=data, method=method, headers=headers)
-            with urllib.request.urlopen(req_obj) as resp:
-                txt = resp.read().decode()
-                return json.loads(txt) if txt else {}
+            with tracing.span("patch PR"):
+                return await _pa_do_request(pr_update_url, method='PATCH', payload=pr_update_payload)
 
         # --- 3. Ana Akış ---
-        
-        # PR ID'si verilmediyse, branch ismiyle PR'ı bul
-        if not pr_id:
-            # Branch'ten test'e açık PR'ları ara
-            pr_list_url = f"https://dev.azure.com/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/pullrequests?searchCriteria.sourceRefName=refs/heads/{urllib.parse.quote(ticket, safe='')}&searchCriteria.targetRefName=refs/heads/test&searchCriteria.status=active&api-version=7.1-preview.1"
-            pr_list = _pa_do_request(pr_list_url)
-            
-            if not pr_list.get('value') or len(pr_list['value']) == 0:
-                return func.HttpResponse(json.dumps({"status": "PR_NOT_FOUND", "message": f"❌ No active PR found from '{ticket}' to 'test' branch."}), status_code=404, mimetype="application/json")
-            
-            pr_id = pr_list['value'][0]['pullRequestId']
-            logging.info(f"Found PR #{pr_id} for branch '{ticket}'")
-
-        # PR'ı onayla ve merge et
-        # Önce PR detaylarını al
-        pr_details_url = f"https://dev.azure.com/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/pullrequests/{pr_id}?api-version=7.1-preview.1"
-        pr_details = _pa_do_request(pr_details_url)
-        
-        last_merge_source_commit = pr_details.get("lastMergeSourceCommit", {}).get("commitId")
-        if not last_merge_source_commit:
-            return func.HttpResponse(json.dumps({"status": "PR_DETAILS_ERROR", "message": "❌ Could not get PR source commit details."}), status_code=500, mimetype="application/json")
-
-        pr_update_url = f"https://dev.azure.com/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/pullrequests/{pr_id}?api-version=7.1-preview.1"
-        formatted_title = format_pr_title(ticket)
-        pr_update_payload = {
-            "status": "completed",
-            "lastMergeSourceCommit": {"commitId": last_merge_source_commit},
-            "completionOptions": {
-                "mergeCommitMessage": f"Approved and merged: {formatted_title}",
-                "deleteSourceBranch": True,  # Branch'i otomatik sil
-                "mergeStrategy": "squash"  # Squash merge
-            }
-        }
-        
-        pr_result = _pa_do_request(pr_update_url, method='PATCH', payload=pr_update_payload)
+        pr_result = None
+
+        # PrOpen'ın kaydettiği PR varsa arama ve detay GET'i yapmadan doğrudan tamamlamayı dene
+        indexed = pr_index.get(repo_id, ticket)
+        if indexed is not None and (not pr_id or str(pr_id) == str(indexed["pr_id"])):
+            try:
+                pr_result = await _pa_complete_pr(indexed["pr_id"], indexed["source_commit"])
+                pr_id = indexed["pr_id"]
+            except urllib.error.HTTPError as e:
+                # PR kapanmış/bulunamıyor ya da branch'e yeni commit gelmiş: kayıt eski, aramaya düş
+                if e.code not in (400, 404, 409):
+                    raise
+                logging.info(f"Indexed PR #{indexed['pr_id']} for '{ticket}' is stale ({e.code}), falling back to search")
+                pr_index.remove(repo_id, ticket, stale=True)
+
+        if pr_result is None:
+            # PR ID'si verilmediyse, branch ismiyle PR'ı bul
+            last_merge_source_commit = None
+            if not pr_id:
+                pr_id, last_merge_source_commit = await _pa_find_pr()
+                if pr_id is None:
+                    return func.HttpResponse(json.dumps({"status": "PR_NOT_FOUND", "message": f"❌ No active PR found from '{ticket}' to 'test' branch."}), status_code=404, mimetype="application/json")
+
+            # Arama sonucunda source commit yoksa PR detaylarından al
+            if not last_merge_source_commit:
+                last_merge_source_commit = await _pa_get_source_commit(pr_id)
+            if not last_merge_source_commit:
+                return func.HttpResponse(json.dumps({"status": "PR_DETAILS_ERROR", "message": "❌ Could not get PR source commit details."}), status_code=500, mimetype="application/json")
+
+            pr_result = await _pa_complete_pr(pr_id, last_merge_source_commit)
+
+        pr_index.remove(repo_id, ticket)
+        # PR tamamlanınca test ilerler ve source branch silinir; cache'teki kayıtlar artık geçersiz
+        ref_cache.invalidate(repo_id, 'test')
+        ref_cache.invalidate(repo_id, ticket)
         logging.info(f"Successfully approved and merged PR #{pr_id}")
 
         # Başarılı Sonuç
@@ -749,4 +2282,252 @@ def pr_approve(req: func.HttpRequest) -> func.HttpResponse:
         return func.HttpResponse(json.dumps({"status": "EXECUTION_ERROR", "message": "❌ An error occurred during execution.", "error": error_message}), status_code=500, mimetype="application/json")
     except Exception as e:
         logging.error(f"Unexpected error in PrApprove: {str(e)}")
-        return func.HttpResponse(json.dumps({"status": "UNEXPECTED_ERROR", "message": "❌ An unexpected error occurred."}), status_code=500, mimetype="application/json")
\ No newline at end of file
+        return func.HttpResponse(json.dumps({"status": "UNEXPECTED_ERROR", "message": "❌ An unexpected error occurred."}), status_code=500, mimetype="application/json")
+
+
+# İsteğe bağlı asenkron modda kuyruktan çalıştırılabilen handler'lar
+JOB_HANDLERS = {
+    "newBranch": new_branch,
+    "deleteBranch": delete_branch,
+    "devmerge": dev_merge,
+    "propen": pr_open,
+    "prapprove": pr_approve,
+}
+
+
+@app.function_name(name="AdoJobWorker")
+@app.queue_trigger(arg_name="msg", queue_name=JOB_QUEUE_NAME, connection="AzureWebJobsStorage")
+async def ado_job_worker(msg: func.QueueMessage) -> None:
+    """JOB_QUEUE_BACKEND=storage iken ?async=1 ile kuyruğa atılan job'ları işler."""
+    message = json.loads(msg.get_body().decode())
+    logging.info(f"AdoJobWorker picked up job {message.get('id')} ({message.get('endpoint')})")
+    await _run_job(message)
+
+
+@app.function_name(name="JobStatus")
+@app.route(route="jobs/{job_id}", methods=["get"], auth_level=func.AuthLevel.ANONYMOUS)
+@_instrumented("jobs/{job_id}")
+def job_status(req: func.HttpRequest) -> func.HttpResponse:
+    """Asenkron job'ın durumunu ve (bittiyse) sonucunu döndürür."""
+    job_id = req.route_params.get('job_id')
+    job = job_store.get(job_id) if job_id else None
+    if job is None:
+        return func.HttpResponse(json.dumps({"status": "JOB_NOT_FOUND", "message": f"❌ Job '{job_id}' not found.", "job_id": job_id, "success": False}), status_code=404, mimetype="application/json")
+    
+    return func.HttpResponse(
+        json.dumps({
+            "status": job["status"],
+            "job_id": job["id"],
+            "endpoint": job["endpoint"],
+            "params": job["params"],
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+            "result": job["result"],
+            "success": job["status"] != jobs.JOB_FAILED
+        }),
+        status_code=200,
+        mimetype="application/json"
+    )
+
+
+# --- Jira webhook: bir geçişin adımlarını tek plan olarak çalıştırır ---
+# "Kaynak durum -> Hedef durum": adımlar (JOB_HANDLERS isimleri). JIRA_TRANSITION_PLANS ortam değişkeni
+# aynı formatta JSON ile bunu değiştirir; kaynak durum "*" ise hedefe gelen her geçişle eşleşir.
+DEFAULT_JIRA_TRANSITION_PLANS = {
+    "In Development -> Code Review": ["devmerge", "propen"],
+    "Code Review -> Analyst Approval": ["devmerge", "prapprove"],
+}
+JIRA_TRANSITION_PLANS = {
+    tuple(part.strip().lower() for part in transition.split("->", 1)): steps
+    for transition, steps in json.loads(os.environ.get("JIRA_TRANSITION_PLANS") or json.dumps(DEFAULT_JIRA_TRANSITION_PLANS)).items()
+}
+# Repo / branch adının okunacağı issue alanları (ör. customfield_10100); query'de repo/ticket verilirse onlar kullanılır
+JIRA_REPO_FIELD = os.environ.get("JIRA_REPO_FIELD")
+JIRA_BRANCH_FIELD = os.environ.get("JIRA_BRANCH_FIELD")
+# Plan adımı -> önceden alınacak hedef branch SHA'sı
+_STEP_TARGET_BRANCH = {"devmerge": "dev", "newBranch": "dev", "propen": "test"}
+
+
+def _jira_field_values(value) -> list:
+    """Jira alan değerini (metin, select {'value': ...}, çoklu seçim listesi) düz metin listesine çevirir."""
+    if isinstance(value, list):
+        return [v for item in value for v in _jira_field_values(item)]
+    if isinstance(value, dict):
+        value = value.get("value") or value.get("name")
+    if not value:
+        return []
+    return [v.strip() for v in str(value).split(',') if v.strip()]
+
+
+def _jira_plan(payload: dict):
+    """Changelog'daki status geçişini ve eşleşen plan adımlarını döndürür: ((from, to), steps)."""
+    for item in (payload.get("changelog") or {}).get("items", []):
+        if item.get("field") == "status":
+            transition = (item.get("fromString") or "", item.get("toString") or "")
+            from_status, to_status = (status.strip().lower() for status in transition)
+            steps = JIRA_TRANSITION_PLANS.get((from_status, to_status)) or JIRA_TRANSITION_PLANS.get(("*", to_status))
+            return transition, steps
+    return None, None
+
+
+async def _fetch_branch_sha(repo_id: str, branch_name: str, auth_headers: dict) -> str:
+    """Branch SHA'sını refs API'sinden alır (handler'lardaki yardımcılarla aynı hata mesajı)."""
+    encoded_branch = urllib.parse.quote(branch_name, safe='')
+    url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?filter=heads/{encoded_branch}&api-version=7.1-preview.1"
+    refs = (await ado.request(url, headers=auth_headers)).get('value', [])
+    for ref in refs:
+        if ref["name"] == f"refs/heads/{branch_name}":
+            return ref["objectId"]
+    raise ValueError(f"Branch '{branch_name}' not found or SHA could not be retrieved.")
+
+
+async def _find_issue_branch(repo_id: str, issue_key: str, auth_headers: dict, scope):
+    """
+    Issue key'i ile başlayan branch'i (folder/branch dahil) tek refs filterContains sorgusuyla bulur.
+    (branch, eşleşme sayısı) döndürür; tek eşleşmenin SHA'sı kapsama eklenir, adımlar tekrar sormaz.
+    """
+    url = f"{AZURE_DEVOPS_URL}/{AZURE_ORG}/{AZURE_PROJECT}/_apis/git/repositories/{repo_id}/refs?filter=heads/&filterContains={urllib.parse.quote(issue_key, safe='')}&api-version=7.1-preview.1"
+    with tracing.span("find issue branch"):
+        refs = (await ado.request(url, headers=auth_headers)).get('value', [])
+    prefix = f"{issue_key.upper()}-"
+    matches = [ref for ref in refs if ref["name"].split('/')[-1].upper().startswith(prefix)]
+    if len(matches) != 1:
+        return None, len(matches)
+    branch = matches[0]["name"][len("refs/heads/"):]
+    scope.seed(("branch_sha", repo_id, branch), matches[0]["objectId"])
+    return branch, 1
+
+
+async def _run_jira_plan(repo_name: str, branch: str, steps: list, auth_headers: dict, scope) -> dict:
+    """
+    Planın adımlarını bir repoda plandaki sırayla çalıştırır: adım -> {status_code, body}.
+    Adımlar aynı branch'e yazdığı için (ör. devmerge ardından prapprove) paralel çalıştırılmaz.
+    Ortak SHA'lar önce tek seferde alınır; bu, branch'i silen adımlardan (prapprove) önce
+    source SHA'sının okunmasını da garanti eder.
+    """
+    repo_id = REPO_MAP[repo_name]
+
+    async def _fetch(branch_name: str) -> str:
+        return await _fetch_branch_sha(repo_id, branch_name, auth_headers)
+
+    prefetch = []
+    if {"devmerge", "propen"} & set(steps):
+        prefetch.append(scope.get(("branch_sha", repo_id, branch), lambda: _fetch(branch)))
+    for target in dict.fromkeys(_STEP_TARGET_BRANCH[step] for step in steps if step in _STEP_TARGET_BRANCH):
+        prefetch.append(scope.get(("branch_sha", repo_id, target), lambda target=target: ref_cache.get_or_fetch(repo_id, target, _fetch)))
+    with tracing.span(f"shared lookups [{repo_name}]"):
+        # Hatalar burada yutulur; aynı hata ilgili adımın kendi cevabında görünür
+        await asyncio.gather(*prefetch, return_exceptions=True)
+
+    async def _step(step: str) -> dict:
+        handler = JOB_HANDLERS.get(step)
+        if handler is None:
+            return {"status_code": 400, "body": {"status": "UNKNOWN_STEP", "message": f"❌ Unknown plan step '{step}'", "success": False}}
+        req = func.HttpRequest(method="GET", url=f"/api/{step}", params={"ticket": branch, "repo": repo_name}, body=b"")
+        with tracing.span(f"{step} [{repo_name}]"):
+            resp = await handler(req)
+        body = resp.get_body()
+        try:
+            body = json.loads(body)
+        except ValueError:
+            body = body.decode()
+        return {"status_code": resp.status_code, "body": body}
+
+    results = {}
+    for step in steps:
+        results[step] = await _step(step)
+    return results
+
+
+@app.function_name(name="JiraWebhook")
+@app.route(route="jira", methods=["post"], auth_level=func.AuthLevel.ANONYMOUS)
+@_instrumented("jira")
+@_fail_fast(write=True)
+async def jira_webhook(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Jira'nın ham webhook payload'ını alır; status geçişini JIRA_TRANSITION_PLANS'teki adımlara çevirir
+    ve adımları repolarda paralel, her repoda plandaki sırayla çalıştırır. Adımlar aynı SHA lookup'larını paylaşır (geçiş başına
+    her SHA en fazla bir kez alınır). Planı olmayan geçişler 200 ile yok sayılır.
+    """
+    logging.info('JiraWebhook function called.')
+    
+    try:
+        try:
+            payload = req.get_json()
+        except ValueError:
+            payload = None
+        issue = payload.get("issue") if isinstance(payload, dict) else None
+        if not isinstance(issue, dict) or not issue.get("key"):
+            return func.HttpResponse(json.dumps({"status": "INVALID_PAYLOAD", "message": "❌ Jira webhook payload with an 'issue' is required", "success": False}), status_code=400, mimetype="application/json")
+        
+        issue_key = issue["key"]
+        transition, steps = _jira_plan(payload)
+        if not steps:
+            logging.info(f"JiraWebhook: no plan for {issue_key} transition {transition}")
+            return func.HttpResponse(json.dumps({
+                "status": "JIRA_NO_PLAN",
+                "message": f"ℹ️ No plan for transition {' → '.join(transition) if transition else '(none)'}",
+                "issue": issue_key,
+                "success": True
+            }), status_code=200, mimetype="application/json")
+        
+        fields = issue.get("fields") or {}
+        repo_names = _jira_field_values(req.params.get('repo')) or (_jira_field_values(fields.get(JIRA_REPO_FIELD)) if JIRA_REPO_FIELD else [])
+        if not repo_names:
+            return func.HttpResponse(json.dumps({"status": "MISSING_PARAMETERS", "message": "❌ 'repo' parameter (or JIRA_REPO_FIELD on the issue) is required", "success": False}), status_code=400, mimetype="application/json")
+        
+        unknown = [name for name in repo_names if await REPO_MAP.resolve(name) is None]
+        if unknown:
+            return func.HttpResponse(json.dumps({"status": "INVALID_REPO", "message": f"❌ Unknown repository '{', '.join(unknown)}'", "error": f"Available repos: {', '.join(REPO_MAP.keys())}", "success": False}), status_code=400, mimetype="application/json")
+        
+        auth_headers = _ado_auth_headers()
+        if auth_headers is None:
+            return func.HttpResponse(json.dumps({"error": "AZURE_PAT environment variable not set"}), status_code=500, mimetype="application/json")
+        
+        branch = req.params.get('ticket')
+        if not branch and JIRA_BRANCH_FIELD:
+            branch = next(iter(_jira_field_values(fields.get(JIRA_BRANCH_FIELD))), None)
+        
+        with lookups.lookup_scope() as scope:
+            async def _repo_plan(repo_name: str) -> dict:
+                # Adımların handler'ları bu slot'u kullanır (aynı repo), ayrıca slot almaz
+                async with ado.request_slot(req.url, REPO_MAP[repo_name], write=True):
+                    repo_branch = branch
+                    if not repo_branch:
+                        repo_branch, matches = await _find_issue_branch(REPO_MAP[repo_name], issue_key, auth_headers, scope)
+                        if repo_branch is None:
+                            status = "BRANCH_NOT_FOUND" if matches == 0 else "AMBIGUOUS_BRANCH"
+                            return {"status": status, "message": f"❌ {matches} branches found for '{issue_key}'", "success": False}
+                    step_results = await _run_jira_plan(repo_name, repo_branch, steps, auth_headers, scope)
+                return {"branch": repo_branch, "steps": step_results, "success": all(r["status_code"] < 400 for r in step_results.values())}
+            
+            repo_results = await asyncio.gather(*(_repo_plan(name) for name in repo_names), return_exceptions=True)
+        
+        results = {}
+        for repo_name, repo_result in zip(repo_names, repo_results):
+            if isinstance(repo_result, Exception):
+                error_message = repo_result.read().decode() if isinstance(repo_result, urllib.error.HTTPError) and repo_result.fp else str(repo_result)
+                logging.error(f"JiraWebhook plan failed for '{repo_name}': {error_message}")
+                repo_result = {"status": "EXECUTION_ERROR", "error": error_message, "success": False}
+            results[repo_name] = repo_result
+        
+        all_success = all(result["success"] for result in results.values())
+        logging.info(f"JiraWebhook {issue_key} {' → '.join(transition)}: {steps} on {repo_names}, lookups {scope.stats()}")
+        return func.HttpResponse(
+            json.dumps({
+                "status": "JIRA_PLAN_RESULT",
+                "message": f"{'✅' if all_success else '⚠️'} {issue_key}: {' → '.join(transition)} ({', '.join(steps)})",
+                "issue": issue_key,
+                "transition": {"from": transition[0], "to": transition[1]},
+                "steps": steps,
+                "repos": results,
+                "lookups": scope.stats(),
+                "success": all_success
+            }),
+            status_code=200 if all_success else 207,
+            mimetype="application/json"
+        )
+    
+    except Exception as e:
+        logging.error(f"Unexpected error in JiraWebhook: {str(e)}")
+        return func.HttpResponse(json.dumps({"error": "Internal server error", "details": str(e)}), status_code=500, mimetype="application/json")
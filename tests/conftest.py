@@ -0,0 +1,75 @@
+import asyncio
+import inspect
+import json
+import os
+import sys
+
+import pytest
+
+# Testler repo kökündeki ado paketini kurulum gerektirmeden import eder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def fake_ado():
+    """Aynı process'te çalışan ADO emülatörü (tools/fake_ado.py); (state, org/project taban URL'i) döndürür."""
+    from tools.fake_ado import FakeAdoState, serve
+
+    state = FakeAdoState({"CTJira": "repo-1"})
+    server = serve(state)
+    yield state, f"http://127.0.0.1:{server.server_address[1]}/org/project"
+    server.shutdown()
+
+
+@pytest.fixture(scope="session")
+def _function_app(tmp_path_factory):
+    """function_app'i kalıcı dosyaları geçici dizine yazacak şekilde bir kez import eder."""
+    tmp = tmp_path_factory.mktemp("function_app")
+    os.environ.setdefault("AZURE_PAT", "offline-tests")
+    os.environ["PR_INDEX_PATH"] = str(tmp / "pr_index.sqlite")
+    os.environ["REPO_MAP_CACHE_PATH"] = str(tmp / "repo_map.json")
+    import function_app
+    return function_app
+
+
+@pytest.fixture
+def app(_function_app, monkeypatch, tmp_path):
+    """
+    function_app'i emülatöre yönlendirir; istemci ve cache'ler her test için yeniden kurulur.
+    (function_app modülü, emülatör state'i) döndürür.
+    """
+    from ado import AdoClient, AncestryCache, IdempotencyCache, MergeTrain, PrIndex, RefCache, RepoRegistry
+    from tools.fake_ado import FakeAdoState, serve
+
+    fa = _function_app
+    state = FakeAdoState(fa.STATIC_REPO_MAP)
+    server = serve(state)
+    client = AdoClient(metrics=fa.metrics)
+    monkeypatch.setattr(fa, "AZURE_DEVOPS_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(fa, "ado", client)
+    monkeypatch.setattr(fa, "REPO_MAP", RepoRegistry(fa.STATIC_REPO_MAP))
+    monkeypatch.setattr(fa, "ref_cache", RefCache())
+    monkeypatch.setattr(fa, "idempotency", IdempotencyCache())
+    monkeypatch.setattr(fa, "merge_train", MergeTrain(window=0.01))
+    monkeypatch.setattr(fa, "pr_index", PrIndex(path=str(tmp_path / "pr_index.sqlite")))
+    monkeypatch.setattr(fa, "ancestry_cache", AncestryCache())
+    yield fa, state
+    asyncio.run(client.close())
+    server.shutdown()
+
+
+@pytest.fixture
+def call():
+    """Route handler'ını verilen parametrelerle çağırır; (status kodu, JSON ya da metin gövde) döndürür."""
+    import azure.functions as func
+
+    def _call(handler, route: str, method: str = "GET", body=None, headers: dict = None, **params):
+        req = func.HttpRequest(method=method, url=f"http://localhost/api/{route}", params=params, headers=headers or {},
+                               body=json.dumps(body).encode() if body is not None else b"")
+        resp = handler(req)
+        if inspect.iscoroutine(resp):
+            resp = asyncio.run(resp)
+        text = resp.get_body().decode()
+        return resp.status_code, json.loads(text) if resp.mimetype == "application/json" else text
+
+    return _call
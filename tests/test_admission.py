@@ -0,0 +1,279 @@
+import asyncio
+import contextlib
+
+import pytest
+
+from ado import AdmissionController, AdmissionRejected
+
+
+async def hold(controller: AdmissionController, repo: str, seconds: float, order: list = None, name: str = None,
+               write: bool = False):
+    async with controller.slot("http://ado", repo, write=write):
+        if order is not None:
+            order.append(name)
+        await asyncio.sleep(seconds)
+
+
+def test_limits_concurrency_per_repo_and_globally():
+    controller = AdmissionController(max_concurrency=3, per_repo=2)
+    peak = {"global": 0, "r1": 0}
+
+    async def work(repo):
+        async with controller.slot("http://ado", repo):
+            stats = controller.stats()
+            peak["global"] = max(peak["global"], stats["active"])
+            peak["r1"] = max(peak["r1"], stats["active_by_repo"].get("r1", 0))
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(work("r1") for _ in range(5)), *(work("r2") for _ in range(5)))
+
+    asyncio.run(main())
+    assert peak == {"global": 3, "r1": 2}
+    assert controller.stats()["active"] == 0
+
+
+def test_momentarily_full_queue_waits_instead_of_shedding():
+    controller = AdmissionController(max_concurrency=1, per_repo=1, max_queue=1, max_queue_per_repo=1, queue_timeout=1)
+
+    async def main():
+        await asyncio.gather(*(hold(controller, "r1", 0.01) for _ in range(5)))
+
+    asyncio.run(main())
+    assert controller.stats()["rejected"] == 0 and controller.stats()["timed_out"] == 0
+
+
+def test_wait_past_queue_timeout_is_rejected_with_retry_after():
+    controller = AdmissionController(max_concurrency=1, per_repo=1, queue_timeout=0.02, retry_after=3)
+
+    async def main():
+        holder = asyncio.ensure_future(hold(controller, "r1", 0.1))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as info:
+            await controller.acquire("http://ado", "r1")
+        await holder
+        return info.value
+
+    rejection = asyncio.run(main())
+    assert rejection.code == 429 and rejection.retry_after == 3
+    assert rejection.headers["Retry-After"] == "3"
+    assert controller.stats()["timed_out"] == 1
+
+
+def test_full_queue_sheds_at_the_door_only_after_a_timeout():
+    controller = AdmissionController(max_concurrency=1, per_repo=1, max_queue=1, max_queue_per_repo=1,
+                                     queue_timeout=0.02, retry_after=2)
+
+    async def main():
+        holder = asyncio.ensure_future(hold(controller, "r1", 0.2))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(controller.acquire("http://ado", "r1"))
+        await asyncio.sleep(0)
+        before_timeout = controller.retry_after("r1")
+        with pytest.raises(AdmissionRejected):
+            await waiter
+        # Yakın zamanda bekleme süresi doldu ve kuyruk yine dolu: yeni iş beklemeden reddedilir
+        refill = asyncio.ensure_future(controller.acquire("http://ado", "r1"))
+        await asyncio.sleep(0)
+        after_timeout = controller.retry_after("r1")
+        refill.cancel()
+        await asyncio.gather(refill, return_exceptions=True)
+        await holder
+        return before_timeout, after_timeout
+
+    assert asyncio.run(main()) == (None, 2)
+
+
+def test_writes_get_slots_before_reads():
+    controller = AdmissionController(max_concurrency=1, per_repo=1)
+    order = []
+
+    async def main():
+        first = asyncio.ensure_future(hold(controller, "r1", 0.01, order, "first"))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(hold(controller, "r1", 0, order, name, write=name.startswith("w")))
+                   for name in ("r1", "w1", "r2", "w2")]
+        await asyncio.gather(first, *waiters)
+
+    asyncio.run(main())
+    assert order == ["first", "w1", "w2", "r1", "r2"]
+
+
+def test_request_slot_covers_fanned_out_calls():
+    # Her istek iki paralel ADO çağrısı yapar (PrOpen gibi); slot istek başına sayılır
+    controller = AdmissionController(max_concurrency=16, per_repo=4, max_queue=32, max_queue_per_repo=8, queue_timeout=1)
+
+    async def call():
+        # AdoClient._slot ile aynı kural: istek slot'u tutuluyorsa çağrı ayrıca slot almaz
+        async with contextlib.nullcontext() if controller.in_request() else controller.slot("http://ado", "r1"):
+            await asyncio.sleep(0.005)
+
+    async def request():
+        async with controller.request("http://ado/api/propen", "r1"):
+            await asyncio.gather(call(), call())
+        return 200
+
+    async def main():
+        return await asyncio.gather(*(request() for _ in range(10)))
+
+    assert asyncio.run(main()) == [200] * 10
+    stats = controller.stats()
+    assert stats["admitted"] == 10 and stats["rejected"] == 0 and stats["timed_out"] == 0
+
+
+def test_nested_requests_reuse_the_outer_slot():
+    controller = AdmissionController(max_concurrency=1, per_repo=1, queue_timeout=0.05)
+
+    async def main():
+        async with controller.request("http://ado/api/jiraWebhook", "r1"):
+            async with controller.request("http://ado/api/devmerge", "r1"):
+                async with controller.request("http://ado/api/devmerge"):
+                    return controller.stats()["active"]
+
+    assert asyncio.run(main()) == 1
+    assert controller.stats()["admitted"] == 1
+
+
+def test_fanned_out_request_takes_a_slot_per_repo():
+    # Repo'suz istek slot'u (bulk, çoklu repo) worker genelinde bir kez sayılır; her repo ayrıca kendi sınırına tabidir
+    controller = AdmissionController(max_concurrency=1, per_repo=1, queue_timeout=1)
+    peak = {}
+
+    async def repo_work(repo):
+        async with controller.request("http://ado/api/bulkStatus", repo):
+            stats = controller.stats()
+            peak[repo] = max(peak.get(repo, 0), stats["active_by_repo"][repo])
+            peak["global"] = max(peak.get("global", 0), stats["active"])
+            await asyncio.sleep(0.01)
+
+    async def main():
+        async with controller.request("http://ado/api/bulkStatus"):
+            await asyncio.gather(repo_work("r1"), repo_work("r1"), repo_work("r2"))
+
+    asyncio.run(main())
+    assert peak == {"r1": 1, "r2": 1, "global": 1}
+    stats = controller.stats()
+    assert stats["admitted"] == 4 and stats["queued"] == 1
+    assert stats["active"] == 0 and stats["active_by_repo"] == {}
+
+
+def test_fanned_out_repo_slot_waits_for_busy_repo():
+    controller = AdmissionController(max_concurrency=4, per_repo=1, queue_timeout=0.02)
+
+    async def main():
+        holder = asyncio.ensure_future(hold(controller, "r1", 0.1))
+        await asyncio.sleep(0)
+        async with controller.request("http://ado/api/jira"):
+            with pytest.raises(AdmissionRejected):
+                async with controller.request("http://ado/api/jira", "r1"):
+                    pass
+        await holder
+
+    asyncio.run(main())
+    assert controller.stats()["timed_out"] == 1
+
+
+def test_write_requests_get_slots_before_reads():
+    controller = AdmissionController(max_concurrency=1, per_repo=1)
+    order = []
+
+    async def request(name):
+        async with controller.request(f"http://ado/api/{name}", "r1", write=name.startswith("w")):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    async def main():
+        first = asyncio.ensure_future(hold(controller, "r1", 0.01))
+        await asyncio.sleep(0)
+        await asyncio.gather(first, *(request(name) for name in ("r1", "w1", "r2")))
+
+    asyncio.run(main())
+    assert order == ["w1", "r1", "r2"]
+
+
+class RecordingAdmission(AdmissionController):
+    """request() çağrılarını (repo, write) olarak kaydeder."""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def request(self, url, repo=None, write=False):
+        self.requests.append((repo, write))
+        return super().request(url, repo, write)
+
+
+@pytest.fixture
+def recording(app, monkeypatch):
+    fa, state = app
+    admission = RecordingAdmission()
+    monkeypatch.setattr(fa.ado, "admission", admission)
+    return fa, state, admission
+
+
+def test_routes_declare_writes(recording, call):
+    fa, state, admission = recording
+    repo_id = fa.STATIC_REPO_MAP["CTJira"]
+    state.add_branch(repo_id, "CT-1-write-flag")
+
+    call(fa.dev_merge, "devmerge", ticket="CT-1-write-flag", repo="CTJira")
+    call(fa.bulk_status, "bulkStatus", tickets="CT-1-write-flag", repo="CTJira")
+    call(fa.delete_branch, "deleteBranch", ticket="CT-1-write-flag", repo="CTJira")
+
+    # bulkStatus'un repo slot'u dıştaki (aynı repo) slot'u kullanır
+    assert admission.requests == [(repo_id, True), (repo_id, False), (repo_id, False), (repo_id, True)]
+    assert admission.stats()["admitted"] == 3
+
+
+def test_bulk_body_repo_takes_the_repo_slot(recording, call):
+    fa, state, admission = recording
+    call(fa.bulk_new_branch, "bulkNewBranch", method="POST", body={"repo": "CTJira", "tickets": ["CT-1-bulk-slot"]})
+    assert admission.requests == [(fa.STATIC_REPO_MAP["CTJira"], True)]
+
+
+def test_multi_repo_routes_take_a_slot_per_repo(recording, call, monkeypatch):
+    fa, state, admission = recording
+    repos = ["CTJira", "CustomsOnlineAI"]
+    repo_ids = {fa.STATIC_REPO_MAP[name] for name in repos}
+    monkeypatch.setattr(fa, "REAPER_REPOS", repos)
+
+    def taken(route_call):
+        admission.requests.clear()
+        admitted = admission.stats()["admitted"]
+        route_call()
+        return set(admission.requests), admission.stats()["admitted"] - admitted
+
+    expected_writes = {(None, True)} | {(repo_id, True) for repo_id in repo_ids}
+    assert taken(lambda: call(fa.new_branch, "newBranch", ticket="CT-1-multi-slot", repo=",".join(repos))) == (expected_writes, 3)
+    assert taken(lambda: call(fa.bulk_status, "bulkStatus", tickets="CT-1-multi-slot", repos=",".join(repos))) == (
+        {(None, False)} | {(repo_id, False) for repo_id in repo_ids}, 3)
+    # Webhook adımlarının handler'ları repo slot'unu tekrar kullanır
+    webhook = {"issue": {"key": "CT-1", "fields": {}},
+               "changelog": {"items": [{"field": "status", "fromString": "In Development", "toString": "Code Review"}]}}
+    requests, admitted = taken(lambda: call(fa.jira_webhook, "jira", method="POST", body=webhook,
+                                            repo=",".join(repos), ticket="CT-1-multi-slot"))
+    assert expected_writes <= requests and admitted == 3
+    assert taken(lambda: call(fa.reap_branches, "reapBranches", dry_run="1")) == (
+        {(None, False)} | {(repo_id, False) for repo_id in repo_ids}, 3)
+    state.add_branch(fa.STATIC_REPO_MAP["CTJira"], "CT-2-multi-slot")
+    items = [{"ticket": "CT-2-multi-slot", "repo": "CTJira"}, {"ticket": "CT-1-multi-slot", "repo": "CustomsOnlineAI"}]
+    requests, admitted = taken(lambda: call(fa.bulk_pr_open, "bulkPrOpen", method="POST", body={"items": items}))
+    # Repo başına hazırlık (okuma) ve ticket başına PR create (yazma)
+    assert requests == expected_writes | {(repo_id, False) for repo_id in repo_ids} and admitted == 5
+
+
+def test_detached_task_takes_its_own_slot():
+    controller = AdmissionController(max_concurrency=2, per_repo=2)
+
+    async def job():
+        controller.detach()
+        assert not controller.in_request()
+        async with controller.request("http://ado/api/devmerge", "r1"):
+            return controller.stats()["active"]
+
+    async def main():
+        async with controller.request("http://ado/api/devmerge", "r1"):
+            return await asyncio.ensure_future(job())
+
+    assert asyncio.run(main()) == 2
+
@@ -0,0 +1,122 @@
+import asyncio
+
+from ado import AncestryCache, IdempotencyCache
+
+REPO = "CTJira"
+SOURCE, DEV, NEWER_DEV = "1" * 40, "2" * 40, "3" * 40
+
+
+def counting_ahead(ahead: int = 0, delay: float = 0.0, error: Exception = None):
+    calls = []
+
+    async def fetch(source_sha, target_sha):
+        calls.append((source_sha, target_sha))
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return ahead
+
+    return fetch, calls
+
+
+def test_same_sha_is_merged_without_fetch():
+    fetch, calls = counting_ahead(ahead=1)
+    cache = AncestryCache()
+    assert cache.known_merged("repo", SOURCE, SOURCE)
+    assert asyncio.run(cache.is_merged("repo", SOURCE, SOURCE, fetch)) and calls == []
+
+
+def test_result_is_cached_per_pair():
+    fetch, calls = counting_ahead(ahead=2)
+    cache = AncestryCache()
+    assert asyncio.run(cache.is_merged("repo", SOURCE, DEV, fetch)) is False
+    assert asyncio.run(cache.is_merged("repo", SOURCE, DEV, fetch)) is False
+    assert len(calls) == 1 and cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert not cache.known_merged("repo", SOURCE, DEV)
+
+
+def test_merged_source_stays_merged_when_dev_moves():
+    fetch, calls = counting_ahead(ahead=0)
+    cache = AncestryCache()
+    assert asyncio.run(cache.is_merged("repo", SOURCE, DEV, fetch))
+    # dev sadece ileri gider: yeni dev SHA'sı için tekrar sorulmaz
+    assert cache.known_merged("repo", SOURCE, NEWER_DEV)
+    assert len(calls) == 1 and cache.stats()["merged_sources"] == 1
+
+
+def test_concurrent_checks_share_one_call():
+    fetch, calls = counting_ahead(ahead=0, delay=0.01)
+    cache = AncestryCache()
+
+    async def main():
+        return await asyncio.gather(*(cache.is_merged("repo", SOURCE, DEV, fetch) for _ in range(5)))
+
+    assert asyncio.run(main()) == [True] * 5 and len(calls) == 1
+
+
+def test_entries_are_bounded():
+    fetch, _ = counting_ahead(ahead=1)
+    cache = AncestryCache(max_entries=2)
+    for i in range(3):
+        asyncio.run(cache.is_merged("repo", f"{i}" * 40, DEV, fetch))
+    assert cache.stats()["entries"] == 2
+
+
+def test_failed_fetch_is_not_cached():
+    fetch, calls = counting_ahead(error=RuntimeError("ADO down"))
+    cache = AncestryCache()
+    for _ in range(2):
+        try:
+            asyncio.run(cache.is_merged("repo", SOURCE, DEV, fetch))
+        except RuntimeError:
+            pass
+    assert len(calls) == 2 and cache.stats()["entries"] == 0
+
+
+def merge_into_dev(state, repo_id: str, branch: str) -> str:
+    """Branch'i uygulama dışından (ör. elle) dev'e merge eder; yeni dev SHA'sını döndürür."""
+    source = state.add_branch(repo_id, branch)
+    with state.lock:
+        refs = state.repos[repo_id]["refs"]
+        refs["refs/heads/dev"] = state.commit(repo_id, [refs["refs/heads/dev"], source])
+        return refs["refs/heads/dev"]
+
+
+def test_branch_merged_outside_the_app_is_not_merged_again(app, call):
+    fa, state = app
+    repo_id = fa.STATIC_REPO_MAP[REPO]
+    dev = merge_into_dev(state, repo_id, "CT-1-merged-by-hand")
+    assert not fa.pr_index.has(repo_id, "CT-1-merged-by-hand")
+
+    status, body = call(fa.dev_merge, "devmerge", ticket="CT-1-merged-by-hand", repo=REPO)
+
+    assert status == 200 and body["status"] == "ALREADY_UP_TO_DATE" and body["dev_sha"] == dev
+    assert state.calls["commit_diff"] == 1 and state.calls["merge"] == 0 and state.calls["ref_update"] == 0
+
+
+def test_repeated_devmerge_skips_the_ancestry_call(app, call, monkeypatch):
+    fa, state = app
+    repo_id = fa.STATIC_REPO_MAP[REPO]
+    state.add_branch(repo_id, "CT-2-merge-twice")
+
+    status, body = call(fa.dev_merge, "devmerge", ticket="CT-2-merge-twice", repo=REPO)
+    assert status == 200 and body["status"] == "DEV_MERGE_OK"
+    state.calls.clear()
+    # Sonraki Jira geçişi idempotency penceresinden sonra gelir
+    monkeypatch.setattr(fa, "idempotency", IdempotencyCache())
+
+    status, body = call(fa.dev_merge, "devmerge", ticket="CT-2-merge-twice", repo=REPO)
+    assert status == 200 and body["status"] == "ALREADY_UP_TO_DATE"
+    assert state.calls["commit_diff"] == 0 and state.calls["merge"] == 0
+
+
+def test_failed_ancestry_check_merges_anyway(app, call):
+    fa, state = app
+    repo_id = fa.STATIC_REPO_MAP[REPO]
+    state.add_branch(repo_id, "CT-3-diff-fails")
+    state.inject(404, path_contains="/diffs/commits")
+
+    status, body = call(fa.dev_merge, "devmerge", ticket="CT-3-diff-fails", repo=REPO)
+
+    assert status == 200 and body["status"] == "DEV_MERGE_OK"
+    assert state.calls["merge"] == 1
@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from ado import CircuitBreaker, CircuitOpenError
+
+SCOPES = ("org", "repo-1")
+
+
+def trip(breaker: CircuitBreaker, scopes=SCOPES):
+    for _ in range(breaker.failure_threshold):
+        breaker.record(scopes, False, breaker.before("http://ado", scopes))
+
+
+def state(breaker: CircuitBreaker, scope: str = "repo-1") -> str:
+    return breaker._circuits[scope].state
+
+
+def test_opens_after_threshold_and_rejects():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    trip(breaker)
+
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before("http://ado", SCOPES)
+    assert info.value.code == 503 and not info.value.probing
+    assert breaker.retry_after(SCOPES) > 29
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_success_resets_failure_count_while_closed():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record(SCOPES, False, breaker.before("http://ado", SCOPES))
+    breaker.record(SCOPES, True, breaker.before("http://ado", SCOPES))
+    breaker.record(SCOPES, False, breaker.before("http://ado", SCOPES))
+    assert state(breaker) == "closed"
+
+
+def test_stale_success_does_not_close_open_circuit():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    stale = breaker.before("http://ado", SCOPES)
+    trip(breaker)
+
+    breaker.record(SCOPES, True, stale)
+    assert state(breaker) == "open"
+
+
+def test_only_probe_result_closes_half_open_circuit():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.01)
+    stale = breaker.before("http://ado", SCOPES)
+    trip(breaker)
+    time.sleep(0.02)
+
+    probe = breaker.before("http://ado", SCOPES)
+    assert probe == {"org": 1, "repo-1": 1}
+    breaker.record(SCOPES, True, stale)
+    assert state(breaker) == "half_open"
+    breaker.record(SCOPES, True, probe)
+    assert state(breaker) == "closed" and state(breaker, "org") == "closed"
+
+
+def test_requests_during_probe_are_rejected_immediately():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    trip(breaker)
+    time.sleep(0.02)
+    breaker.before("http://ado", SCOPES)
+
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before("http://ado", SCOPES)
+    assert info.value.probing
+
+
+def test_failed_probe_reopens_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    trip(breaker)
+    time.sleep(0.02)
+
+    breaker.record(SCOPES, False, breaker.before("http://ado", SCOPES))
+    assert state(breaker) == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before("http://ado", SCOPES)
+
+
+def test_release_only_frees_own_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    trip(breaker)
+    time.sleep(0.02)
+    probe = breaker.before("http://ado", SCOPES)
+
+    breaker.release(SCOPES, {"org": probe["org"] + 1, "repo-1": probe["repo-1"] + 1})
+    with pytest.raises(CircuitOpenError):
+        breaker.before("http://ado", SCOPES)
+    breaker.release(SCOPES, probe)
+    # Bırakılan probe'un yerine bir sonraki istek probe olur
+    assert breaker.before("http://ado", SCOPES) == {"org": 2, "repo-1": 2}
+
+
+def test_repo_circuit_is_independent_of_other_repos():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    trip(breaker, ("repo-1",))
+
+    assert breaker.before("http://ado", ("org", "repo-2")) == {}
+    assert breaker.retry_after(("org",)) is None
@@ -0,0 +1,103 @@
+import json
+
+REPO = "CTJira"
+
+
+def test_bulk_new_branch_creates_all_branches_in_one_ref_post(app, call):
+    fa, state = app
+    repo_id = fa.STATIC_REPO_MAP[REPO]
+    tickets = ["CT-1-login-fix", "CT-2-report-export", "CT-3-api-cleanup"]
+
+    status, body = call(fa.bulk_new_branch, "bulkNewBranch", repo=REPO, tickets=",".join(tickets))
+
+    assert status == 200 and body["success"] is True
+    dev_sha = state.repos[repo_id]["refs"]["refs/heads/dev"]
+    for ticket in tickets:
+        assert body["results"][ticket] == {"status": "BRANCH_CREATED", "commit": dev_sha, "success": True}
+        assert state.repos[repo_id]["refs"][f"refs/heads/{ticket}"] == dev_sha
+    assert state.calls["ref_update"] == 1
+
+
+def test_bulk_new_branch_maps_update_statuses(app, call):
+    fa, state = app
+    repo_id = fa.STATIC_REPO_MAP[REPO]
+    state.add_branch(repo_id, "CT-1-already-there")
+    state.rejected_refs["refs/heads/CT-2-policy-blocked"] = "rejectedByPolicy"
+
+    status, body = call(fa.bulk_new_branch, "bulkNewBranch", method="POST",
+                        body={"repo": REPO, "tickets": ["CT-1-already-there", "CT-2-policy-blocked", "CT-3-new-one", "bad name"]})
+
+    results = body["results"]
+    assert status == 207 and body["success"] is False
+    assert results["CT-1-already-there"] == {"status": "BRANCH_ALREADY_EXISTS", "update_status": "staleOldObjectId",
+                                             "success": True}
+    assert results["CT-2-policy-blocked"]["status"] == "BRANCH_CREATE_FAILED"
+    assert results["CT-2-policy-blocked"]["update_status"] == "rejectedByPolicy"
+    assert results["CT-2-policy-blocked"]["success"] is False
+    assert results["CT-3-new-one"]["status"] == "BRANCH_CREATED"
+    assert results["bad name"]["status"] == "BRANCH_NAME_WRONG"
+    assert body["summary"] == {"BRANCH_ALREADY_EXISTS": 1, "BRANCH_CREATE_FAILED": 1, "BRANCH_CREATED": 1,
+                               "BRANCH_NAME_WRONG": 1}
+
+
+def test_bulk_new_branch_reports_failed_request_per_ticket(app, call):
+    fa, state = app
+    state.inject(500, "/refs", method="POST")
+
+    status, body = call(fa.bulk_new_branch, "bulkNewBranch", repo=REPO, tickets="CT-1-login-fix")
+
+    result = body["results"]["CT-1-login-fix"]
+    assert status == 207
+    assert result["status"] == "BRANCH_CREATE_FAILED" and result["success"] is False
+    assert "Injected 500" in result["error"]
+
+
+def test_bulk_new_branch_batches_by_refs_batch_size(app, call, monkeypatch):
+    fa, state = app
+    monkeypatch.setattr(fa, "REFS_BATCH_SIZE", 2)
+    tickets = [f"CT-{i}-batch-test" for i in range(1, 6)]
+
+    status, _ = call(fa.bulk_new_branch, "bulkNewBranch", repo=REPO, tickets=",".join(tickets))
+
+    assert status == 200
+    assert state.calls["ref_update"] == 3
+
+
+def test_bulk_delete_branch(app, call):
+    fa, state = app
+    repo_id = fa.STATIC_REPO_MAP[REPO]
+    state.add_branch(repo_id, "CT-1-done-work")
+    state.add_branch(repo_id, "CT-2-done-work")
+
+    status, body = call(fa.bulk_delete_branch, "bulkDeleteBranch", repo=REPO,
+                        tickets="CT-1-done-work,CT-2-done-work,CT-3-missing-one,dev")
+
+    results = body["results"]
+    assert status == 207
+    assert results["CT-1-done-work"] == {"status": "BRANCH_DELETED", "success": True}
+    assert results["CT-2-done-work"] == {"status": "BRANCH_DELETED", "success": True}
+    assert results["CT-3-missing-one"]["status"] == "BRANCH_NOT_FOUND"
+    assert results["dev"]["status"] == "PROTECTED_BRANCH"
+    assert "refs/heads/CT-1-done-work" not in state.repos[repo_id]["refs"]
+    assert state.calls["ref_lookup"] == 1 and state.calls["ref_update"] == 1
+
+
+def test_bulk_delete_branch_ndjson(app, call):
+    fa, state = app
+    repo_id = fa.STATIC_REPO_MAP[REPO]
+    state.add_branch(repo_id, "CT-1-done-work")
+
+    status, text = call(fa.bulk_delete_branch, "bulkDeleteBranch", repo=REPO, tickets="CT-1-done-work", format="ndjson")
+
+    lines = [json.loads(line) for line in text.splitlines()]
+    assert status == 200
+    assert lines[0] == {"ticket": "CT-1-done-work", "repo": REPO, "status": "BRANCH_DELETED", "success": True}
+    assert lines[-1]["done"] is True and lines[-1]["summary"] == {"BRANCH_DELETED": 1}
+
+
+def test_bulk_routes_require_parameters(app, call):
+    fa, _ = app
+    status, body = call(fa.bulk_new_branch, "bulkNewBranch", repo=REPO)
+    assert status == 400 and body["status"] == "MISSING_PARAMETERS"
+    status, body = call(fa.bulk_delete_branch, "bulkDeleteBranch", repo="NoSuchRepo", tickets="CT-1-a-b")
+    assert status == 400 and body["status"] == "INVALID_REPO"
@@ -0,0 +1,74 @@
+import json
+
+
+def test_prs_are_opened_across_repos(app, call):
+    fa, state = app
+    jira, ai = fa.STATIC_REPO_MAP["CTJira"], fa.STATIC_REPO_MAP["CustomsOnlineAI"]
+    state.add_branch(jira, "CT-1-bulk-pr")
+    state.add_branch(jira, "CT-2-bulk-pr")
+    state.add_branch(ai, "CT-1-bulk-pr")
+    items = [{"ticket": "CT-1-bulk-pr", "repo": "CTJira"}, {"ticket": "CT-2-bulk-pr", "repo": "CTJira"},
+             {"ticket": "CT-1-bulk-pr", "repo": "CustomsOnlineAI"}, {"ticket": "CT-1-bulk-pr", "repo": "CTJira"}]
+
+    status, body = call(fa.bulk_pr_open, "bulkPrOpen", method="POST", body={"items": items})
+
+    assert status == 200 and body["status"] == "BULK_PR_RESULT" and body["summary"] == {"PR_OPENED": 3}
+    assert set(body["results"]["CT-1-bulk-pr"]) == {"CTJira", "CustomsOnlineAI"}
+    assert state.calls["pr_create"] == 3
+    # Repo başına test head'i, bir refs ve bir aktif PR listesi okunur
+    assert state.calls["ref_lookup"] == 4 and state.calls["pr_search"] == 2
+    pr_id = body["results"]["CT-2-bulk-pr"]["CTJira"]["pr_id"]
+    assert state.repos[jira]["prs"][pr_id]["targetRefName"] == "refs/heads/test"
+    assert fa.pr_index.get(jira, "CT-2-bulk-pr")["pr_id"] == pr_id
+
+
+def test_open_prs_and_missing_branches(app, call):
+    fa, state = app
+    jira = fa.STATIC_REPO_MAP["CTJira"]
+    state.add_branch(jira, "CT-1-already-open")
+    call(fa.pr_open, "propen", ticket="CT-1-already-open", repo="CTJira")
+    state.calls.clear()
+
+    status, body = call(fa.bulk_pr_open, "bulkPrOpen", tickets="CT-1-already-open,CT-2-no-branch", repo="CTJira")
+
+    assert status == 207 and body["success"] is False
+    assert body["results"]["CT-1-already-open"]["CTJira"]["status"] == "PR_ALREADY_OPEN"
+    assert body["results"]["CT-2-no-branch"]["CTJira"]["status"] == "SOURCE_BRANCH_NOT_FOUND"
+    assert state.calls["pr_create"] == 0
+
+
+def test_missing_test_branch_fails_every_ticket_of_the_repo(app, call):
+    fa, state = app
+    ai = fa.STATIC_REPO_MAP["CustomsOnlineAI"]
+    state.add_branch(ai, "CT-1-no-target")
+    state.add_branch(ai, "CT-2-no-target")
+    with state.lock:
+        del state.repos[ai]["refs"]["refs/heads/test"]
+
+    status, body = call(fa.bulk_pr_open, "bulkPrOpen", tickets="CT-1-no-target,CT-2-no-target", repo="CustomsOnlineAI")
+
+    assert status == 207 and body["summary"] == {"TARGET_BRANCH_NOT_FOUND": 2}
+    assert state.calls["pr_create"] == 0
+
+
+def test_ndjson_output(app, call):
+    fa, state = app
+    jira = fa.STATIC_REPO_MAP["CTJira"]
+    state.add_branch(jira, "CT-1-ndjson")
+
+    status, text = call(fa.bulk_pr_open, "bulkPrOpen", tickets="CT-1-ndjson", repo="CTJira", format="ndjson")
+
+    lines = [json.loads(line) for line in text.splitlines()]
+    assert status == 200
+    assert lines[0]["ticket"] == "CT-1-ndjson" and lines[0]["repo"] == "CTJira" and lines[0]["status"] == "PR_OPENED"
+    assert lines[-1] == {"status": "BULK_PR_RESULT", "done": True, "repos": ["CTJira"],
+                         "summary": {"PR_OPENED": 1}, "success": True}
+
+
+def test_invalid_requests(app, call):
+    fa, state = app
+    status, body = call(fa.bulk_pr_open, "bulkPrOpen", method="POST", body={"items": [{"ticket": "CT-1"}]})
+    assert status == 400 and body["status"] == "MISSING_PARAMETERS"
+    status, body = call(fa.bulk_pr_open, "bulkPrOpen", tickets="CT-1", repo="NoSuchRepo")
+    assert status == 400 and body["status"] == "INVALID_REPO"
+    assert sum(state.calls.values()) == 0
@@ -0,0 +1,81 @@
+REPOS = ["CTJira", "CustomsOnlineAI"]
+
+
+def open_pr(state, repo_id: str, pr_id: int, branch: str, target: str = "test") -> None:
+    with state.lock:
+        state.repos[repo_id]["prs"][pr_id] = {
+            "pullRequestId": pr_id, "status": "active", "mergeStatus": "succeeded",
+            "sourceRefName": f"refs/heads/{branch}", "targetRefName": f"refs/heads/{target}",
+            "lastMergeSourceCommit": {"commitId": state.repos[repo_id]["refs"][f"refs/heads/{branch}"]},
+        }
+
+
+def test_status_is_read_with_two_calls_per_repo(app, call):
+    fa, state = app
+    jira, ai = (fa.STATIC_REPO_MAP[name] for name in REPOS)
+    sha = state.add_branch(jira, "CT-1-status")
+    state.add_branch(ai, "CT-2-status")
+    open_pr(state, jira, 11, "CT-1-status")
+
+    status, body = call(fa.bulk_status, "bulkStatus", method="POST",
+                        body={"tickets": ["CT-1-status", "CT-2-status", "CT-3-missing"], "repos": REPOS})
+
+    assert status == 200 and body["status"] == "BULK_STATUS_RESULT" and body["success"] is True
+    assert body["results"]["CT-1-status"]["CTJira"] == {
+        "branch_exists": True, "sha": sha, "pr_id": 11, "pr_status": "active",
+        "pr_merge_status": "succeeded", "pr_target": "test",
+    }
+    assert body["results"]["CT-1-status"]["CustomsOnlineAI"]["branch_exists"] is False
+    assert body["results"]["CT-2-status"]["CustomsOnlineAI"]["pr_id"] is None
+    assert not any(repo["branch_exists"] for repo in body["results"]["CT-3-missing"].values())
+    assert state.calls["ref_lookup"] == 2 and state.calls["pr_search"] == 2
+
+
+def test_pr_to_test_wins_and_is_indexed(app, call):
+    fa, state = app
+    jira = fa.STATIC_REPO_MAP["CTJira"]
+    state.add_branch(jira, "CT-1-two-prs")
+    open_pr(state, jira, 21, "CT-1-two-prs", target="main")
+    open_pr(state, jira, 22, "CT-1-two-prs", target="test")
+
+    status, body = call(fa.bulk_status, "bulkStatus", tickets="CT-1-two-prs", repo="CTJira")
+
+    assert status == 200 and body["results"]["CT-1-two-prs"]["CTJira"]["pr_id"] == 22
+    assert fa.pr_index.get(jira, "CT-1-two-prs")["pr_id"] == 22
+
+
+def test_active_prs_are_read_page_by_page(app, call, monkeypatch):
+    fa, state = app
+    jira = fa.STATIC_REPO_MAP["CTJira"]
+    tickets = [f"CT-{i}-paged" for i in range(3)]
+    for pr_id, ticket in enumerate(tickets, start=1):
+        state.add_branch(jira, ticket)
+        open_pr(state, jira, pr_id, ticket)
+    monkeypatch.setattr(fa, "ACTIVE_PR_PAGE_SIZE", 2)
+
+    status, body = call(fa.bulk_status, "bulkStatus", tickets=",".join(tickets), repo="CTJira")
+
+    assert status == 200
+    assert [body["results"][ticket]["CTJira"]["pr_id"] for ticket in tickets] == [1, 2, 3]
+    assert state.calls["pr_search"] == 2
+
+
+def test_failing_repo_is_reported_with_207(app, call):
+    fa, state = app
+    ai = fa.STATIC_REPO_MAP["CustomsOnlineAI"]
+    state.inject(404, path_contains=f"{ai}/refs", count=10)
+
+    status, body = call(fa.bulk_status, "bulkStatus", tickets="CT-1-status", repos=",".join(REPOS))
+
+    assert status == 207 and body["success"] is False
+    assert list(body["errors"]) == ["CustomsOnlineAI"]
+    assert "CTJira" in body["results"]["CT-1-status"] and "CustomsOnlineAI" not in body["results"]["CT-1-status"]
+
+
+def test_invalid_requests(app, call):
+    fa, state = app
+    status, body = call(fa.bulk_status, "bulkStatus", repo="CTJira")
+    assert status == 400 and body["status"] == "MISSING_PARAMETERS"
+    status, body = call(fa.bulk_status, "bulkStatus", tickets="CT-1", repos="CTJira,NoSuchRepo")
+    assert status == 400 and body["status"] == "INVALID_REPO" and "NoSuchRepo" in body["message"]
+    assert sum(state.calls.values()) == 0
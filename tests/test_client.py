@@ -0,0 +1,38 @@
+import asyncio
+
+from ado.client import AdoClient
+
+
+def test_session_is_reused_within_a_loop(fake_ado):
+    state, base = fake_ado
+    client = AdoClient()
+    url = f"{base}/_apis/git/repositories/repo-1/refs?filter=heads/dev"
+
+    async def main():
+        await client.request(url)
+        first = client._session
+        await client.request(url)
+        assert client._session is first
+        await client.close()
+
+    asyncio.run(main())
+    assert state.calls["ref_lookup"] == 2
+
+
+def test_session_from_a_finished_loop_is_closed(fake_ado):
+    _, base = fake_ado
+    client = AdoClient()
+    url = f"{base}/_apis/git/repositories/repo-1/refs?filter=heads/dev"
+    sessions = []
+
+    async def one():
+        await client.request(url)
+        sessions.append(client._session)
+
+    asyncio.run(one())
+    asyncio.run(one())
+    assert sessions[0] is not sessions[1]
+    # Önceki asyncio.run'ın session'ı ve connector'ı yenisi açılırken kapatılır
+    assert sessions[0].closed and sessions[0].connector is None
+    asyncio.run(client.close())
+    assert sessions[1].closed
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from ado import IdempotencyCache, MemoryStateStore
+
+
+def counting_factory(result, delay: float = 0.0):
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+
+    return factory, calls
+
+
+def test_concurrent_duplicates_share_one_call():
+    cache = IdempotencyCache(window=30)
+    factory, calls = counting_factory((200, "ok"), delay=0.01)
+
+    async def main():
+        return await asyncio.gather(*(cache.run(("devmerge", "CT-1", "repo"), factory) for _ in range(3)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert [replayed for _, replayed in results] == [False, True, True]
+    assert cache.stats()["coalesced"] == 2
+
+
+def test_finished_result_replayed_within_window():
+    cache = IdempotencyCache(window=30)
+    factory, calls = counting_factory((200, "ok"))
+
+    async def main():
+        first = await cache.run("k", factory)
+        second = await cache.run("k", factory)
+        return first, second
+
+    assert asyncio.run(main()) == (((200, "ok"), False), ((200, "ok"), True))
+    assert len(calls) == 1
+
+
+def test_expired_window_runs_again():
+    cache = IdempotencyCache(window=0.01)
+    factory, calls = counting_factory((200, "ok"))
+
+    async def main():
+        await cache.run("k", factory)
+        await asyncio.sleep(0.02)
+        return await cache.run("k", factory)
+
+    assert asyncio.run(main()) == ((200, "ok"), False)
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("status", [207, 404, 409, 429, 500, 503])
+def test_non_definitive_results_are_not_replayed(status):
+    # function_app'in _idempotent'i sadece kesin sonuçları (200/201/400/403) cache'ler
+    cache = IdempotencyCache(window=30)
+    factory, calls = counting_factory((status, "retry"))
+    cacheable = lambda result: result[0] in (200, 201, 400, 403)
+
+    async def main():
+        await cache.run("k", factory, cacheable=cacheable)
+        return await cache.run("k", factory, cacheable=cacheable)
+
+    assert asyncio.run(main()) == ((status, "retry"), False)
+    assert len(calls) == 2
+
+
+def test_errors_are_not_cached():
+    cache = IdempotencyCache(window=30)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return (200, "ok")
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await cache.run("k", flaky)
+        return await cache.run("k", flaky)
+
+    assert asyncio.run(main()) == ((200, "ok"), False)
+
+
+def test_shared_store_replays_across_caches():
+    store = MemoryStateStore()
+    first = IdempotencyCache(window=30, store=store, poll_interval=0.005)
+    second = IdempotencyCache(window=30, store=store, poll_interval=0.005)
+    factory, calls = counting_factory([200, "ok"], delay=0.02)
+
+    async def main():
+        return await asyncio.gather(first.run("k", factory), second.run("k", factory))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert sorted(replayed for _, replayed in results) == [False, True]
+    assert second.stats()["shared_replays"] + first.stats()["shared_replays"] == 1
+
+
+def test_shared_claim_released_for_non_cacheable_result():
+    store = MemoryStateStore()
+    first = IdempotencyCache(window=30, store=store, poll_interval=0.005)
+    second = IdempotencyCache(window=30, store=store, poll_interval=0.005)
+    factory, calls = counting_factory([409, "retry"])
+    cacheable = lambda result: result[0] == 200
+
+    async def main():
+        await first.run("k", factory, cacheable=cacheable)
+        return await second.run("k", factory, cacheable=cacheable)
+
+    assert asyncio.run(main()) == ([409, "retry"], False)
+    assert len(calls) == 2
@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+from ado import lookups
+
+REPO = "CTJira"
+BRANCH = "CT-101-export"
+
+
+def transition(to_status: str, from_status: str, key: str = "CT-101") -> dict:
+    return {"issue": {"key": key, "fields": {}},
+            "changelog": {"items": [{"field": "status", "fromString": from_status, "toString": to_status}]}}
+
+
+def test_plan_steps_run_in_order_within_a_repo(app, monkeypatch):
+    fa, state = app
+    events = []
+
+    def recording(step, handler):
+        async def _handler(req):
+            events.append(("start", step, req.params["repo"]))
+            # Paralel çalışsaydı diğer adım bu beklemede başlardı
+            await asyncio.sleep(0.02)
+            resp = await handler(req)
+            events.append(("end", step, req.params["repo"]))
+            return resp
+        return _handler
+
+    for step in ("devmerge", "prapprove"):
+        monkeypatch.setitem(fa.JOB_HANDLERS, step, recording(step, fa.JOB_HANDLERS[step]))
+    repo_id = fa.STATIC_REPO_MAP[REPO]
+    state.add_branch(repo_id, BRANCH)
+    headers = fa._ado_auth_headers()
+
+    async def main():
+        with lookups.lookup_scope() as scope:
+            return await fa._run_jira_plan(REPO, BRANCH, ["devmerge", "prapprove"], headers, scope)
+
+    results = asyncio.run(main())
+
+    assert list(results) == ["devmerge", "prapprove"]
+    assert [(kind, step) for kind, step, _ in events] == [
+        ("start", "devmerge"), ("end", "devmerge"), ("start", "prapprove"), ("end", "prapprove")]
+
+
+def test_repos_run_in_parallel_steps_in_sequence(app, call, monkeypatch):
+    fa, state = app
+    repos = ["CTJira", "CustomsOnlineAI"]
+    events = []
+
+    def recording(step):
+        async def _handler(req):
+            events.append(("start", step, req.params["repo"]))
+            await asyncio.sleep(0.02)
+            events.append(("end", step, req.params["repo"]))
+            return fa.func.HttpResponse(json.dumps({"status": "OK", "success": True}), status_code=200,
+                                        mimetype="application/json")
+        return _handler
+
+    for step in ("devmerge", "prapprove"):
+        monkeypatch.setitem(fa.JOB_HANDLERS, step, recording(step))
+
+    status, body = call(fa.jira_webhook, "jira", method="POST", repo=",".join(repos), ticket=BRANCH,
+                        body=transition("Analyst Approval", "Code Review"))
+
+    assert status == 200 and body["status"] == "JIRA_PLAN_RESULT"
+    # İki repo aynı anda başlar
+    assert {repo for kind, step, repo in events[:2]} == set(repos)
+    for repo in repos:
+        assert [(kind, step) for kind, step, r in events if r == repo] == [
+            ("start", "devmerge"), ("end", "devmerge"), ("start", "prapprove"), ("end", "prapprove")]
+
+
+def test_analyst_approval_merges_to_dev_then_completes_the_pr(app, call):
+    fa, state = app
+    repo_id = fa.STATIC_REPO_MAP[REPO]
+    source = state.add_branch(repo_id, BRANCH)
+    old_dev = state.repos[repo_id]["refs"]["refs/heads/dev"]
+    call(fa.pr_open, "propen", ticket=BRANCH, repo=REPO)
+    state.calls.clear()
+
+    # ticket verilmez: branch issue key'i ile aranır
+    status, body = call(fa.jira_webhook, "jira", method="POST", repo=REPO,
+                        body=transition("Analyst Approval", "Code Review"))
+
+    steps = body["repos"][REPO]["steps"]
+    assert status == 200, body
+    assert body["repos"][REPO]["branch"] == BRANCH
+    assert steps["devmerge"]["status_code"] == 200 and steps["prapprove"]["status_code"] == 200
+    assert steps["prapprove"]["body"]["status"] == "PR_APPROVED_AND_MERGED"
+    refs = state.repos[repo_id]["refs"]
+    assert refs["refs/heads/dev"] != old_dev and source in state.ancestors(repo_id, refs["refs/heads/dev"])
+
+
+def test_branch_lookup_and_plan_errors(app, call, monkeypatch):
+    fa, state = app
+    repo_id = fa.STATIC_REPO_MAP[REPO]
+    body = transition("Code Review", "In Development")
+
+    status, result = call(fa.jira_webhook, "jira", method="POST", repo=REPO, body=body)
+    assert status == 207 and result["repos"][REPO]["status"] == "BRANCH_NOT_FOUND"
+
+    state.add_branch(repo_id, "CT-101-first")
+    state.add_branch(repo_id, "feature/CT-101-second")
+    status, result = call(fa.jira_webhook, "jira", method="POST", repo=REPO, body=body)
+    assert status == 207 and result["repos"][REPO]["status"] == "AMBIGUOUS_BRANCH"
+
+    monkeypatch.setattr(fa, "JIRA_TRANSITION_PLANS", {("code review", "analyst approval"): ["noSuchStep"]})
+    status, result = call(fa.jira_webhook, "jira", method="POST", repo=REPO, ticket="CT-101-first",
+                          body=transition("Analyst Approval", "Code Review"))
+    assert status == 207
+    assert result["repos"][REPO]["steps"]["noSuchStep"]["body"]["status"] == "UNKNOWN_STEP"
+
+
+def test_transition_without_plan_is_ignored(app, call):
+    fa, state = app
+    status, body = call(fa.jira_webhook, "jira", method="POST", repo=REPO, body=transition("Done", "Analyst Approval"))
+    assert status == 200 and body["status"] == "JIRA_NO_PLAN"
+    assert sum(state.calls.values()) == 0
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from ado import MemoryStateStore, jobs
+
+
+@pytest.fixture(params=["memory", "sqlite", "state"])
+def job_store(request, tmp_path):
+    if request.param == "memory":
+        return jobs.InMemoryJobStore()
+    if request.param == "sqlite":
+        return jobs.SqliteJobStore(str(tmp_path / "jobs.sqlite"))
+    return jobs.StateJobStore(MemoryStateStore())
+
+
+def test_job_lifecycle(job_store):
+    job_id = jobs.new_job_id()
+    created = job_store.create(job_id, "devmerge", {"ticket": "CT-1", "repo": "CTJira"})
+    assert created["status"] == jobs.JOB_QUEUED and created["result"] is None
+
+    job_store.update(job_id, jobs.JOB_RUNNING)
+    job_store.update(job_id, jobs.JOB_COMPLETED, {"status_code": 200, "body": {"status": "DEV_MERGE_OK"}})
+    job = job_store.get(job_id)
+    assert job["status"] == jobs.JOB_COMPLETED
+    assert job["params"] == {"ticket": "CT-1", "repo": "CTJira"}
+    assert job["result"] == {"status_code": 200, "body": {"status": "DEV_MERGE_OK"}}
+
+
+def test_unknown_job(job_store):
+    assert job_store.get("missing") is None
+    job_store.update("missing", jobs.JOB_FAILED)
+    assert job_store.get("missing") is None
+
+
+def test_memory_job_store_drops_oldest():
+    job_store = jobs.InMemoryJobStore(max_jobs=2)
+    for job_id in ("a", "b", "c"):
+        job_store.create(job_id, "propen", {})
+    assert job_store.get("a") is None and job_store.get("c") is not None
+
+
+def test_state_job_store_update_retries_on_version_conflict():
+    store = MemoryStateStore()
+    job_store = jobs.StateJobStore(store)
+    job_store.create("a", "propen", {})
+    real_put = store.put
+    conflicts = []
+
+    def racing_put(namespace, key, value, ttl=None, version=None):
+        if version is not None and not conflicts:
+            # Araya başka bir worker'ın yazması girer
+            conflicts.append(1)
+            real_put(namespace, key, dict(value, status=jobs.JOB_RUNNING), ttl=ttl)
+        return real_put(namespace, key, value, ttl=ttl, version=version)
+
+    store.put = racing_put
+    job_store.update("a", jobs.JOB_COMPLETED, {"status_code": 200})
+    assert job_store.get("a")["status"] == jobs.JOB_COMPLETED
+
+
+def test_memory_queue_runs_messages():
+    seen = []
+
+    async def runner(message):
+        seen.append(message["id"])
+
+    async def main():
+        queue = jobs.MemoryJobQueue(runner)
+        await queue.enqueue({"id": "a"})
+        await queue.enqueue({"id": "b"})
+        await asyncio.gather(*queue._tasks)
+
+    asyncio.run(main())
+    assert sorted(seen) == ["a", "b"]
+
+
+def test_sqlite_queue_drains_in_order_and_survives_failures(tmp_path):
+    seen = []
+
+    async def runner(message):
+        seen.append(message["id"])
+        if message["id"] == "b":
+            raise RuntimeError("boom")
+
+    async def main():
+        queue = jobs.SqliteJobQueue(str(tmp_path / "queue.sqlite"), runner)
+        for job_id in ("a", "b", "c"):
+            await queue.enqueue({"id": job_id})
+        await queue._drain_task
+        return queue._pop()
+
+    assert asyncio.run(main()) is None
+    assert seen == ["a", "b", "c"]
+
+
+def test_sqlite_queue_keeps_messages_for_next_worker(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    seen = []
+
+    async def runner(message):
+        seen.append(message["id"])
+
+    async def main():
+        first = jobs.SqliteJobQueue(path, runner)
+        with first._lock:
+            first._conn.execute("INSERT INTO job_queue (message) VALUES (?)", ('{"id": "left-over"}',))
+        # Restart sonrası açılan kuyruk kalan mesajları işler
+        await jobs.SqliteJobQueue(path, runner).drain()
+
+    asyncio.run(main())
+    assert seen == ["left-over"]
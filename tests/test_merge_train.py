@@ -0,0 +1,178 @@
+import asyncio
+import io
+import urllib.error
+
+import pytest
+
+from ado import MergeTrain
+
+
+def http_error(code: int) -> urllib.error.HTTPError:
+    return urllib.error.HTTPError("http://ado/merges", code, "error", {}, io.BytesIO(b"{}"))
+
+
+class FakeRepo:
+    """dev head'ini ve yapılan çağrıları tutan, MergeTrain ops'larını sağlayan sahte repo."""
+
+    def __init__(self, dev_sha: str = "d0"):
+        self.dev_sha = dev_sha
+        self.dev_reads = []
+        self.updates = []
+        self.merges = []
+        self.conflicts = set()
+        self.errors = {}
+        self.reject_updates = 0
+
+    async def get_dev_sha(self, fresh: bool) -> str:
+        self.dev_reads.append(fresh)
+        return self.dev_sha
+
+    def create_merge_for(self, caller: str):
+        async def create_merge(source_sha: str, dev_sha: str, ticket: str) -> str:
+            self.merges.append((caller, source_sha, dev_sha))
+            if source_sha in self.conflicts:
+                raise http_error(409)
+            if source_sha in self.errors:
+                raise http_error(self.errors[source_sha])
+            return f"{source_sha}+{dev_sha}"
+        return create_merge
+
+    async def update_dev(self, old_sha: str, new_sha: str) -> bool:
+        if self.reject_updates:
+            self.reject_updates -= 1
+            # Bu arada başka biri dev'i ilerletti
+            self.dev_sha = f"{self.dev_sha}'"
+            return False
+        assert old_sha == self.dev_sha
+        self.updates.append((old_sha, new_sha))
+        self.dev_sha = new_sha
+        return True
+
+    def ops(self, caller: str) -> dict:
+        return {"get_dev_sha": self.get_dev_sha, "create_merge": self.create_merge_for(caller),
+                "update_dev": self.update_dev}
+
+
+async def submit_all(train: MergeTrain, repo: FakeRepo, sources: list) -> list:
+    return await asyncio.gather(
+        *(train.submit("r1", f"CT-{i}", sha, **repo.ops(f"CT-{i}")) for i, sha in enumerate(sources)),
+        return_exceptions=True
+    )
+
+
+def test_batch_shares_single_dev_update():
+    repo = FakeRepo()
+    train = MergeTrain(window=0.01)
+    results = asyncio.run(submit_all(train, repo, ["s1", "s2", "s3"]))
+
+    assert [r["status"] for r in results] == ["DEV_MERGE_OK"] * 3
+    # Merge'ler birbirinin üzerine kurulur, tek ref update yapılır
+    assert [r["dev_old_sha"] for r in results] == ["d0", "s1+d0", "s2+s1+d0"]
+    assert repo.updates == [("d0", "s3+s2+s1+d0")]
+    assert all(r["dev_new_sha"] == "s3+s2+s1+d0" and r["batch_size"] == 3 for r in results)
+    assert train.stats()["batches"] == 1 and train.stats()["merged"] == 3
+
+
+def test_each_item_uses_its_own_create_merge():
+    repo = FakeRepo()
+    train = MergeTrain(window=0.01)
+    asyncio.run(submit_all(train, repo, ["s1", "s2"]))
+
+    assert [(caller, source) for caller, source, _ in repo.merges] == [("CT-0", "s1"), ("CT-1", "s2")]
+
+
+def test_already_merged_and_duplicate_sources():
+    repo = FakeRepo()
+    train = MergeTrain(window=0.01)
+    results = asyncio.run(submit_all(train, repo, ["d0", "s1", "s1"]))
+
+    assert results[0]["status"] == "ALREADY_UP_TO_DATE"
+    assert results[1]["merge_commit"] == results[2]["merge_commit"] == "s1+d0"
+    assert len(repo.merges) == 1
+
+
+def test_conflict_only_affects_its_item():
+    repo = FakeRepo()
+    repo.conflicts.add("s2")
+    train = MergeTrain(window=0.01)
+    results = asyncio.run(submit_all(train, repo, ["s1", "s2", "s3"]))
+
+    assert [r["status"] for r in results] == ["DEV_MERGE_OK", "MERGE_CONFLICT", "DEV_MERGE_OK"]
+    assert repo.updates == [("d0", "s3+s1+d0")]
+
+
+def test_non_conflict_error_only_fails_its_item():
+    repo = FakeRepo()
+    repo.errors["s2"] = 500
+    train = MergeTrain(window=0.01)
+    results = asyncio.run(submit_all(train, repo, ["s1", "s2", "s3"]))
+
+    assert results[0]["status"] == "DEV_MERGE_OK"
+    assert isinstance(results[1], urllib.error.HTTPError) and results[1].code == 500
+    assert results[2]["status"] == "DEV_MERGE_OK"
+    # Önceden merge edilmiş item'lar hatalı item yüzünden kaybolmaz
+    assert repo.updates == [("d0", "s3+s1+d0")]
+
+
+def test_rejected_ref_update_rebuilds_on_fresh_dev():
+    repo = FakeRepo()
+    repo.reject_updates = 1
+    train = MergeTrain(window=0.01)
+    results = asyncio.run(submit_all(train, repo, ["s1", "s2"]))
+
+    assert [r["status"] for r in results] == ["DEV_MERGE_OK"] * 2
+    assert repo.dev_reads == [False, True]
+    assert repo.updates == [("d0'", "s2+s1+d0'")]
+    assert train.stats()["ref_retries"] == 1
+
+
+def test_gives_up_after_max_attempts():
+    repo = FakeRepo()
+    repo.reject_updates = 5
+    train = MergeTrain(window=0.01, max_attempts=2)
+    results = asyncio.run(submit_all(train, repo, ["s1"]))
+
+    assert results == [{"status": "DEV_UPDATE_CONFLICT", "dev_sha": None}]
+    assert repo.updates == []
+
+
+def test_dev_read_failure_fails_whole_batch():
+    repo = FakeRepo()
+
+    async def broken_dev_sha(fresh):
+        raise http_error(503)
+
+    train = MergeTrain(window=0.01)
+
+    async def main():
+        ops = dict(repo.ops("CT-0"), get_dev_sha=broken_dev_sha)
+        return await asyncio.gather(train.submit("r1", "CT-0", "s1", **ops),
+                                    train.submit("r1", "CT-1", "s2", **repo.ops("CT-1")),
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, urllib.error.HTTPError) and r.code == 503 for r in results)
+
+
+@pytest.mark.parametrize("held", [True, False])
+def test_batches_run_under_lock(held):
+    repo = FakeRepo()
+    events = []
+
+    class Lock:
+        def __init__(self, repo_id):
+            self.repo_id = repo_id
+
+        async def __aenter__(self):
+            events.append(("acquire", self.repo_id))
+            return held
+
+        async def __aexit__(self, *exc):
+            events.append(("release", self.repo_id))
+
+    train = MergeTrain(window=0.01, lock=Lock)
+    results = asyncio.run(submit_all(train, repo, ["s1"]))
+
+    assert results[0]["status"] == "DEV_MERGE_OK"
+    assert events == [("acquire", "r1"), ("release", "r1")]
+    assert train.stats()["unlocked_batches"] == (0 if held else 1)
@@ -0,0 +1,68 @@
+from ado import MetricsRegistry
+from ado.metrics import classify_operation
+
+REPO_URL = "https://dev.azure.com/org/project/_apis/git/repositories/repo-1"
+
+
+def test_classify_operation():
+    assert classify_operation("GET", f"{REPO_URL}/refs?filter=heads/dev") == "ref_lookup"
+    assert classify_operation("POST", f"{REPO_URL}/refs") == "ref_update"
+    assert classify_operation("POST", f"{REPO_URL}/merges") == "merge"
+    assert classify_operation("GET", f"{REPO_URL}/stats/branches?name=dev") == "branch_stats"
+    assert classify_operation("GET", f"{REPO_URL}/diffs/commits?baseVersion=dev") == "commit_diff"
+    assert classify_operation("PATCH", f"{REPO_URL}/pullrequests/42") == "pr_patch"
+    assert classify_operation("GET", f"{REPO_URL}/pullrequests/42") == "pr_get"
+    assert classify_operation("POST", f"{REPO_URL}/pullrequests") == "pr_create"
+    assert classify_operation("GET", f"{REPO_URL}/pullrequests?searchCriteria.status=active") == "pr_search"
+    assert classify_operation("GET", "https://dev.azure.com/org/project/_apis/git/repositories?api-version=7.1") == "repo_list"
+    assert classify_operation("GET", "https://dev.azure.com/org/_apis/projects") == "other"
+
+
+def test_render_histograms_are_cumulative():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.observe_request("newBranch", 200, 0.05)
+    registry.observe_request("newBranch", 200, 0.5)
+    registry.observe_request("newBranch", 500, 2.0)
+    text = registry.render()
+
+    assert "# TYPE jira_ado_http_request_duration_seconds histogram" in text
+    assert 'jira_ado_http_request_duration_seconds_bucket{route="newBranch",le="0.1"} 1' in text
+    assert 'jira_ado_http_request_duration_seconds_bucket{route="newBranch",le="1.0"} 2' in text
+    assert 'jira_ado_http_request_duration_seconds_bucket{route="newBranch",le="+Inf"} 3' in text
+    assert 'jira_ado_http_request_duration_seconds_count{route="newBranch"} 3' in text
+    assert 'jira_ado_http_requests_total{route="newBranch",status="200"} 2' in text
+    assert 'jira_ado_http_requests_total{route="newBranch",status="500"} 1' in text
+    assert text.count("# HELP jira_ado_http_requests_total") == 1
+
+
+def test_render_ado_operations_and_gauges():
+    registry = MetricsRegistry()
+    registry.observe_ado("ref_update", 409, 0.2)
+    registry.observe_ado("merge", "timeout", 30.0)
+    text = registry.render(gauges=[
+        ("jira_ado_ref_cache_lookups_total", "Ref cache lookups by result", "counter", {"result": "hit"}, 3),
+        ("jira_ado_ref_cache_lookups_total", "Ref cache lookups by result", "counter", {"result": "miss"}, 1),
+    ])
+
+    assert 'jira_ado_outbound_requests_total{operation="ref_update",status="409"} 1' in text
+    assert 'jira_ado_outbound_requests_total{operation="merge",status="timeout"} 1' in text
+    assert text.count("# TYPE jira_ado_ref_cache_lookups_total counter") == 1
+    assert 'jira_ado_ref_cache_lookups_total{result="hit"} 3' in text
+    assert text.endswith("\n")
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.inc("jira_ado_test_total", {"route": 'a"b\\c\nd'}, help_text="test")
+    assert 'jira_ado_test_total{route="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+
+def test_metrics_route_reports_requests_and_ado_calls(app, call):
+    fa, _ = app
+    call(fa.new_branch, "newBranch", ticket="CT-1-metrics-test", repo="CTJira")
+    status, text = call(fa.metrics_endpoint, "metrics")
+
+    assert status == 200
+    assert 'jira_ado_http_requests_total{route="newBranch",status="200"}' in text
+    assert 'jira_ado_outbound_requests_total{operation="ref_lookup",status="200"}' in text
+    assert "jira_ado_ref_cache_lookups_total" in text
@@ -0,0 +1,78 @@
+from ado import MemoryStateStore, PrIndex
+
+REPO = "CTJira"
+TICKET = "CT-1-indexed-pr"
+
+
+def test_put_get_and_counters():
+    index = PrIndex()
+    assert index.get("repo", "CT-1") is None
+    index.put("repo", "CT-1", "42", "a" * 40)
+    assert index.get("repo", "CT-1") == {"pr_id": 42, "source_commit": "a" * 40}
+    assert index.has("repo", "CT-1") and not index.has("repo", "CT-2")
+    # has() hit/miss saymaz
+    assert index.stats()["hits"] == 1 and index.stats()["misses"] == 1
+
+
+def test_entries_survive_restart_through_the_sqlite_file(tmp_path):
+    path = str(tmp_path / "pr_index.sqlite")
+    PrIndex(path=path).put("repo", "CT-1", 42, "a" * 40)
+    restarted = PrIndex(path=path)
+    assert restarted.stats()["persistent"] is True
+    assert restarted.get("repo", "CT-1")["pr_id"] == 42
+
+
+def test_memory_layer_is_bounded_but_store_keeps_everything():
+    index = PrIndex(max_entries=2, store=MemoryStateStore())
+    for i in range(3):
+        index.put("repo", f"CT-{i}", i, "a" * 40)
+    assert index.stats()["cached_entries"] == 2
+    assert index.get("repo", "CT-0")["pr_id"] == 0
+
+
+def test_remove_with_pr_id_keeps_a_newer_pr():
+    store = MemoryStateStore()
+    index, other = PrIndex(store=store), PrIndex(store=store)
+    index.put("repo", "CT-1", 1, "a" * 40)
+    # Başka bir worker aynı branch için yeni PR açar
+    other.put("repo", "CT-1", 2, "b" * 40)
+    index.remove("repo", "CT-1", stale=True, pr_id=1)
+    assert PrIndex(store=store).get("repo", "CT-1")["pr_id"] == 2
+    assert index.stats()["stale"] == 1
+    index.remove("repo", "CT-1")
+    assert PrIndex(store=store).get("repo", "CT-1") is None
+
+
+def test_prapprove_completes_the_indexed_pr_without_searching(app, call):
+    fa, state = app
+    repo_id = fa.STATIC_REPO_MAP[REPO]
+    state.add_branch(repo_id, TICKET)
+    status, body = call(fa.pr_open, "propen", ticket=TICKET, repo=REPO)
+    assert status == 200, body
+    assert fa.pr_index.has(repo_id, TICKET)
+
+    state.calls.clear()
+    status, body = call(fa.pr_approve, "prapprove", ticket=TICKET, repo=REPO)
+
+    assert status == 200 and body["status"] == "PR_APPROVED_AND_MERGED"
+    assert state.calls["pr_search"] == 0 and state.calls["pr_get"] == 0 and state.calls["pr_patch"] == 1
+    assert not fa.pr_index.has(repo_id, TICKET)
+
+
+def test_prapprove_falls_back_to_search_when_the_indexed_pr_is_gone(app, call):
+    fa, state = app
+    repo_id = fa.STATIC_REPO_MAP[REPO]
+    state.add_branch(repo_id, TICKET)
+    call(fa.pr_open, "propen", ticket=TICKET, repo=REPO)
+    with state.lock:
+        # PR ADO'da elle kapatılıp yenisi açılmış
+        old_pr = next(iter(state.repos[repo_id]["prs"].values()))
+        old_pr["status"] = "abandoned"
+        new_pr = dict(old_pr, pullRequestId=old_pr["pullRequestId"] + 1, status="active")
+        state.repos[repo_id]["prs"][new_pr["pullRequestId"]] = new_pr
+
+    status, body = call(fa.pr_approve, "prapprove", ticket=TICKET, repo=REPO)
+
+    assert status == 200 and body["pr_id"] == new_pr["pullRequestId"]
+    assert state.calls["pr_search"] == 1
+    assert fa.pr_index.stats()["stale"] == 1
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+REPO = "CTJira"
+
+
+@pytest.fixture
+def reaper(app, monkeypatch):
+    """CTJira'da merge edilmiş, eski, yeni, açık PR'lı ve ticket dışı branch'ler kurar."""
+    fa, state = app
+    repo_id = fa.STATIC_REPO_MAP[REPO]
+    monkeypatch.setattr(fa, "REAPER_REPOS", [REPO])
+    monkeypatch.setattr(fa, "REAPER_BASE_BRANCHES", ["test"])
+    monkeypatch.setattr(fa, "REAPER_MAX_AGE_DAYS", 90)
+    state.add_branch(repo_id, "CT-1-merged-work", base="test", new_commit=False)
+    state.add_branch(repo_id, "CT-2-old-work", age_days=120)
+    state.add_branch(repo_id, "CT-3-fresh-work", age_days=1)
+    state.add_branch(repo_id, "CT-4-old-with-pr", age_days=120)
+    state.add_branch(repo_id, "feature/not-a-ticket", age_days=120)
+    with state.lock:
+        state.repos[repo_id]["prs"][1] = {"pullRequestId": 1, "status": "active",
+                                         "sourceRefName": "refs/heads/CT-4-old-with-pr",
+                                         "targetRefName": "refs/heads/test"}
+    return fa, state, repo_id
+
+
+def test_dry_run_reports_without_deleting(reaper, call):
+    fa, state, repo_id = reaper
+    status, body = call(fa.reap_branches, "reapBranches")
+
+    report = body["repos"][0]
+    assert status == 200 and body["status"] == "REAPER_DRY_RUN"
+    assert report["reaped"] == {"CT-1-merged-work": "merged", "CT-2-old-work": "stale"}
+    assert report["skipped_open_pr"] == 1 and report["candidates"] == 3
+    assert "refs/heads/CT-2-old-work" in state.repos[repo_id]["refs"]
+    assert state.calls["ref_update"] == 0
+
+
+def test_delete_run_removes_only_reaped_branches(reaper, call):
+    fa, state, repo_id = reaper
+    status, body = call(fa.reap_branches, "reapBranches", repo=REPO, dry_run="0")
+
+    refs = state.repos[repo_id]["refs"]
+    assert status == 200 and body["status"] == "REAPER_RESULT"
+    assert "refs/heads/CT-1-merged-work" not in refs and "refs/heads/CT-2-old-work" not in refs
+    for kept in ("CT-3-fresh-work", "CT-4-old-with-pr", "feature/not-a-ticket", "dev", "test", "main"):
+        assert f"refs/heads/{kept}" in refs
+    assert state.calls["ref_update"] == 1
+
+
+def test_refs_are_read_page_by_page(reaper, call, monkeypatch):
+    fa, state, _ = reaper
+    monkeypatch.setattr(fa, "REAPER_PAGE_SIZE", 3)
+    status, body = call(fa.reap_branches, "reapBranches")
+
+    assert status == 200 and body["repos"][0]["scanned"] == 8
+    assert state.calls["ref_lookup"] == 3
+
+
+def test_rejected_deletes_are_reported(reaper, call):
+    fa, state, repo_id = reaper
+    state.rejected_refs["refs/heads/CT-2-old-work"] = "rejectedByPolicy"
+    status, body = call(fa.reap_branches, "reapBranches", dry_run="0")
+
+    report = body["repos"][0]
+    assert status == 207 and body["success"] is False
+    assert report["reaped"] == {"CT-1-merged-work": "merged"}
+    assert report["failed"] == {"CT-2-old-work": "rejectedByPolicy"}
+    assert "refs/heads/CT-2-old-work" in state.repos[repo_id]["refs"]
+
+
+def test_unmanaged_repo_is_rejected(reaper, call):
+    fa, state, _ = reaper
+    status, body = call(fa.reap_branches, "reapBranches", repo="CustomsOnlineAI")
+    assert status == 400 and body["status"] == "INVALID_REPO"
+    assert sum(state.calls.values()) == 0
+
+
+def test_timer_respects_dry_run_setting(reaper, monkeypatch):
+    fa, state, repo_id = reaper
+    monkeypatch.setattr(fa, "REAPER_DRY_RUN", True)
+    asyncio.run(fa.stale_branch_reaper(None))
+    assert "refs/heads/CT-2-old-work" in state.repos[repo_id]["refs"]
+
+    monkeypatch.setattr(fa, "REAPER_DRY_RUN", False)
+    asyncio.run(fa.stale_branch_reaper(None))
+    assert "refs/heads/CT-2-old-work" not in state.repos[repo_id]["refs"]
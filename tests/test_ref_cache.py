@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from ado import MemoryStateStore, RefCache
+from ado import ref_cache as ref_cache_module
+
+ZERO_SHA = "0" * 40
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ref_cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def fetcher(sha: str):
+    calls = []
+
+    async def fetch(branch):
+        calls.append(branch)
+        return sha
+
+    return fetch, calls
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = RefCache(ttl=10)
+    cache.put("repo", "dev", "a" * 40)
+    clock[0] += 9
+    assert cache.get("repo", "dev") == "a" * 40
+    clock[0] += 2
+    assert cache.get("repo", "dev") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_get_or_fetch_calls_the_api_once_per_ttl(clock):
+    cache = RefCache(ttl=10)
+    fetch, calls = fetcher("b" * 40)
+
+    async def main():
+        first = await cache.get_or_fetch("repo", "dev", fetch)
+        second = await cache.get_or_fetch("repo", "dev", fetch)
+        clock[0] += 11
+        third = await cache.get_or_fetch("repo", "dev", fetch)
+        return first, second, third
+
+    assert asyncio.run(main()) == ("b" * 40,) * 3
+    assert calls == ["dev", "dev"]
+
+
+def test_lru_evicts_least_recently_used_branch():
+    cache = RefCache(max_entries_per_repo=2)
+    cache.put("repo", "dev", "1" * 40)
+    cache.put("repo", "test", "2" * 40)
+    cache.get("repo", "dev")
+    cache.put("repo", "main", "3" * 40)
+    assert cache.get("repo", "test") is None
+    assert cache.get("repo", "dev") == "1" * 40 and cache.get("repo", "main") == "3" * 40
+    assert cache.stats()["evictions"] == 1
+
+
+def test_repos_are_limited_separately():
+    cache = RefCache(max_entries_per_repo=1)
+    cache.put("repo-1", "dev", "1" * 40)
+    cache.put("repo-2", "dev", "2" * 40)
+    assert cache.get("repo-1", "dev") == "1" * 40 and cache.get("repo-2", "dev") == "2" * 40
+
+
+def test_apply_updates_writes_through_cached_branches_only():
+    cache = RefCache()
+    cache.put("repo", "dev", "1" * 40)
+    cache.put("repo", "CT-1-old-work", "2" * 40)
+    cache.apply_updates("repo", [
+        {"name": "refs/heads/dev", "oldObjectId": "1" * 40, "newObjectId": "3" * 40},
+        {"name": "refs/heads/CT-1-old-work", "oldObjectId": "2" * 40, "newObjectId": ZERO_SHA},
+        {"name": "refs/heads/CT-2-new-work", "oldObjectId": ZERO_SHA, "newObjectId": "4" * 40},
+    ])
+    assert cache.get("repo", "dev") == "3" * 40
+    assert cache.get("repo", "CT-1-old-work") is None
+    # Cache'te olmayan branch eklenmez; cache sadece okunmuş branch'leri tutar
+    assert cache.get("repo", "CT-2-new-work") is None
+
+
+def test_invalidate_branch_and_repo():
+    cache = RefCache()
+    cache.put("repo", "dev", "1" * 40)
+    cache.put("repo", "test", "2" * 40)
+    cache.invalidate("repo", "dev")
+    assert cache.get("repo", "dev") is None and cache.get("repo", "test") == "2" * 40
+    cache.invalidate("repo")
+    assert cache.get("repo", "test") is None
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_shared_store_serves_other_workers():
+    store = MemoryStateStore()
+    writer, reader = RefCache(store=store), RefCache(store=store)
+    writer.put("repo", "dev", "1" * 40)
+    assert reader.get("repo", "dev") == "1" * 40
+    assert reader.stats()["shared_hits"] == 1
+    writer.apply_updates("repo", [{"name": "refs/heads/dev", "newObjectId": "2" * 40}])
+    # Okuyanın bellek kopyası TTL boyunca kalır, yeni worker paylaşılan kayıttan okur
+    assert RefCache(store=store).get("repo", "dev") == "2" * 40
+
+
+def test_fetched_sha_does_not_overwrite_a_newer_shared_write():
+    store = MemoryStateStore()
+    cache, other = RefCache(store=store), RefCache(store=store)
+
+    async def slow_fetch(branch):
+        # API okuması sürerken başka worker ref'i günceller
+        other.put("repo", branch, "2" * 40)
+        return "1" * 40
+
+    assert asyncio.run(cache.get_or_fetch("repo", "dev", slow_fetch)) == "1" * 40
+    assert RefCache(store=store).get("repo", "dev") == "2" * 40
+
+
+def test_new_branch_reads_dev_once_and_follows_devmerge_writes(app, call):
+    fa, state = app
+    repo_id = fa.STATIC_REPO_MAP["CTJira"]
+
+    assert call(fa.new_branch, "newBranch", ticket="CT-1-first-work", repo="CTJira")[0] == 200
+    assert call(fa.new_branch, "newBranch", ticket="CT-2-second-work", repo="CTJira")[0] == 200
+    assert state.calls["ref_lookup"] == 1
+
+    # DevMerge'in dev ref update'i cache'e yazılır; sonraki branch yeni dev'den açılır
+    state.add_branch(repo_id, "CT-3-merged-work")
+    assert call(fa.dev_merge, "devmerge", ticket="CT-3-merged-work", repo="CTJira")[0] == 200
+    new_dev = state.repos[repo_id]["refs"]["refs/heads/dev"]
+    state.calls.clear()
+    status, body = call(fa.new_branch, "newBranch", ticket="CT-4-after-merge", repo="CTJira")
+    assert status == 200 and state.repos[repo_id]["refs"]["refs/heads/CT-4-after-merge"] == new_dev
+    assert state.calls["ref_lookup"] == 0
@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+from ado import RepoRegistry
+
+FALLBACK = {"CTJira": "repo-1"}
+
+
+def counting_fetch(repos: dict = None, error: Exception = None, delay: float = 0.0):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return dict(repos)
+
+    return fetch, calls
+
+
+def test_fallback_is_used_until_refreshed(tmp_path):
+    fetch, calls = counting_fetch({"CTJira": "repo-1", "NewRepo": "repo-2"})
+    registry = RepoRegistry(FALLBACK, fetch=fetch, persist_path=str(tmp_path / "repos.json"))
+    assert dict(registry) == FALLBACK and registry.source == "fallback"
+
+    asyncio.run(registry.refresh())
+    assert registry["NewRepo"] == "repo-2" and registry.source == "ado"
+    assert len(calls) == 1
+
+
+def test_refreshed_map_is_persisted_for_the_next_cold_start(tmp_path):
+    path = str(tmp_path / "repos.json")
+    fetch, _ = counting_fetch({"NewRepo": "repo-2"})
+    asyncio.run(RepoRegistry(FALLBACK, fetch=fetch, persist_path=path).refresh())
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["repos"] == {"NewRepo": "repo-2"}
+
+    fetch, calls = counting_fetch({})
+    restarted = RepoRegistry(FALLBACK, fetch=fetch, persist_path=path)
+    # Dosya ağ beklemeden okunur; fallback repoları da korunur
+    assert restarted.source == "file" and restarted["NewRepo"] == "repo-2" and "CTJira" in restarted
+    assert calls == []
+
+
+def test_corrupt_persisted_file_falls_back(tmp_path):
+    path = tmp_path / "repos.json"
+    path.write_text("{not json", encoding="utf-8")
+    registry = RepoRegistry(FALLBACK, persist_path=str(path))
+    assert dict(registry) == FALLBACK and registry.source == "fallback"
+
+
+def test_unknown_names_share_one_refresh():
+    fetch, calls = counting_fetch({"NewRepo": "repo-2"}, delay=0.01)
+    registry = RepoRegistry(FALLBACK, fetch=fetch, miss_refresh_interval=60)
+
+    async def main():
+        first = await asyncio.gather(registry.resolve("NewRepo"), registry.resolve("Missing"), registry.resolve("Missing"))
+        # Aralık dolmadan gelen yeni bir miss tekrar yenileme yapmaz
+        second = await registry.resolve("StillMissing")
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == ["repo-2", None, None] and second is None
+    assert len(calls) == 1
+
+
+def test_known_name_resolves_without_fetch():
+    fetch, calls = counting_fetch({})
+    registry = RepoRegistry(FALLBACK, fetch=fetch, ttl=float("inf"))
+    assert asyncio.run(registry.resolve("CTJira")) == "repo-1"
+    assert calls == []
+
+
+def test_stale_map_refreshes_in_background():
+    fetch, calls = counting_fetch({"NewRepo": "repo-2"})
+    registry = RepoRegistry(FALLBACK, fetch=fetch, ttl=0)
+
+    async def main():
+        # Okuma beklemez; yenileme arka planda başlar
+        assert registry["CTJira"] == "repo-1"
+        await registry._refresh_task
+
+    asyncio.run(main())
+    assert "NewRepo" in registry and len(calls) == 1
+
+
+def test_failed_refresh_keeps_known_repos():
+    fetch, _ = counting_fetch(error=RuntimeError("ADO down"))
+    registry = RepoRegistry(FALLBACK, fetch=fetch)
+    asyncio.run(registry.refresh())
+    assert dict(registry) == FALLBACK
+    assert registry.stats()["refresh_errors"] == 1
+
+
+def test_registry_reads_repositories_from_ado(app):
+    fa, state = app
+    state.add_repo("BrandNewRepo", "repo-new")
+    registry = RepoRegistry(fa.STATIC_REPO_MAP, fetch=fa._fetch_repo_map)
+    assert asyncio.run(registry.resolve("BrandNewRepo")) == "repo-new"
+    assert state.calls["repo_list"] == 1
+
+
+def test_all_targets_only_managed_repos(app, call, monkeypatch):
+    fa, state = app
+    state.add_repo("UnmanagedRepo", "repo-unmanaged")
+    monkeypatch.setattr(fa, "REPO_MAP", RepoRegistry(fa.STATIC_REPO_MAP, fetch=fa._fetch_repo_map))
+    monkeypatch.setattr(fa, "MANAGED_REPOS", ["CTJira", "CustomsOnlineAI"])
+
+    status, body = call(fa.new_branch, "newBranch", ticket="CT-1-all-repos", repo="all")
+
+    assert status == 200 and set(body["results"]) == {"CTJira", "CustomsOnlineAI"}
+    assert "refs/heads/CT-1-all-repos" not in state.repos["repo-unmanaged"]["refs"]
@@ -0,0 +1,171 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from ado import PrIndex, RefCache, service_hooks
+
+REPOS = {"CTJira": "repo-1"}
+OLD, NEW, OTHER = "1" * 40, "2" * 40, "3" * 40
+ZERO_SHA = "0" * 40
+
+
+def created(seconds_ago: float = 0.0) -> str:
+    return datetime.fromtimestamp(time.time() - seconds_ago, timezone.utc).isoformat()
+
+
+def push(*ref_updates, seconds_ago: float = 0.0, repo: str = "CTJira") -> dict:
+    return {
+        "eventType": "git.push",
+        "createdDate": created(seconds_ago),
+        "resource": {
+            "refUpdates": [{"name": f"refs/heads/{b}", "oldObjectId": o, "newObjectId": n} for b, o, n in ref_updates],
+            "repository": {"name": repo},
+        },
+    }
+
+
+def pr_event(status: str, pr_id: int = 7, commit: str = NEW, target: str = "test", seconds_ago: float = 0.0) -> dict:
+    return {
+        "eventType": "git.pullrequest.updated",
+        "createdDate": created(seconds_ago),
+        "resource": {
+            "pullRequestId": pr_id,
+            "status": status,
+            "sourceRefName": "refs/heads/CT-1-hook-work",
+            "targetRefName": f"refs/heads/{target}",
+            "lastMergeSourceCommit": {"commitId": commit},
+            "repository": {"name": "CTJira"},
+        },
+    }
+
+
+@pytest.fixture
+def caches():
+    return RefCache(ttl=10), PrIndex()
+
+
+def apply(event, caches, max_age: float = 60.0):
+    ref_cache, pr_index = caches
+    return service_hooks.apply_event(event, REPOS, ref_cache, pr_index, max_age=max_age)
+
+
+def test_push_writes_tracked_and_cached_branches(caches):
+    ref_cache, _ = caches
+    ref_cache.put("repo-1", "CT-1-cached", OLD)
+    result = apply(push(("dev", OLD, NEW), ("CT-1-cached", OLD, NEW), ("CT-2-unknown", OLD, NEW)), caches)
+
+    assert result["applied"] == 2
+    assert ref_cache.get("repo-1", "dev") == NEW and ref_cache.get("repo-1", "CT-1-cached") == NEW
+    # Takip edilmeyen ve cache'te olmayan branch yazılmaz
+    assert ref_cache.get("repo-1", "CT-2-unknown") is None
+
+
+def test_push_entries_expire_within_the_staleness_bound(caches, monkeypatch):
+    ref_cache, _ = caches
+    apply(push(("dev", OLD, NEW), seconds_ago=55), caches, max_age=60)
+    assert ref_cache.get("repo-1", "dev") == NEW
+
+    now = time.monotonic()
+    monkeypatch.setattr("ado.ref_cache.time.monotonic", lambda: now + 6)
+    assert ref_cache.get("repo-1", "dev") is None
+
+
+def test_stale_or_undated_push_only_invalidates(caches):
+    ref_cache, _ = caches
+    ref_cache.put("repo-1", "dev", OLD)
+    assert apply(push(("dev", OLD, NEW), seconds_ago=120), caches, max_age=60)["applied"] == 1
+    assert ref_cache.get("repo-1", "dev") is None
+
+    undated = push(("dev", OLD, NEW))
+    del undated["createdDate"]
+    apply(undated, caches)
+    assert ref_cache.get("repo-1", "dev") is None
+
+
+def test_out_of_order_push_drops_the_entry(caches):
+    ref_cache, _ = caches
+    apply(push(("dev", NEW, OTHER)), caches)
+    # Daha önceki push (OLD -> NEW) sonradan gelir: cache'teki OTHER ikisi de değil
+    apply(push(("dev", OLD, NEW), seconds_ago=1), caches)
+    assert ref_cache.get("repo-1", "dev") is None
+
+
+def test_deleted_branch_is_dropped(caches):
+    ref_cache, _ = caches
+    ref_cache.put("repo-1", "CT-1-cached", OLD)
+    apply(push(("CT-1-cached", OLD, ZERO_SHA)), caches)
+    assert ref_cache.get("repo-1", "CT-1-cached") is None
+
+
+def test_active_pr_is_indexed_for_a_bounded_time(caches):
+    _, pr_index = caches
+    result = apply(pr_event("active", seconds_ago=59.95), caches, max_age=60)
+    assert result["applied"] == 1
+    assert pr_index.get("repo-1", "CT-1-hook-work") == {"pr_id": 7, "source_commit": NEW}
+    time.sleep(0.1)
+    assert pr_index.get("repo-1", "CT-1-hook-work") is None
+
+
+def test_repeated_active_event_does_not_shorten_an_api_entry(caches):
+    _, pr_index = caches
+    pr_index.put("repo-1", "CT-1-hook-work", 7, NEW)
+    assert apply(pr_event("active", seconds_ago=59.95), caches)["applied"] == 0
+    time.sleep(0.1)
+    assert pr_index.get("repo-1", "CT-1-hook-work") is not None
+
+
+def test_stale_active_event_drops_a_different_entry(caches):
+    _, pr_index = caches
+    pr_index.put("repo-1", "CT-1-hook-work", 6, OLD)
+    apply(pr_event("active", seconds_ago=120), caches, max_age=60)
+    assert pr_index.get("repo-1", "CT-1-hook-work") is None
+
+
+def test_completed_pr_is_removed_and_test_head_dropped(caches):
+    ref_cache, pr_index = caches
+    pr_index.put("repo-1", "CT-1-hook-work", 7, NEW)
+    ref_cache.put("repo-1", "test", OLD)
+    assert apply(pr_event("completed"), caches)["applied"] == 1
+    assert pr_index.get("repo-1", "CT-1-hook-work") is None
+    assert ref_cache.get("repo-1", "test") is None
+
+
+def test_ignored_events(caches):
+    assert apply({"eventType": "build.complete", "resource": {}}, caches)["ignored"] == "unsupported event"
+    assert apply(push(("dev", OLD, NEW), repo="Elsewhere"), caches)["ignored"] == "unknown repository"
+    assert apply(pr_event("active", target="main"), caches)["ignored"] == "target is not 'test'"
+
+
+def test_malformed_payloads_raise(caches):
+    with pytest.raises(ValueError):
+        apply({"eventType": "git.push"}, caches)
+    with pytest.raises(ValueError):
+        apply({"eventType": "git.push", "resource": {"repository": {"name": "CTJira"}, "refUpdates": [{}]}}, caches)
+    with pytest.raises(ValueError):
+        apply({"eventType": "git.pullrequest.created", "resource": {"repository": {"name": "CTJira"}}}, caches)
+
+
+def test_hook_route_requires_the_secret(app, call, monkeypatch):
+    fa, _ = app
+    monkeypatch.setattr(fa, "SERVICE_HOOK_SECRET", None)
+    assert call(fa.ado_service_hook, "adohook", method="POST", body=push(("dev", OLD, NEW)))[0] == 503
+    monkeypatch.setattr(fa, "SERVICE_HOOK_SECRET", "s3cret")
+    assert call(fa.ado_service_hook, "adohook", method="POST", body=push(("dev", OLD, NEW)),
+                headers={"X-Hook-Secret": "wrong"})[0] == 401
+
+
+def test_pushed_dev_head_saves_the_ref_read(app, call, monkeypatch):
+    fa, state = app
+    repo_id = fa.STATIC_REPO_MAP["CTJira"]
+    monkeypatch.setattr(fa, "SERVICE_HOOK_SECRET", "s3cret")
+    old_dev = state.repos[repo_id]["refs"]["refs/heads/dev"]
+    new_dev = state.add_branch(repo_id, "dev", base="dev")
+
+    status, body = call(fa.ado_service_hook, "adohook", method="POST", body=push(("dev", old_dev, new_dev)),
+                        headers={"X-Hook-Secret": "s3cret"})
+    assert status == 200 and body["status"] == "HOOK_APPLIED"
+
+    status, _ = call(fa.new_branch, "newBranch", ticket="CT-1-from-hook", repo="CTJira")
+    assert status == 200 and state.calls["ref_lookup"] == 0
+    assert state.repos[repo_id]["refs"]["refs/heads/CT-1-from-hook"] == new_dev
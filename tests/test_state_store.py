@@ -0,0 +1,119 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from ado import MemoryStateStore, SqliteStateStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStateStore()
+    return SqliteStateStore(str(tmp_path / "state.sqlite"))
+
+
+def test_put_get_delete(store):
+    version = store.put("ns", "k", {"sha": "a"})
+    entry = store.get("ns", "k")
+    assert entry.value == {"sha": "a"} and entry.version == version
+    assert store.get("other", "k") is None
+    assert store.delete("ns", "k") is True
+    assert store.get("ns", "k") is None
+
+
+def test_compare_and_set(store):
+    assert store.put("ns", "k", 1, version=0) is not None
+    # Kayıt varken "yoksa yaz" tutmaz
+    assert store.put("ns", "k", 2, version=0) is None
+    current = store.get("ns", "k")
+    assert store.put("ns", "k", 3, version=current.version + 1) is None
+    assert store.put("ns", "k", 3, version=current.version) is not None
+    assert store.get("ns", "k").value == 3
+    assert store.delete("ns", "k", version=current.version) is False
+    assert store.stats()["conflicts"] == 3
+
+
+def test_expired_entries_are_ignored(store):
+    store.put("ns", "k", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert store.get("ns", "k") is None
+    # Süresi dolmuş kaydın üzerine "yoksa yaz" ile yazılabilir
+    assert store.put("ns", "k", 2, version=0) is not None
+
+
+def test_clear_namespace(store):
+    store.put("a", "1", 1)
+    store.put("b", "1", 1)
+    store.clear("a")
+    assert store.get("a", "1") is None and store.get("b", "1") is not None
+
+
+def test_lock_is_exclusive_until_released(store):
+    async def main():
+        async with store.lock("locks", "dev", lease=5, timeout=1) as first:
+            async with store.lock("locks", "dev", lease=5, timeout=0.02, poll=0.005) as second:
+                held_while_locked = (first, second)
+        async with store.lock("locks", "dev", lease=5, timeout=0.02) as third:
+            return held_while_locked, third
+
+    assert asyncio.run(main()) == ((True, False), True)
+    assert store.stats()["lock_timeouts"] == 1
+
+
+def test_lock_expires_after_lease(store):
+    async def main():
+        async with store.lock("locks", "dev", lease=0.01) as first:
+            await asyncio.sleep(0.02)
+            async with store.lock("locks", "dev", lease=5, timeout=0.05) as second:
+                return first, second
+
+    assert asyncio.run(main()) == (True, True)
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryStateStore(max_entries=2)
+    store.put("ns", "a", 1)
+    store.put("ns", "b", 2)
+    store.get("ns", "a")
+    store.put("ns", "c", 3)
+    assert store.get("ns", "b") is None
+    assert store.get("ns", "a").value == 1
+
+
+def test_memory_store_never_evicts_held_locks():
+    store = MemoryStateStore(max_entries=2)
+
+    async def main():
+        async with store.lock("locks", "dev", lease=5) as first:
+            for i in range(10):
+                store.put("cache", str(i), i)
+            async with store.lock("locks", "dev", timeout=0.02, poll=0.005) as second:
+                return first, second
+
+    assert asyncio.run(main()) == (True, False)
+
+
+def test_sqlite_store_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / "state.sqlite")
+    first, second = SqliteStateStore(path), SqliteStateStore(path)
+    version = first.put("ns", "k", {"pr_id": 1})
+    assert second.get("ns", "k").value == {"pr_id": 1}
+    assert second.put("ns", "k", {"pr_id": 2}, version=version) is not None
+    assert first.put("ns", "k", {"pr_id": 3}, version=version) is None
+
+
+def test_sqlite_locked_database_degrades_instead_of_raising(tmp_path):
+    path = str(tmp_path / "state.sqlite")
+    store = SqliteStateStore(path, busy_timeout=0.01)
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.monotonic()
+        assert store.put("ns", "k", 1) is None
+        assert time.monotonic() - started < 1
+        assert store.stats()["errors"] == 1
+    finally:
+        blocker.execute("ROLLBACK")
+    assert store.put("ns", "k", 1) is not None
@@ -0,0 +1,112 @@
+import asyncio
+import email.utils
+import time
+import urllib.error
+
+import pytest
+
+from ado import AdoClient, TokenBucket
+from ado.throttle import backoff_delay, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    http_date = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 <= parse_retry_after(http_date) <= 30
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    delays = [backoff_delay(attempt, base=0.5, cap=2.0) for attempt in range(6) for _ in range(50)]
+    assert all(0 <= d <= 2.0 for d in delays)
+    assert len(set(delays)) > 1
+    # Retry-After jitter'lı süreden uzunsa ona uyulur
+    assert backoff_delay(0, base=0.5, cap=2.0, retry_after=5) == 5
+
+
+def test_bucket_allows_burst_then_waits_for_tokens():
+    bucket = TokenBucket(rate=50, burst=2)
+
+    async def main():
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) >= 0.015
+    assert bucket.stats()["waits"] == 1
+
+
+def test_bucket_pauses_for_retry_after_on_429():
+    bucket = TokenBucket(rate=1000, burst=10)
+    bucket.observe(429, {"Retry-After": "0.05"})
+
+    async def main():
+        started = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) >= 0.04
+    assert bucket.stats()["throttled"] == 1
+
+
+def test_bucket_slows_to_remaining_quota_and_recovers():
+    bucket = TokenBucket(rate=20, burst=20, min_rate=1)
+    bucket.observe(200, {"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": str(time.time() + 10)})
+    assert bucket.rate == 1
+    for _ in range(40):
+        bucket.observe(200, {})
+    assert bucket.rate == 20
+
+
+def test_client_retries_idempotent_requests_after_429(fake_ado):
+    state, base = fake_ado
+    state.inject(429, "/refs", method="GET", count=2, retry_after=0)
+    client = AdoClient(backoff_base=0.001)
+    url = f"{base}/_apis/git/repositories/repo-1/refs?filter=heads/dev"
+
+    async def main():
+        try:
+            return await client.request(url)
+        finally:
+            await client.close()
+
+    assert asyncio.run(main())["value"][0]["name"] == "refs/heads/dev"
+    assert client.stats()["retries"] == 2 and state.calls["ref_lookup"] == 3
+
+
+def test_client_does_not_retry_non_idempotent_posts(fake_ado):
+    state, base = fake_ado
+    state.inject(429, "/pullrequests", method="POST", retry_after=0)
+    client = AdoClient(backoff_base=0.001)
+    url = f"{base}/_apis/git/repositories/repo-1/pullrequests"
+
+    async def main():
+        try:
+            await client.request(url, method="POST", payload={"sourceRefName": "refs/heads/dev", "targetRefName": "refs/heads/test"})
+        finally:
+            await client.close()
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        asyncio.run(main())
+    assert error.value.code == 429 and state.calls["pr_create"] == 1
+
+
+def test_client_gives_up_after_max_retries(fake_ado):
+    state, base = fake_ado
+    state.inject(503, "/refs", method="GET", count=5, retry_after=0)
+    client = AdoClient(max_retries=2, backoff_base=0.001)
+    url = f"{base}/_apis/git/repositories/repo-1/refs?filter=heads/dev"
+
+    async def main():
+        try:
+            await client.request(url)
+        finally:
+            await client.close()
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        asyncio.run(main())
+    assert error.value.code == 503
+    assert client.stats()["retry_exhausted"] == 1 and state.calls["ref_lookup"] == 3
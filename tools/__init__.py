@@ -0,0 +1 @@
+"""Local geliştirme araçları: Azure DevOps emülatörü ve benchmark."""
@@ -0,0 +1,140 @@
+"""
+function_app.py endpoint'leri için offline benchmark.
+
+Emülatörü (tools/fake_ado.py) aynı process içinde başlatır, handler'ları
+doğrudan çağırarak verilen concurrency ile yük üretir ve endpoint başına
+throughput, p50/p95/p99 gecikme ve ADO'ya giden çağrı sayılarını raporlar.
+
+Kullanım:
+    python -m tools.bench --requests 200 --concurrency 20 --latency-ms 40
+    python -m tools.bench --endpoints newBranch,devmerge --json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+ENDPOINTS = ["newBranch", "devmerge", "propen", "prapprove", "deleteBranch"]
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _drive(handler, route: str, params_list: list, concurrency: int):
+    """Handler'ı verilen parametrelerle concurrency sınırı altında çağırır; (süre, gecikmeler, status'lar) döndürür."""
+    import azure.functions as func
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+
+    async def _one(params):
+        async with semaphore:
+            req = func.HttpRequest(method="GET", url=f"/api/{route}", params=params, body=b"")
+            started = time.perf_counter()
+            resp = await handler(req)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_one(params) for params in params_list))
+    return time.perf_counter() - started, latencies, statuses
+
+
+async def run_benchmark(args) -> dict:
+    from tools.fake_ado import FakeAdoState, serve
+
+    import function_app as app_module
+
+    state = FakeAdoState(app_module.REPO_MAP)
+    server = serve(state)
+    # Handler'lar URL'i çağrı anında modül seviyesindeki AZURE_DEVOPS_URL'den okur
+    app_module.AZURE_DEVOPS_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    state.latency = args.latency_ms / 1000
+    state.jitter = args.jitter_ms / 1000
+
+    repo_name = args.repo
+    repo_id = app_module.REPO_MAP[repo_name]
+    n = args.requests
+    run_id = int(time.time())
+
+    # Her endpoint için ayrı ticket kümesi; idempotency cache'ine takılmasın diye hepsi benzersiz
+    new_tickets = [f"CT-{run_id}{i}-bench-new" for i in range(n)]
+    merge_tickets = [f"CT-{run_id}{i}-bench-merge" for i in range(n)]
+    for ticket in merge_tickets:
+        state.add_branch(repo_id, ticket)
+
+    handlers = {
+        "newBranch": (app_module.new_branch, [{"ticket": t, "repo": repo_name} for t in new_tickets]),
+        "devmerge": (app_module.dev_merge, [{"ticket": t, "repo": repo_name} for t in merge_tickets]),
+        "propen": (app_module.pr_open, [{"ticket": t, "repo": repo_name} for t in merge_tickets]),
+        "prapprove": (app_module.pr_approve, [{"ticket": t, "repo": repo_name} for t in merge_tickets]),
+        "deleteBranch": (app_module.delete_branch, [{"ticket": t, "repo": repo_name} for t in new_tickets]),
+    }
+
+    report = {"config": {"requests": n, "concurrency": args.concurrency, "latency_ms": args.latency_ms,
+                         "jitter_ms": args.jitter_ms, "repo": repo_name}, "endpoints": {}}
+    selected = [e for e in ENDPOINTS if e in args.endpoints]
+    for endpoint in selected:
+        handler, params_list = handlers[endpoint]
+        with state.lock:
+            state.calls.clear()
+        elapsed, latencies, statuses = await _drive(handler, endpoint, params_list, args.concurrency)
+        with state.lock:
+            calls = dict(state.calls)
+        report["endpoints"][endpoint] = {
+            "requests": len(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+            "p99_ms": round(percentile(latencies, 99), 1),
+            "status_codes": statuses,
+            "ado_calls": calls,
+            "ado_calls_per_request": round(sum(calls.values()) / len(latencies), 2) if latencies else 0.0,
+        }
+
+    await app_module.ado.close()
+    server.shutdown()
+    return report
+
+
+def print_report(report: dict) -> None:
+    cfg = report["config"]
+    print(f"requests/endpoint={cfg['requests']} concurrency={cfg['concurrency']} "
+          f"ado_latency={cfg['latency_ms']}ms (+{cfg['jitter_ms']}ms jitter) repo={cfg['repo']}")
+    print(f"{'endpoint':<14}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'calls/req':>11}  status / ado calls")
+    for endpoint, r in report["endpoints"].items():
+        print(f"{endpoint:<14}{r['throughput_rps']:>8}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}"
+              f"{r['ado_calls_per_request']:>11}  {r['status_codes']} {r['ado_calls']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark for function_app endpoints")
+    parser.add_argument("--requests", type=int, default=100, help="Endpoint başına istek sayısı")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=30, help="Emülatörün her ADO çağrısına eklediği gecikme")
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--repo", default="CTJira")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), type=lambda v: v.split(","))
+    parser.add_argument("--json", action="store_true", help="Raporu JSON olarak yaz")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AZURE_PAT", "offline-benchmark")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    report = asyncio.run(run_benchmark(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
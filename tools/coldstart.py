@@ -0,0 +1,142 @@
+"""
+function_app.py için cold-start benchmark'ı.
+
+Emülatörü (tools/fake_ado.py) bu process'te başlatır ve her koşu için yeni bir
+Python process'i açar. Child process function_app'i import eder ve ilk isteği
+emülatöre karşı çalıştırır. Her koşuda şu süreler ölçülür:
+- spawn:          process başlatılmasından import başlangıcına kadar geçen süre
+- import:         function_app import süresi (modül seviyesindeki init dahil)
+- warmup:         --warmup verilirse WarmUp fonksiyonunun süresi
+- first_response: ilk isteğin süresi
+- total:          process başlatılmasından ilk cevaba kadar geçen süre
+
+Kullanım:
+    python -m tools.coldstart --runs 10 --endpoint devmerge --latency-ms 40
+    python -m tools.coldstart --runs 10 --endpoint devmerge --latency-ms 40 --warmup
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = ["healthcheck", "newBranch", "devmerge"]
+
+
+def _child(args) -> None:
+    """Tek bir cold start: import + (opsiyonel warm-up) + ilk istek; ölçümleri JSON olarak yazar."""
+    import asyncio
+
+    import_started = time.time()
+    import function_app as app_module
+    import azure.functions as func
+    imported = time.time()
+
+    async def _run():
+        timings = {}
+        if args.warmup:
+            started = time.perf_counter()
+            await app_module._warm_up()
+            timings["warmup_ms"] = (time.perf_counter() - started) * 1000
+
+        handler = {"healthcheck": app_module.healthcheck, "newBranch": app_module.new_branch,
+                   "devmerge": app_module.dev_merge}[args.endpoint]
+        req = func.HttpRequest(method="GET", url=f"/api/{args.endpoint}",
+                               params={"ticket": args.ticket, "repo": args.repo}, body=b"")
+        started = time.perf_counter()
+        resp = handler(req)
+        if asyncio.iscoroutine(resp):
+            resp = await resp
+        timings["first_response_ms"] = (time.perf_counter() - started) * 1000
+        timings["status"] = resp.status_code
+        await app_module.ado.close()
+        return timings
+
+    timings = asyncio.run(_run())
+    timings.update({
+        "spawn_ms": (import_started - args.spawned_at) * 1000,
+        "import_ms": (imported - import_started) * 1000,
+        "total_ms": (time.time() - args.spawned_at) * 1000,
+    })
+    print(json.dumps(timings))
+
+
+def _summary(values: list) -> dict:
+    ordered = sorted(values)
+    return {
+        "p50": round(statistics.median(ordered), 1),
+        "p95": round(ordered[min(len(ordered) - 1, round(0.95 * len(ordered)) - 1)], 1),
+        "max": round(ordered[-1], 1),
+    }
+
+
+def run_coldstart(args) -> dict:
+    from tools.fake_ado import FakeAdoState, serve
+
+    sys.path.insert(0, REPO_ROOT)
+    os.environ.setdefault("AZURE_PAT", "offline-benchmark")
+    from function_app import REPO_MAP
+
+    state = FakeAdoState(REPO_MAP)
+    server = serve(state)
+    state.latency = args.latency_ms / 1000
+    env = dict(os.environ, AZURE_DEVOPS_URL=f"http://127.0.0.1:{server.server_address[1]}",
+               WARMUP_ON_STARTUP="false")
+
+    runs = []
+    run_id = int(time.time())
+    for i in range(args.runs):
+        ticket = f"CT-{run_id}{i}-coldstart-run"
+        if args.endpoint == "devmerge":
+            state.add_branch(REPO_MAP[args.repo], ticket)
+        cmd = [sys.executable, "-m", "tools.coldstart", "--child", "--endpoint", args.endpoint,
+               "--repo", args.repo, "--ticket", ticket, "--spawned-at", repr(time.time())]
+        if args.warmup:
+            cmd.append("--warmup")
+        out = subprocess.run(cmd, cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+
+    server.shutdown()
+    keys = ["spawn_ms", "import_ms", "warmup_ms", "first_response_ms", "total_ms"]
+    return {
+        "config": {"runs": args.runs, "endpoint": args.endpoint, "warmup": args.warmup,
+                   "latency_ms": args.latency_ms, "repo": args.repo},
+        "statuses": sorted({r["status"] for r in runs}),
+        "timings": {key: _summary([r[key] for r in runs]) for key in keys if key in runs[0]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for function_app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="devmerge")
+    parser.add_argument("--repo", default="CTJira")
+    parser.add_argument("--latency-ms", type=float, default=30, help="Emülatörün her ADO çağrısına eklediği gecikme")
+    parser.add_argument("--warmup", action="store_true", help="İlk istekten önce WarmUp'ı çalıştır")
+    parser.add_argument("--json", action="store_true", help="Raporu JSON olarak yaz")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--ticket", help=argparse.SUPPRESS)
+    parser.add_argument("--spawned-at", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args)
+        return
+
+    report = run_coldstart(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    cfg = report["config"]
+    print(f"runs={cfg['runs']} endpoint={cfg['endpoint']} warmup={cfg['warmup']} "
+          f"ado_latency={cfg['latency_ms']}ms statuses={report['statuses']}")
+    print(f"{'phase':<20}{'p50':>9}{'p95':>9}{'max':>9}")
+    for key, summary in report["timings"].items():
+        print(f"{key:<20}{summary['p50']:>9}{summary['p95']:>9}{summary['max']:>9}")
+
+
+if __name__ == "__main__":
+    main()
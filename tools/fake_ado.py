@@ -0,0 +1,501 @@
+"""
+Offline Azure DevOps emülatörü.
+
+function_app.py'nin kullandığı repositories, refs, merges ve pullrequests uç noktalarını
+bellekte tutulan bir ref/PR deposu ile taklit eder. Gecikme ve hata
+(409/404/429/5xx, yavaş cevap) enjeksiyonu yapılabilir; her çağrı sayılır.
+
+Kullanım:
+    python -m tools.fake_ado --port 8099 --latency-ms 40 --inject 429:/refs:3
+    AZURE_DEVOPS_URL=http://127.0.0.1:8099 func start
+
+Kontrol uç noktaları:
+    GET  /_fake/stats            -> işlem bazında çağrı sayıları
+    POST /_fake/reset-stats      -> sayaçları sıfırlar
+    POST /_fake/faults           -> {"status": 429, "path": "/refs", "method": "POST", "count": 2, "retry_after": 1}
+                                    ("delay": 15 -> cevap hatadan önce 15 sn bekletilir; timeout/kesinti simülasyonu)
+    POST /_fake/branches         -> {"repo_id": "...", "branch": "CT-1-x-y", "base": "dev", "age_days": 0}
+    POST /_fake/repos            -> {"name": "NewRepo"} (repositories listesine yeni repo ekler)
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ZERO_SHA = "0" * 40
+
+_REPOS_PATH = re.compile(r"^/(?P<org>[^/]+)/(?P<project>[^/]+)/_apis/git/repositories/?$")
+_REPO_PATH = re.compile(r"^/(?P<org>[^/]+)/(?P<project>[^/]+)/_apis/git/repositories/(?P<repo>[^/]+)(?P<rest>/.*)?$")
+_REF_NAME = re.compile(r"^refs/(?!.*\.\.)[^\s~^:?*\[\\]+$")
+
+
+def _new_sha(*seed) -> str:
+    return hashlib.sha1("|".join(map(str, seed)).encode()).hexdigest()
+
+
+class FakeAdoState:
+    """Repo başına ref, commit ve PR durumunu tutan thread-safe depo."""
+
+    def __init__(self, repos: dict, branches=("main", "dev", "test")):
+        self.lock = threading.RLock()
+        self.repos = {}
+        self.calls = Counter()
+        self.faults = []
+        # ref ismi -> ref update'lerinde döndürülecek GitRefUpdateStatus (ör. "rejectedByPolicy", "locked")
+        self.rejected_refs = {}
+        self.latency = 0.0
+        self.jitter = 0.0
+        self.commit_dates = {}
+        self._pr_ids = itertools.count(1000)
+        self._commit_seq = itertools.count(1)
+        self.branches = branches
+        for name, repo_id in repos.items():
+            self.add_repo(name, repo_id)
+
+    # --- Yardımcılar ---
+    def add_repo(self, name: str, repo_id: str = None) -> str:
+        """Varsayılan branch'leri aynı root commit'i gösteren yeni bir repo ekler."""
+        repo_id = repo_id or str(uuid.uuid5(uuid.NAMESPACE_URL, name))
+        root = _new_sha(repo_id, "root")
+        with self.lock:
+            self.commit_dates.setdefault(root, time.time())
+            self.repos[repo_id] = {
+                "name": name,
+                "refs": {f"refs/heads/{b}": root for b in self.branches},
+                "parents": {root: []},
+                "conflicts": set(),
+                "prs": {},
+            }
+        return repo_id
+
+    def commit(self, repo_id: str, parents: list, committed_at: float = None) -> str:
+        sha = _new_sha(repo_id, next(self._commit_seq), *parents)
+        self.repos[repo_id]["parents"][sha] = list(parents)
+        self.commit_dates[sha] = committed_at if committed_at is not None else time.time()
+        return sha
+
+    def ancestors(self, repo_id: str, sha: str) -> set:
+        """sha ve ondan ulaşılabilen tüm commit'ler."""
+        parents = self.repos[repo_id]["parents"]
+        seen, stack = set(), [sha]
+        while stack:
+            current = stack.pop()
+            if current not in seen:
+                seen.add(current)
+                stack.extend(parents.get(current, []))
+        return seen
+
+    def add_branch(self, repo_id: str, branch: str, base: str = "dev", new_commit: bool = True,
+                   age_days: float = 0) -> str:
+        """Test/benchmark kurulumu için base'den dallanan (isteğe bağlı yeni commit'li) branch ekler."""
+        with self.lock:
+            repo = self.repos[repo_id]
+            sha = repo["refs"][f"refs/heads/{base}"]
+            if new_commit:
+                sha = self.commit(repo_id, [sha], time.time() - age_days * 86400)
+            repo["refs"][f"refs/heads/{branch}"] = sha
+            return sha
+
+    def inject(self, status: int, path_contains: str = "", method: str = None, count: int = 1, retry_after: int = None,
+               delay: float = 0):
+        """Eşleşen sonraki `count` isteğe (delay saniye bekledikten sonra) verilen HTTP hata kodunu döndürür."""
+        with self.lock:
+            self.faults.append({"status": status, "path": path_contains, "method": method,
+                                "remaining": count, "retry_after": retry_after, "delay": delay})
+
+    def take_fault(self, method: str, path: str):
+        with self.lock:
+            for fault in self.faults:
+                if fault["remaining"] <= 0:
+                    continue
+                if fault["method"] and fault["method"] != method:
+                    continue
+                if fault["path"] not in path:
+                    continue
+                fault["remaining"] -= 1
+                return fault
+        return None
+
+
+class FakeAdoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeADO/1.0"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    @property
+    def state(self) -> FakeAdoState:
+        return self.server.state
+
+    # --- HTTP giriş noktaları ---
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def _send(self, status: int, body=None, headers: dict = None):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str, headers: dict = None):
+        self._send(status, {"message": message, "typeKey": "FakeAdoException"}, headers)
+
+    def _control(self, method: str, path: str, payload):
+        """Emülatörün kendisini yöneten /_fake/ uç noktaları (sayılmaz, gecikme uygulanmaz)."""
+        state = self.state
+        if method == "GET" and path == "/_fake/stats":
+            with state.lock:
+                self._send(200, dict(state.calls))
+        elif method == "POST" and path == "/_fake/reset-stats":
+            with state.lock:
+                state.calls.clear()
+            self._send(200, {})
+        elif method == "POST" and path == "/_fake/faults":
+            state.inject(payload["status"], payload.get("path", ""), payload.get("method"),
+                         payload.get("count", 1), payload.get("retry_after"), payload.get("delay", 0))
+            self._send(200, {})
+        elif method == "POST" and path == "/_fake/repos":
+            self._send(200, {"id": state.add_repo(payload["name"], payload.get("id"))})
+        elif method == "POST" and path == "/_fake/branches":
+            sha = state.add_branch(payload["repo_id"], payload["branch"], payload.get("base", "dev"),
+                                   payload.get("new_commit", True), payload.get("age_days", 0))
+            self._send(200, {"objectId": sha})
+        else:
+            self._error(404, f"Unknown control path {path}")
+
+    def _dispatch(self, method: str):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        payload = json.loads(raw) if raw else None
+
+        parts = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(parts.query))
+        path = urllib.parse.unquote(parts.path)
+
+        if path.startswith("/_fake/"):
+            self._control(method, path, payload)
+            return
+
+        state = self.state
+        if state.latency or state.jitter:
+            time.sleep(state.latency + random.uniform(0, state.jitter))
+
+        if _REPOS_PATH.match(path):
+            with state.lock:
+                state.calls["repo_list"] += 1
+                repos = [{"id": repo_id, "name": repo["name"]} for repo_id, repo in state.repos.items()]
+            self._send(200, {"value": repos, "count": len(repos)})
+            return
+
+        match = _REPO_PATH.match(path)
+        if not match:
+            self._error(404, f"Unknown path {path}")
+            return
+        repo_id = match.group("repo")
+        rest = match.group("rest") or ""
+        op = self._operation(method, rest)
+        with state.lock:
+            state.calls[op] += 1
+
+        fault = state.take_fault(method, self.path)
+        if fault:
+            if fault["delay"]:
+                time.sleep(fault["delay"])
+            headers = {"Retry-After": fault["retry_after"]} if fault["retry_after"] is not None else None
+            try:
+                self._error(fault["status"], f"Injected {fault['status']}", headers)
+            except (BrokenPipeError, ConnectionResetError):
+                # İstemci timeout ile bağlantıyı bırakmış
+                self.close_connection = True
+            return
+
+        repo = state.repos.get(repo_id)
+        if repo is None:
+            self._error(404, f"TF401019: The Git repository with name or identifier {repo_id} does not exist.")
+            return
+
+        with state.lock:
+            handler = getattr(self, f"_op_{op}", None)
+            if handler is None:
+                self._error(404, f"Unsupported operation {method} {rest}")
+                return
+            handler(repo_id, repo, rest, query, payload)
+
+    @staticmethod
+    def _operation(method: str, rest: str) -> str:
+        if rest.startswith("/refs"):
+            return "ref_update" if method == "POST" else "ref_lookup"
+        if rest.startswith("/merges"):
+            return "merge"
+        if rest.startswith("/stats/branches"):
+            return "branch_stats"
+        if rest.startswith("/diffs/commits"):
+            return "commit_diff"
+        if rest.startswith("/pullrequests/"):
+            return "pr_patch" if method == "PATCH" else "pr_get"
+        if rest.startswith("/pullrequests"):
+            return "pr_create" if method == "POST" else "pr_search"
+        return "other"
+
+    # --- refs ---
+    def _op_ref_lookup(self, repo_id, repo, rest, query, payload):
+        if rest.startswith("/refs/"):
+            prefix = "refs/" + rest[len("/refs/"):]
+        else:
+            prefix = "refs/" + query.get("filter", "")
+        contains = query.get("filterContains")
+        names = sorted(n for n in repo["refs"] if n.startswith(prefix))
+        if contains:
+            names = [n for n in names if contains.lower() in n.lower()]
+        # Sayfalama: $top + continuationToken (son dönen ref adı), devamı varsa x-ms-continuationtoken header'ı
+        token = query.get("continuationToken")
+        if token:
+            names = [n for n in names if n > token]
+        headers = None
+        top = int(query.get("$top", 0))
+        if top and len(names) > top:
+            names = names[:top]
+            headers = {"x-ms-continuationtoken": names[-1]}
+        value = [{"name": n, "objectId": repo["refs"][n]} for n in names]
+        self._send(200, {"value": value, "count": len(value)}, headers)
+
+    def _op_ref_update(self, repo_id, repo, rest, query, payload):
+        results = []
+        for update in payload or []:
+            name = update["name"]
+            old = update.get("oldObjectId", ZERO_SHA)
+            new = update.get("newObjectId", ZERO_SHA)
+            current = repo["refs"].get(name, ZERO_SHA)
+            # ADO'nun GitRefUpdateStatus değerleri; var olan ref'i oldObjectId=0 ile oluşturmak da staleOldObjectId'dir
+            if not _REF_NAME.match(name):
+                status = "invalidRefName"
+            elif name in self.state.rejected_refs:
+                status = self.state.rejected_refs[name]
+            elif current != old:
+                status = "staleOldObjectId"
+            else:
+                status = None
+            if status:
+                results.append({"name": name, "oldObjectId": old, "newObjectId": new,
+                                "success": False, "updateStatus": status})
+                continue
+            if new == ZERO_SHA:
+                repo["refs"].pop(name, None)
+            else:
+                repo["refs"][name] = new
+            results.append({"name": name, "oldObjectId": old, "newObjectId": new,
+                            "success": True, "updateStatus": "succeeded"})
+        if results and not any(r["success"] for r in results):
+            self._send(409, {"message": "TF401028: The reference has already been updated by another client.",
+                             "value": results, "count": len(results)})
+            return
+        self._send(200, {"value": results, "count": len(results)})
+
+    # --- branch stats ---
+    def _op_branch_stats(self, repo_id, repo, rest, query, payload):
+        base_name = query.get("baseVersionDescriptor.version", "main")
+        base_sha = repo["refs"].get(f"refs/heads/{base_name}")
+        if base_sha is None:
+            self._error(404, f"TF401175: The version descriptor <Branch: {base_name} > could not be resolved.")
+            return
+        base_ancestors = self.state.ancestors(repo_id, base_sha)
+
+        def stats(ref_name):
+            sha = repo["refs"][ref_name]
+            ancestors = self.state.ancestors(repo_id, sha)
+            date = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.state.commit_dates.get(sha, time.time())))
+            return {
+                "name": ref_name[len("refs/heads/"):],
+                "aheadCount": len(ancestors - base_ancestors),
+                "behindCount": len(base_ancestors - ancestors),
+                "isBaseVersion": sha == base_sha and ref_name == f"refs/heads/{base_name}",
+                "commit": {"commitId": sha, "committer": {"date": date}, "author": {"date": date}},
+            }
+
+        name = query.get("name")
+        if name:
+            if f"refs/heads/{name}" not in repo["refs"]:
+                self._error(404, f"TF401175: The version descriptor <Branch: {name} > could not be resolved.")
+                return
+            self._send(200, stats(f"refs/heads/{name}"))
+            return
+        value = [stats(n) for n in sorted(repo["refs"]) if n.startswith("refs/heads/")]
+        self._send(200, {"value": value, "count": len(value)})
+
+    def _op_commit_diff(self, repo_id, repo, rest, query, payload):
+        def resolve(side):
+            version = query.get(f"{side}Version", "")
+            if query.get(f"{side}VersionType", "branch") == "commit":
+                return version if version in repo["parents"] else None
+            return repo["refs"].get(f"refs/heads/{version}")
+
+        base_sha, target_sha = resolve("base"), resolve("target")
+        if base_sha is None or target_sha is None:
+            self._error(404, "TF401175: The version descriptor could not be resolved.")
+            return
+        base_ancestors = self.state.ancestors(repo_id, base_sha)
+        target_ancestors = self.state.ancestors(repo_id, target_sha)
+        # Emülatörde merge-base yaklaşık: ortak atalardan en yeni commit tarihli olan
+        common = base_ancestors & target_ancestors
+        merge_base = max(common, key=lambda c: self.state.commit_dates.get(c, 0), default=None)
+        self._send(200, {
+            "aheadCount": len(target_ancestors - base_ancestors),
+            "behindCount": len(base_ancestors - target_ancestors),
+            "commonCommit": merge_base,
+            "baseCommit": base_sha,
+            "targetCommit": target_sha,
+            "allChangesIncluded": True,
+            "changes": [],
+        })
+
+    # --- merges ---
+    def _op_merge(self, repo_id, repo, rest, query, payload):
+        parents = payload.get("parents", [])
+        if any(p not in repo["parents"] for p in parents):
+            self._error(404, "TF401175: The commit was not found.")
+            return
+        if any(p in repo["conflicts"] for p in parents):
+            self._error(409, "TF401192: Merge conflicts.")
+            return
+        sha = self.state.commit(repo_id, parents)
+        self._send(200, {"commitId": sha, "status": "completed", "parents": parents})
+
+    # --- pull requests ---
+    def _op_pr_create(self, repo_id, repo, rest, query, payload):
+        source = payload["sourceRefName"]
+        target = payload["targetRefName"]
+        if source not in repo["refs"] or target not in repo["refs"]:
+            self._error(404, "TF401398: The pull request cannot be activated because the source and/or the target branch no longer exists.")
+            return
+        for pr in repo["prs"].values():
+            if pr["status"] == "active" and pr["sourceRefName"] == source and pr["targetRefName"] == target:
+                self._error(409, f"TF401179: An active pull request for the source and target branch already exists. ({pr['pullRequestId']})")
+                return
+        pr_id = next(self.state._pr_ids)
+        pr = {
+            "pullRequestId": pr_id,
+            "status": "active",
+            "sourceRefName": source,
+            "targetRefName": target,
+            "title": payload.get("title"),
+            "description": payload.get("description"),
+            "lastMergeSourceCommit": {"commitId": repo["refs"][source]},
+            "lastMergeTargetCommit": {"commitId": repo["refs"][target]},
+            "mergeStatus": "succeeded",
+        }
+        repo["prs"][pr_id] = pr
+        self._send(201, dict(pr))
+
+    def _op_pr_search(self, repo_id, repo, rest, query, payload):
+        value = []
+        for pr in sorted(repo["prs"].values(), key=lambda p: -p["pullRequestId"]):
+            if "searchCriteria.sourceRefName" in query and pr["sourceRefName"] != query["searchCriteria.sourceRefName"]:
+                continue
+            if "searchCriteria.targetRefName" in query and pr["targetRefName"] != query["searchCriteria.targetRefName"]:
+                continue
+            status = query.get("searchCriteria.status", "active")
+            if status != "all" and pr["status"] != status:
+                continue
+            value.append(dict(pr))
+        skip = int(query.get("$skip", 0))
+        top = int(query.get("$top", 101))
+        value = value[skip:skip + top]
+        self._send(200, {"value": value, "count": len(value)})
+
+    def _find_pr(self, repo, rest):
+        try:
+            pr_id = int(rest.split("/")[2])
+        except (IndexError, ValueError):
+            return None
+        return repo["prs"].get(pr_id)
+
+    def _op_pr_get(self, repo_id, repo, rest, query, payload):
+        pr = self._find_pr(repo, rest)
+        if pr is None:
+            self._error(404, "TF401180: The requested pull request was not found.")
+            return
+        self._send(200, dict(pr))
+
+    def _op_pr_patch(self, repo_id, repo, rest, query, payload):
+        pr = self._find_pr(repo, rest)
+        if pr is None:
+            self._error(404, "TF401180: The requested pull request was not found.")
+            return
+        if payload.get("status") == "completed":
+            if pr["status"] != "active":
+                self._error(409, "TF401181: The pull request cannot be completed.")
+                return
+            expected = (payload.get("lastMergeSourceCommit") or {}).get("commitId")
+            source_sha = repo["refs"].get(pr["sourceRefName"])
+            if expected and source_sha and expected != source_sha:
+                self._error(409, "TF401192: The source branch has been updated since lastMergeSourceCommit.")
+                return
+            target_sha = repo["refs"][pr["targetRefName"]]
+            merged = self.state.commit(repo_id, [target_sha])
+            repo["refs"][pr["targetRefName"]] = merged
+            options = payload.get("completionOptions") or {}
+            if options.get("deleteSourceBranch"):
+                repo["refs"].pop(pr["sourceRefName"], None)
+            pr["status"] = "completed"
+            pr["mergeStatus"] = "succeeded"
+            pr["lastMergeCommit"] = {"commitId": merged}
+        self._send(200, dict(pr))
+
+
+def serve(state: FakeAdoState, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Emülatörü arka plan thread'inde başlatır; server.server_address ile portu öğrenilir."""
+    server = ThreadingHTTPServer((host, port), FakeAdoHandler)
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    from function_app import REPO_MAP
+
+    parser = argparse.ArgumentParser(description="Offline Azure DevOps emulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--inject", action="append", default=[], metavar="STATUS[:PATH[:COUNT]]",
+                        help="Eşleşen isteklere hata döndür, ör. 429:/refs:5 veya 409:/merges:1")
+    args = parser.parse_args()
+
+    state = FakeAdoState(REPO_MAP)
+    state.latency = args.latency_ms / 1000
+    state.jitter = args.jitter_ms / 1000
+    for spec in args.inject:
+        status, _, rest = spec.partition(":")
+        path, _, count = rest.partition(":")
+        state.inject(int(status), path, count=int(count or 1), retry_after=1 if status == "429" else None)
+    server = serve(state, args.host, args.port)
+    print(f"Fake ADO listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()